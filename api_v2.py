@@ -321,7 +321,7 @@ async def health_check_full():
         from stripe_billing import get_billing
         billing = get_billing()
         status["services"]["stripe"] = {
-            "status": "enabled" if billing._enabled else "disabled"
+            "status": "enabled" if billing.is_enabled else "disabled"
         }
     except Exception as e:
         status["services"]["stripe"] = {"status": "error", "error": str(e)}
@@ -408,15 +408,15 @@ async def get_tissue(tissue_id: str, wavelength: float = Query(..., ge=350, le=1
 @app.get("/v2/tissues/{tissue_id}/spectrum", tags=["Tissues"])
 async def get_spectrum(tissue_id: str, wl_min: float = 400, wl_max: float = 900, step: float = 10, user: dict = Depends(check_api_key)):
     try:
-        wavelengths = list(np.arange(wl_min, wl_max + 1, step))
+        wavelengths = np.arange(wl_min, wl_max + 1, step, dtype=float)
         spectrum = db.get_spectrum(tissue_id, wavelengths)
         return {
             "tissue_id": tissue_id,
             "data": {
-                "wavelengths": [float(w) for w in wavelengths],
-                "mu_a": [float(round(v, 6)) for v in spectrum['mu_a'].tolist()],
-                "mu_s_prime": [float(round(v, 4)) for v in spectrum['mu_s_prime'].tolist()],
-                "penetration_depth": [float(round(v, 3)) for v in spectrum['penetration_depth'].tolist()]
+                "wavelengths": wavelengths.tolist(),
+                "mu_a": np.round(spectrum['mu_a'], 6).tolist(),
+                "mu_s_prime": np.round(spectrum['mu_s_prime'], 4).tolist(),
+                "penetration_depth": np.round(spectrum['penetration_depth'], 3).tolist()
             }
         }
     except Exception as e:
@@ -1164,7 +1164,12 @@ from pdt_dosimetry import (
     generate_treatment_plan,
     compare_photosensitizers,
     get_photosensitizer_info,
-    list_indications
+    list_indications,
+    round_result,
+    FLUENCE_DECIMALS,
+    PDT_DOSE_DECIMALS,
+    TREATMENT_TIME_DECIMALS,
+    TREATMENT_DEPTH_DECIMALS
 )
 
 @app.get("/v2/pdt/photosensitizers", tags=["PDT Dosimetry"])
@@ -1232,7 +1237,10 @@ async def calculate_pdt_fluence(
     except:
         mu_eff = 0.5  # Default
     
-    result = calculate_fluence_at_depth(irradiance_mW_cm2, exposure_time_s, depth_mm, mu_eff)
+    result = round_result(
+        calculate_fluence_at_depth(irradiance_mW_cm2, exposure_time_s, depth_mm, mu_eff),
+        FLUENCE_DECIMALS
+    )
     result["tissue_id"] = tissue_id
     result["wavelength_nm"] = wavelength
     result["mu_eff_mm-1"] = round(mu_eff, 4)
@@ -1257,12 +1265,12 @@ async def calculate_photodynamic_dose(
     if not ps:
         raise HTTPException(404, f"Unknown photosensitizer: {photosensitizer}")
     
-    result = calculate_pdt_dose(
+    result = round_result(calculate_pdt_dose(
         fluence_J_cm2,
         drug_concentration_uM,
         ps["extinction_coefficient"],
         ps["singlet_oxygen_yield"]
-    )
+    ), PDT_DOSE_DECIMALS)
     result["photosensitizer"] = photosensitizer
     result["fluence_J_cm2"] = fluence_J_cm2
     result["drug_concentration_uM"] = drug_concentration_uM
@@ -1279,7 +1287,7 @@ async def pdt_treatment_time(
     Calculate required treatment time for target fluence.
     """
     result = calculate_treatment_time(target_fluence_J_cm2, irradiance_mW_cm2)
-    return result
+    return round_result(result, TREATMENT_TIME_DECIMALS)
 
 @app.get("/v2/pdt/treatment-depth", tags=["PDT Dosimetry"])
 async def pdt_treatment_depth(
@@ -1295,9 +1303,9 @@ async def pdt_treatment_depth(
     """
     try:
         props = db.get_properties(tissue_id, wavelength)
-        result = calculate_effective_treatment_depth(
+        result = round_result(calculate_effective_treatment_depth(
             wavelength, props.mu_a, props.mu_s_prime, threshold_fraction
-        )
+        ), TREATMENT_DEPTH_DECIMALS)
         result["tissue_id"] = tissue_id
         return convert_numpy_types(result)
     except Exception as e:
@@ -76,12 +76,17 @@ def init_billing_system(
     """
     # Initialize Redis rate limiter
     redis_url = redis_url or os.getenv("REDIS_URL")
-    init_rate_limiter(redis_url)
+    limiter = init_rate_limiter(redis_url)
     
-    # Initialize Stripe billing
+    # Initialize Stripe billing (customer store shares the limiter's Redis pool)
     stripe_key = stripe_secret_key or os.getenv("STRIPE_SECRET_KEY")
     webhook_secret = stripe_webhook_secret or os.getenv("STRIPE_WEBHOOK_SECRET")
-    init_billing(stripe_key, webhook_secret)
+    init_billing(
+        stripe_key,
+        webhook_secret,
+        redis_url=redis_url,
+        connection_pool=limiter.redis.connection_pool if limiter.is_redis else None
+    )
     
     # Create demo customers for testing
     create_demo_customers()
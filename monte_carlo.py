@@ -5,8 +5,11 @@ PhotonPath - Monte Carlo Light Propagation Simulator
 Simplified Monte Carlo simulation for light transport in biological tissues.
 Based on MCML algorithm (Wang et al., 1995).
 
-This is a pure-Python implementation optimized with NumPy.
-For production, consider GPU acceleration with CuPy or Numba.
+The photon transport loop is JIT-compiled with Numba and parallelized across
+CPU cores when Numba is installed (pip install numba); otherwise photons are transported in vectorized NumPy
+batches. The original one-photon-at-a-time Python loop is kept as the
+'python' backend for reference, and run(backend='cuda') traces photons on
+an NVIDIA GPU through numba.cuda.
 
 Author: PhotonPath
 Version: 1.0.0
@@ -15,8 +18,482 @@ Version: 1.0.0
 import numpy as np
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
+import math
 import time
 import json
+from bisect import bisect_right
+
+_TWO_PI = 2 * math.pi
+
+# Numba is optional: JIT-compiled transport kernels when available
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# CUDA backend needs numba.cuda and a usable GPU (or NUMBA_ENABLE_CUDASIM=1)
+try:
+    from numba import cuda
+    from numba.cuda.random import (create_xoroshiro128p_states,
+                                   xoroshiro128p_uniform_float64)
+    CUDA_AVAILABLE = cuda.is_available()
+except Exception:
+    CUDA_AVAILABLE = False
+
+
+# ============================================================================
+# RANDOM NUMBERS
+# ============================================================================
+
+def _uniform_stream(rng: np.random.Generator, chunk: int):
+    """
+    Yield uniform deviates in [0, 1) drawn from `rng` in chunks.
+    
+    Drawing a whole chunk per call amortizes the Generator dispatch cost,
+    which otherwise dominates the per-event cost of a scalar draw.
+    """
+    while True:
+        yield from rng.random(chunk).tolist()
+
+
+# ============================================================================
+# LAYER LOOKUP
+# ============================================================================
+
+def _find_layer(z: float, z_top, z_bottom) -> int:
+    """
+    Index of the layer containing depth z, or -1 if z lies outside all layers.
+    
+    Layers are stacked contiguously in depth order, so a bisection over the
+    sorted z_top boundaries picks the only candidate, which is then checked
+    against its z_bottom.
+    """
+    i = bisect_right(z_top, z) - 1
+    if i >= 0 and z < z_bottom[i]:
+        return i
+    return -1
+
+
+# ============================================================================
+# NUMBA KERNELS
+# ============================================================================
+# Nopython-mode mirror of MonteCarloSimulator._trace_photon working on the
+# packed layer arrays. Uniforms come from an inlined xoshiro256++ generator
+# whose 4-word state is threaded through the kernels (one state per chunk).
+# Compiled without fastmath: boundary hits rely on exact IEEE rounding of
+# z + d*uz (FMA contraction leaks photons across interfaces) and
+# semi-infinite layers have z_bottom = +inf.
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _find_layer_jit(z, z_top, z_bottom):
+        """Layer index at depth z or -1 (see _find_layer)."""
+        if z_top.shape[0] == 1:
+            return 0 if z_top[0] <= z < z_bottom[0] else -1
+        i = np.searchsorted(z_top, z, side='right') - 1
+        if i >= 0 and z < z_bottom[i]:
+            return i
+        return -1
+    
+    _SM64_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+    _SM64_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+    _SM64_MUL2 = np.uint64(0x94D049BB133111EB)
+    
+    @njit(cache=True)
+    def _rotl(x, k):
+        return (x << np.uint64(k)) | (x >> np.uint64(64 - k))
+    
+    @njit(cache=True)
+    def _xoshiro_seed(state, seed):
+        """Fill a 4-word xoshiro256++ state from an integer seed (splitmix64)."""
+        z = np.uint64(seed)
+        for k in range(4):
+            z += _SM64_GAMMA
+            s = (z ^ (z >> np.uint64(30))) * _SM64_MUL1
+            s = (s ^ (s >> np.uint64(27))) * _SM64_MUL2
+            state[k] = s ^ (s >> np.uint64(31))
+    
+    @njit(cache=True)
+    def _xoshiro_random(state):
+        """Next uniform double in [0, 1); advances the xoshiro256++ state in place."""
+        s0, s1, s2, s3 = state[0], state[1], state[2], state[3]
+        result = _rotl(s0 + s3, 23) + s0
+        t = s1 << np.uint64(17)
+        s2 ^= s0
+        s3 ^= s1
+        s1 ^= s2
+        s0 ^= s3
+        s2 ^= t
+        state[0] = s0
+        state[1] = s1
+        state[2] = s2
+        state[3] = _rotl(s3, 45)
+        return (result >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+    
+    @njit(cache=True)
+    def _fresnel_lut_jit(fresnel_lut, cos_tir, i, direction, cos_theta1):
+        """Tabulated reflectance of layer i's lower (0) / upper (1) interface."""
+        cc = cos_tir[i, direction]
+        t = (cos_theta1 - cc) / (1 - cc)
+        if t <= 0.0:
+            return 1.0
+        c = math.sqrt(t) * (fresnel_lut.shape[2] - 1)
+        k = min(int(c), fresnel_lut.shape[2] - 2)
+        f = c - k
+        return fresnel_lut[i, direction, k] * (1 - f) + fresnel_lut[i, direction, k + 1] * f
+    
+    @njit(inline='always', cache=True)
+    def _scatter_jit(ux, uy, uz, g, cos_critical, state):
+        """Henyey-Greenstein scattering (see _trace_photon), inlined into the caller."""
+        if abs(g) < 1e-6:
+            cos_theta = 2 * _xoshiro_random(state) - 1
+        else:
+            temp = (1 - g**2) / (1 - g + 2*g*_xoshiro_random(state))
+            cos_theta = (1 + g**2 - temp**2) / (2*g)
+        sin_theta = math.sqrt(1 - cos_theta*cos_theta)
+        phi = _TWO_PI * _xoshiro_random(state)
+        cos_phi = math.cos(phi)
+        sin_phi = math.sin(phi)
+        if abs(uz) > cos_critical:
+            return sin_theta * cos_phi, sin_theta * sin_phi, math.copysign(cos_theta, uz)
+        temp = math.sqrt(1 - uz*uz)
+        return ((sin_theta * (ux*uz*cos_phi - uy*sin_phi) / temp + ux * cos_theta),
+                (sin_theta * (uy*uz*cos_phi + ux*sin_phi) / temp + uy * cos_theta),
+                -sin_theta * cos_phi * temp + uz * cos_theta)
+    
+    @njit(cache=True)
+    def _trace_photon_jit(z_top, z_bottom, mua_over_mut, inv_mu_t, g, r_specular,
+                          weight_threshold, roulette_chance, cos_critical,
+                          fresnel_lut, cos_tir, max_steps, inv_dz, inv_dr, fluence_z,
+                          fluence_rz, state):
+        """
+        Trace one photon packet, scoring absorbed weight straight into
+        fluence_z / fluence_rz. Returns (reflected, transmitted, absorbed).
+        """
+        x, y, z = 0.0, 0.0, 0.0
+        ux, uy, uz = 0.0, 0.0, 1.0
+        weight = 1.0
+        n_z = fluence_z.shape[0]
+        n_r = fluence_rz.shape[0]
+        
+        reflected = r_specular * weight
+        weight *= (1 - r_specular)
+        absorbed = 0.0
+        transmitted = 0.0
+        
+        for _ in range(max_steps):
+            if weight < 1e-10:
+                break
+            
+            i = _find_layer_jit(z, z_top, z_bottom)
+            if i < 0:
+                if uz < 0:
+                    reflected += weight
+                else:
+                    transmitted += weight
+                break
+            
+            if inv_mu_t[i] > 0:
+                step = -math.log(_xoshiro_random(state)) * inv_mu_t[i]
+            else:
+                step = 1e10
+            
+            if uz > 0:
+                dist_to_boundary = (z_bottom[i] - z) / uz
+            elif uz < 0:
+                dist_to_boundary = (z_top[i] - z) / uz
+            else:
+                dist_to_boundary = 1e10
+            
+            if step < dist_to_boundary:
+                x += step * ux
+                y += step * uy
+                z += step * uz
+                
+                delta_w = weight * mua_over_mut[i]
+                weight -= delta_w
+                absorbed += delta_w
+                
+                iz = int(z * inv_dz)
+                if 0 <= iz < n_z:
+                    fluence_z[iz] += delta_w
+                    ir = int(math.sqrt(x*x + y*y) * inv_dr)
+                    if 0 <= ir < n_r:
+                        fluence_rz[ir, iz] += delta_w
+                
+                ux, uy, uz = _scatter_jit(ux, uy, uz, g[i], cos_critical, state)
+            else:
+                x += dist_to_boundary * ux
+                y += dist_to_boundary * uy
+                z += dist_to_boundary * uz
+                
+                if uz > 0:
+                    next_z = z + 1e-6
+                    next_i = _find_layer_jit(next_z, z_top, z_bottom)
+                    if _xoshiro_random(state) < _fresnel_lut_jit(fresnel_lut, cos_tir, i, 0, abs(uz)):
+                        uz = -uz
+                    elif next_i < 0:
+                        transmitted += weight
+                        break
+                    else:
+                        z = next_z
+                else:
+                    next_z = z - 1e-6
+                    if next_z < 0:
+                        if _xoshiro_random(state) < _fresnel_lut_jit(fresnel_lut, cos_tir, i, 1, abs(uz)):
+                            uz = -uz
+                        else:
+                            reflected += weight
+                            break
+                    else:
+                        next_i = _find_layer_jit(next_z, z_top, z_bottom)
+                        if next_i >= 0:
+                            if _xoshiro_random(state) < _fresnel_lut_jit(fresnel_lut, cos_tir, i, 1, abs(uz)):
+                                uz = -uz
+                            else:
+                                z = next_z
+            
+            # Russian roulette as a select rather than a branch on the draw:
+            # a losing packet is zeroed and ends at the top-of-loop check.
+            # The outer test stays so the common path spends no random draw.
+            if weight < weight_threshold:
+                survives = _xoshiro_random(state) < roulette_chance
+                absorbed += 0.0 if survives else weight
+                weight = weight / roulette_chance if survives else 0.0
+        
+        return reflected, transmitted, absorbed
+    
+    @njit(parallel=True, cache=True)
+    def _run_batch_jit(z_top, z_bottom, mua_over_mut, inv_mu_t, g, r_specular,
+                       weight_threshold, roulette_chance, cos_critical,
+                       fresnel_lut, cos_tir, n_photons, seeds, max_steps, inv_dz, inv_dr, n_z, n_r):
+        """
+        Trace n_photons in parallel over len(seeds) fixed photon chunks.
+        
+        Each chunk runs its own xoshiro256++ stream seeded from seeds[c] and
+        scores into its own float32 tally slices, so the result depends only
+        on the seeds and not on how prange schedules chunks onto threads.
+        Returns per-chunk (totals, fluence_z, fluence_rz) for the caller to
+        reduce in float64.
+        """
+        n_chunks = seeds.shape[0]
+        totals = np.zeros((n_chunks, 3))
+        fluence_z = np.zeros((n_chunks, n_z), dtype=np.float32)
+        fluence_rz = np.zeros((n_chunks, n_r, n_z), dtype=np.float32)
+        
+        for c in prange(n_chunks):
+            state = np.empty(4, dtype=np.uint64)
+            _xoshiro_seed(state, seeds[c])
+            for _ in range(c * n_photons // n_chunks, (c + 1) * n_photons // n_chunks):
+                reflected, transmitted, absorbed = _trace_photon_jit(
+                    z_top, z_bottom, mua_over_mut, inv_mu_t, g, r_specular,
+                    weight_threshold, roulette_chance, cos_critical, fresnel_lut,
+                    cos_tir, max_steps, inv_dz, inv_dr, fluence_z[c], fluence_rz[c], state)
+                totals[c, 0] += reflected
+                totals[c, 1] += transmitted
+                totals[c, 2] += absorbed
+        
+        return totals, fluence_z, fluence_rz
+
+
+# ============================================================================
+# CUDA KERNELS
+# ============================================================================
+# Device-side port of _trace_photon_jit for backend='cuda'. One thread per
+# photon (grid-stride over the batch), per-thread xoroshiro128+ streams from
+# numba.cuda.random, and atomic adds straight into device-memory tallies.
+
+if CUDA_AVAILABLE:
+    @cuda.jit(device=True)
+    def _find_layer_cuda(z, z_top, z_bottom):
+        lo = 0
+        hi = z_top.shape[0]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if z < z_top[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        i = lo - 1
+        if i >= 0 and z < z_bottom[i]:
+            return i
+        return -1
+    
+    @cuda.jit(device=True)
+    def _fresnel_lut_cuda(fresnel_lut, cos_tir, i, direction, cos_theta1):
+        cc = cos_tir[i, direction]
+        t = (cos_theta1 - cc) / (1 - cc)
+        if t <= 0.0:
+            return 1.0
+        c = math.sqrt(t) * (fresnel_lut.shape[2] - 1)
+        k = min(int(c), fresnel_lut.shape[2] - 2)
+        f = c - k
+        return fresnel_lut[i, direction, k] * (1 - f) + fresnel_lut[i, direction, k + 1] * f
+    
+    @cuda.jit(device=True)
+    def _scatter_cuda(ux, uy, uz, g, cos_critical, rng_states, tid):
+        if abs(g) < 1e-6:
+            cos_theta = 2 * xoroshiro128p_uniform_float64(rng_states, tid) - 1
+        else:
+            temp = (1 - g*g) / (1 - g + 2*g*xoroshiro128p_uniform_float64(rng_states, tid))
+            cos_theta = (1 + g*g - temp*temp) / (2*g)
+        sin_theta = math.sqrt(1 - cos_theta*cos_theta)
+        phi = _TWO_PI * xoroshiro128p_uniform_float64(rng_states, tid)
+        cos_phi = math.cos(phi)
+        sin_phi = math.sin(phi)
+        if abs(uz) > cos_critical:
+            return sin_theta * cos_phi, sin_theta * sin_phi, math.copysign(cos_theta, uz)
+        temp = math.sqrt(1 - uz*uz)
+        return ((sin_theta * (ux*uz*cos_phi - uy*sin_phi) / temp + ux * cos_theta),
+                (sin_theta * (uy*uz*cos_phi + ux*sin_phi) / temp + uy * cos_theta),
+                -sin_theta * cos_phi * temp + uz * cos_theta)
+    
+    @cuda.jit
+    def _run_photons_cuda(z_top, z_bottom, mua_over_mut, inv_mu_t, g, r_specular,
+                          weight_threshold, roulette_chance, cos_critical,
+                          fresnel_lut, cos_tir, n_photons, max_steps, inv_dz, inv_dr,
+                          rng_states, totals, fluence_z, fluence_rz):
+        """Trace n_photons, atomically accumulating totals (R, T, A) and fluence."""
+        tid = cuda.grid(1)
+        stride = cuda.gridsize(1)
+        n_z = fluence_z.shape[0]
+        n_r = fluence_rz.shape[0]
+        
+        for _ in range(tid, n_photons, stride):
+            x, y, z = 0.0, 0.0, 0.0
+            ux, uy, uz = 0.0, 0.0, 1.0
+            weight = 1 - r_specular
+            reflected = r_specular
+            transmitted = 0.0
+            absorbed = 0.0
+            
+            for _step in range(max_steps):
+                if weight < 1e-10:
+                    break
+                
+                i = _find_layer_cuda(z, z_top, z_bottom)
+                if i < 0:
+                    if uz < 0:
+                        reflected += weight
+                    else:
+                        transmitted += weight
+                    break
+                
+                if inv_mu_t[i] > 0:
+                    step = -math.log(xoroshiro128p_uniform_float64(rng_states, tid)) * inv_mu_t[i]
+                else:
+                    step = 1e10
+                
+                if uz > 0:
+                    dist_to_boundary = (z_bottom[i] - z) / uz
+                elif uz < 0:
+                    dist_to_boundary = (z_top[i] - z) / uz
+                else:
+                    dist_to_boundary = 1e10
+                
+                if step < dist_to_boundary:
+                    x += step * ux
+                    y += step * uy
+                    z += step * uz
+                    
+                    delta_w = weight * mua_over_mut[i]
+                    weight -= delta_w
+                    absorbed += delta_w
+                    
+                    iz = int(z * inv_dz)
+                    if 0 <= iz < n_z:
+                        cuda.atomic.add(fluence_z, iz, delta_w)
+                        ir = int(math.sqrt(x*x + y*y) * inv_dr)
+                        if 0 <= ir < n_r:
+                            cuda.atomic.add(fluence_rz, (ir, iz), delta_w)
+                    
+                    ux, uy, uz = _scatter_cuda(ux, uy, uz, g[i], cos_critical,
+                                               rng_states, tid)
+                else:
+                    x += dist_to_boundary * ux
+                    y += dist_to_boundary * uy
+                    z += dist_to_boundary * uz
+                    
+                    xi = xoroshiro128p_uniform_float64(rng_states, tid)
+                    if uz > 0:
+                        next_z = z + 1e-6
+                        next_i = _find_layer_cuda(next_z, z_top, z_bottom)
+                        if xi < _fresnel_lut_cuda(fresnel_lut, cos_tir, i, 0, abs(uz)):
+                            uz = -uz
+                        elif next_i < 0:
+                            transmitted += weight
+                            break
+                        else:
+                            z = next_z
+                    else:
+                        next_z = z - 1e-6
+                        if next_z < 0:
+                            if xi < _fresnel_lut_cuda(fresnel_lut, cos_tir, i, 1, abs(uz)):
+                                uz = -uz
+                            else:
+                                reflected += weight
+                                break
+                        elif _find_layer_cuda(next_z, z_top, z_bottom) >= 0:
+                            if xi < _fresnel_lut_cuda(fresnel_lut, cos_tir, i, 1, abs(uz)):
+                                uz = -uz
+                            else:
+                                z = next_z
+                
+                if weight < weight_threshold:
+                    if xoroshiro128p_uniform_float64(rng_states, tid) < roulette_chance:
+                        weight /= roulette_chance
+                    else:
+                        absorbed += weight
+                        break
+            
+            cuda.atomic.add(totals, 0, reflected)
+            cuda.atomic.add(totals, 1, transmitted)
+            cuda.atomic.add(totals, 2, absorbed)
+
+
+# ============================================================================
+# VECTORIZED HELPERS
+# ============================================================================
+# Elementwise counterparts of _find_layer / _fresnel_reflectance used by the
+# batched NumPy transport (MonteCarloSimulator._run_batch_numpy).
+
+def _find_layer_vec(z: np.ndarray, z_top: np.ndarray,
+                    z_bottom: np.ndarray) -> np.ndarray:
+    """Layer index for each depth in z, -1 outside all layers."""
+    idx = np.searchsorted(z_top, z, side='right') - 1
+    inside = idx >= 0
+    inside[inside] = z[inside] < z_bottom[idx[inside]]
+    return np.where(inside, idx, -1)
+
+
+def _fresnel_vec(n1: np.ndarray, n2: np.ndarray,
+                 cos_theta1: np.ndarray) -> np.ndarray:
+    """Unpolarized Fresnel reflectance for arrays of interfaces."""
+    sin_theta2 = n1 / n2 * np.sqrt(np.maximum(0.0, 1 - cos_theta1**2))
+    tir = sin_theta2 > 1.0
+    cos_theta2 = np.sqrt(np.maximum(0.0, 1 - sin_theta2**2))
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = ((n1 * cos_theta1 - n2 * cos_theta2) /
+              (n1 * cos_theta1 + n2 * cos_theta2))**2
+        rp = ((n1 * cos_theta2 - n2 * cos_theta1) /
+              (n1 * cos_theta2 + n2 * cos_theta1))**2
+    
+    r = np.where(tir, 1.0, 0.5 * (rs + rp))
+    return np.where(n1 == n2, 0.0, r)
+
+
+def _fresnel_lut_vec(fresnel_lut: np.ndarray, cos_tir: np.ndarray, i: np.ndarray,
+                     direction: np.ndarray, cos_theta1: np.ndarray) -> np.ndarray:
+    """Tabulated reflectance of the lower (0) / upper (1) interface of layers i."""
+    cc = cos_tir[i, direction]
+    t = np.maximum(0.0, (cos_theta1 - cc) / (1 - cc))
+    c = np.sqrt(t) * (fresnel_lut.shape[2] - 1)
+    k = np.minimum(c.astype(np.int64), fresnel_lut.shape[2] - 2)
+    f = c - k
+    r = fresnel_lut[i, direction, k] * (1 - f) + fresnel_lut[i, direction, k + 1] * f
+    return np.where(t > 0, r, 1.0)
 
 
 # ============================================================================
@@ -58,6 +535,16 @@ class Layer:
     def albedo(self) -> float:
         """Single scattering albedo."""
         return self.mu_s / self.mu_t if self.mu_t > 0 else 0
+    
+    @property
+    def mua_over_mut(self) -> float:
+        """Fraction of weight absorbed per interaction (mu_a / mu_t)."""
+        return self.mu_a / self.mu_t if self.mu_t > 0 else 0
+    
+    @property
+    def inv_mu_t(self) -> float:
+        """Mean free path 1 / mu_t (0 for a non-interacting layer)."""
+        return 1 / self.mu_t if self.mu_t > 0 else 0
 
 
 @dataclass
@@ -145,9 +632,23 @@ class MonteCarloSimulator:
     WEIGHT_THRESHOLD = 1e-4     # Roulette threshold
     ROULETTE_CHANCE = 0.1      # Survival probability in roulette
     COS_CRITICAL = 0.99999     # Critical angle threshold
+    FRESNEL_LUT_SIZE = 1024    # cos(theta) samples per interface reflectance table
+    RNG_CHUNK = 8192           # Uniforms drawn per PRNG refill
+    MAX_STEPS = 100000         # Interaction limit per photon
+    N_CHUNKS = 64              # Independent RNG/tally chunks for parallel runs
+    BACKENDS = ('auto', 'numba', 'numpy', 'python', 'cuda')
+    CUDA_BLOCK = 256           # Threads per CUDA block
+    CUDA_MAX_THREADS = 1 << 18 # Grid-stride cap on CUDA threads (and RNG states)
     
-    def __init__(self):
-        """Initialize simulator."""
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize simulator.
+        
+        Parameters:
+        -----------
+        seed : int, optional
+            Seed for the random number generator (for reproducible runs)
+        """
         self.layers: List[Layer] = []
         self.n_ambient = 1.0    # Ambient refractive index (air)
         
@@ -163,6 +664,13 @@ class MonteCarloSimulator:
         self._reflectance = 0.0
         self._transmittance = 0.0
         self._absorbed = 0.0
+        
+        # Random numbers: SFC64 bit generator, drawn in buffered chunks
+        self.rng = np.random.Generator(np.random.SFC64(seed))
+        self._rand = _uniform_stream(self.rng, self.RNG_CHUNK).__next__
+        
+        # Transport backend: 'auto' picks Numba when installed, else NumPy batches
+        self.backend = 'auto'
     
     def reset(self):
         """Clear all layers."""
@@ -240,10 +748,61 @@ class MonteCarloSimulator:
     
     def _get_layer_at_z(self, z: float) -> Optional[Layer]:
         """Get the layer at depth z."""
-        for layer in self.layers:
-            if layer.z_top <= z < layer.z_bottom:
-                return layer
-        return None
+        i = _find_layer(z, [l.z_top for l in self.layers],
+                        [l.z_bottom for l in self.layers])
+        return self.layers[i] if i >= 0 else None
+    
+    def _layer_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Pack layer properties into contiguous float64 arrays.
+        
+        Returns:
+        --------
+        dict : 'z_top', 'z_bottom', 'n', 'mu_a', 'mu_s', 'mu_t', 'g',
+               'mua_over_mut', 'inv_mu_t' arrays of length n_layers,
+               indexed by layer number
+        """
+        return {
+            'z_top': np.array([l.z_top for l in self.layers], dtype=np.float64),
+            'z_bottom': np.array([l.z_bottom for l in self.layers], dtype=np.float64),
+            'n': np.array([l.n for l in self.layers], dtype=np.float64),
+            'mu_a': np.array([l.mu_a for l in self.layers], dtype=np.float64),
+            'mu_s': np.array([l.mu_s for l in self.layers], dtype=np.float64),
+            'mu_t': np.array([l.mu_t for l in self.layers], dtype=np.float64),
+            'g': np.array([l.g for l in self.layers], dtype=np.float64),
+            'mua_over_mut': np.array([l.mua_over_mut for l in self.layers], dtype=np.float64),
+            'inv_mu_t': np.array([l.inv_mu_t for l in self.layers], dtype=np.float64),
+        }
+    
+    def _fresnel_table(self, layers: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tabulate Fresnel reflectance for every layer interface.
+        
+        Layers are contiguous, so the interface below layer i leads to layer
+        i+1 (ambient below the last layer) and the one above to layer i-1
+        (ambient above the first). Below the critical cosine cos_tir the
+        reflectance is exactly 1; above it the table is sampled uniformly in
+        u = sqrt((cos - cos_tir) / (1 - cos_tir)), which straightens the
+        square-root edge at the critical angle so linear interpolation holds.
+        
+        Returns:
+        --------
+        tuple : (lut, cos_tir) with lut of shape (n_layers, 2, FRESNEL_LUT_SIZE)
+                and cos_tir of shape (n_layers, 2); [:, 0] is the lower and
+                [:, 1] the upper interface
+        """
+        n = layers['n']
+        n_below = np.append(n[1:], self.n_ambient)
+        n_above = np.insert(n[:-1], 0, self.n_ambient)
+        
+        n1 = n[:, None]
+        n2 = np.stack([n_below, n_above], axis=1)
+        cos_tir = np.sqrt(np.maximum(0.0, 1 - (n2 / n1)**2))
+        
+        u = np.linspace(0.0, 1.0, self.FRESNEL_LUT_SIZE)
+        cos_theta = cos_tir[:, :, None] + (1 - cos_tir[:, :, None]) * u**2
+        lut = _fresnel_vec(n1[:, :, None], n2[:, :, None], cos_theta)
+        return lut, cos_tir
     
     def _fresnel_reflectance(self, n1: float, n2: float, cos_theta1: float) -> float:
         """
@@ -264,13 +823,13 @@ class MonteCarloSimulator:
             return 0.0
         
         # Check for total internal reflection
-        sin_theta1 = np.sqrt(1 - cos_theta1**2)
+        sin_theta1 = math.sqrt(max(0.0, 1 - cos_theta1*cos_theta1))
         sin_theta2 = n1 / n2 * sin_theta1
         
         if sin_theta2 > 1.0:
             return 1.0  # Total internal reflection
         
-        cos_theta2 = np.sqrt(1 - sin_theta2**2)
+        cos_theta2 = math.sqrt(1 - sin_theta2*sin_theta2)
         
         # Fresnel equations (unpolarized)
         rs = ((n1 * cos_theta1 - n2 * cos_theta2) / 
@@ -280,74 +839,39 @@ class MonteCarloSimulator:
         
         return 0.5 * (rs + rp)
     
-    def _scatter_direction(self, ux: float, uy: float, uz: float, 
-                          g: float) -> Tuple[float, float, float]:
+    def _trace_photon(self, layers: Dict[str, list], r_specular: float,
+                      fluence_z: np.ndarray, fluence_rz: np.ndarray,
+                      inv_dz: float, inv_dr: float) -> Tuple[float, float, float]:
         """
-        Calculate new direction after scattering (Henyey-Greenstein).
+        Trace a single photon packet through the medium.
         
         Parameters:
         -----------
-        ux, uy, uz : float
-            Current direction cosines
-        g : float
-            Anisotropy factor
-            
-        Returns:
-        --------
-        tuple : New direction cosines (ux, uy, uz)
-        """
-        # Sample deflection angle from Henyey-Greenstein
-        if abs(g) < 1e-6:
-            cos_theta = 2 * np.random.random() - 1
-        else:
-            temp = (1 - g**2) / (1 - g + 2*g*np.random.random())
-            cos_theta = (1 + g**2 - temp**2) / (2*g)
-        
-        sin_theta = np.sqrt(1 - cos_theta**2)
-        
-        # Sample azimuthal angle uniformly
-        phi = 2 * np.pi * np.random.random()
-        cos_phi = np.cos(phi)
-        sin_phi = np.sin(phi)
-        
-        # Rotate direction
-        if abs(uz) > self.COS_CRITICAL:
-            # Special case: nearly vertical
-            ux_new = sin_theta * cos_phi
-            uy_new = sin_theta * sin_phi
-            uz_new = np.sign(uz) * cos_theta
-        else:
-            temp = np.sqrt(1 - uz**2)
-            ux_new = (sin_theta * (ux*uz*cos_phi - uy*sin_phi) / temp + 
-                     ux * cos_theta)
-            uy_new = (sin_theta * (uy*uz*cos_phi + ux*sin_phi) / temp + 
-                     uy * cos_theta)
-            uz_new = -sin_theta * cos_phi * temp + uz * cos_theta
-        
-        return ux_new, uy_new, uz_new
-    
-    def _trace_photon(self) -> Tuple[float, float, float, np.ndarray]:
-        """
-        Trace a single photon packet through the medium.
+        layers : dict
+            Packed layer properties from _layer_arrays() (as lists)
+        r_specular : float
+            Specular reflectance of the top surface
+        fluence_z, fluence_rz : list
+            Fluence tallies (nested lists), incremented in place at each
+            absorption event
+        inv_dz, inv_dr : float
+            Inverse depth / radial bin widths
         
         Returns:
         --------
-        tuple : (reflected_weight, transmitted_weight, absorbed_weight, depth_deposits)
+        tuple : (reflected_weight, transmitted_weight, absorbed_weight)
         """
+        z_top, z_bottom = layers['z_top'], layers['z_bottom']
+        n, g = layers['n'], layers['g']
+        mua_over_mut, inv_mu_t = layers['mua_over_mut'], layers['inv_mu_t']
+        
         # Initialize photon
         x, y, z = 0.0, 0.0, 0.0
         ux, uy, uz = 0.0, 0.0, 1.0  # Pointing down
         weight = 1.0
-        
-        # Track deposits for fluence scoring
-        deposits = []
+        n_z, n_r = len(fluence_z), len(fluence_rz)
         
         # Handle surface reflection
-        layer = self._get_layer_at_z(0)
-        if layer is None:
-            return weight, 0.0, 0.0, np.array([])
-        
-        r_specular = self._fresnel_reflectance(self.n_ambient, layer.n, 1.0)
         reflected = r_specular * weight
         weight *= (1 - r_specular)
         
@@ -355,13 +879,12 @@ class MonteCarloSimulator:
         transmitted = 0.0
         
         # Propagation loop
-        max_steps = 100000
-        for _ in range(max_steps):
+        for _ in range(self.MAX_STEPS):
             if weight < 1e-10:
                 break
             
-            layer = self._get_layer_at_z(z)
-            if layer is None:
+            i = _find_layer(z, z_top, z_bottom)
+            if i < 0:
                 # Escaped
                 if uz < 0:
                     reflected += weight
@@ -370,16 +893,16 @@ class MonteCarloSimulator:
                 break
             
             # Sample step size
-            if layer.mu_t > 0:
-                step = -np.log(np.random.random()) / layer.mu_t
+            if inv_mu_t[i] > 0:
+                step = -math.log(1.0 - self._rand()) * inv_mu_t[i]
             else:
                 step = 1e10  # Essentially infinite
             
             # Check boundary crossing
             if uz > 0:
-                dist_to_boundary = (layer.z_bottom - z) / uz
+                dist_to_boundary = (z_bottom[i] - z) / uz
             elif uz < 0:
-                dist_to_boundary = (layer.z_top - z) / uz
+                dist_to_boundary = (z_top[i] - z) / uz
             else:
                 dist_to_boundary = 1e10
             
@@ -390,16 +913,43 @@ class MonteCarloSimulator:
                 z += step * uz
                 
                 # Absorption
-                delta_w = weight * layer.mu_a / layer.mu_t
+                delta_w = weight * mua_over_mut[i]
                 weight -= delta_w
                 absorbed += delta_w
                 
-                # Record deposit
-                r = np.sqrt(x**2 + y**2)
-                deposits.append((z, r, delta_w))
+                # Score deposit
+                iz = int(z * inv_dz)
+                if 0 <= iz < n_z:
+                    fluence_z[iz] += delta_w
+                    ir = int(math.sqrt(x*x + y*y) * inv_dr)
+                    if 0 <= ir < n_r:
+                        fluence_rz[ir][iz] += delta_w
+                
+                # Scattering: sample Henyey-Greenstein deflection and a
+                # uniform azimuth, then rotate the direction in place
+                gi = g[i]
+                if abs(gi) < 1e-6:
+                    cos_theta = 2 * self._rand() - 1
+                else:
+                    temp = (1 - gi*gi) / (1 - gi + 2*gi*self._rand())
+                    cos_theta = (1 + gi*gi - temp*temp) / (2*gi)
+                sin_theta = math.sqrt(max(0.0, 1 - cos_theta*cos_theta))
+                
+                phi = _TWO_PI * self._rand()
+                cos_phi = math.cos(phi)
+                sin_phi = math.sin(phi)
                 
-                # Scattering
-                ux, uy, uz = self._scatter_direction(ux, uy, uz, layer.g)
+                if abs(uz) > self.COS_CRITICAL:
+                    # Special case: nearly vertical
+                    ux = sin_theta * cos_phi
+                    uy = sin_theta * sin_phi
+                    uz = math.copysign(cos_theta, uz)
+                else:
+                    temp = math.sqrt(1 - uz*uz)
+                    ux, uy, uz = (
+                        sin_theta * (ux*uz*cos_phi - uy*sin_phi) / temp + ux * cos_theta,
+                        sin_theta * (uy*uz*cos_phi + ux*sin_phi) / temp + uy * cos_theta,
+                        -sin_theta * cos_phi * temp + uz * cos_theta)
                 
             else:
                 # Hit boundary
@@ -410,12 +960,12 @@ class MonteCarloSimulator:
                 # Determine next layer
                 if uz > 0:
                     next_z = z + 1e-6
-                    next_layer = self._get_layer_at_z(next_z)
-                    if next_layer is None:
+                    next_i = _find_layer(next_z, z_top, z_bottom)
+                    if next_i < 0:
                         # Exiting bottom
                         r_fresnel = self._fresnel_reflectance(
-                            layer.n, self.n_ambient, abs(uz))
-                        if np.random.random() < r_fresnel:
+                            n[i], self.n_ambient, abs(uz))
+                        if self._rand() < r_fresnel:
                             uz = -uz  # Reflect
                         else:
                             transmitted += weight
@@ -423,8 +973,8 @@ class MonteCarloSimulator:
                     else:
                         # Transmit to next layer
                         r_fresnel = self._fresnel_reflectance(
-                            layer.n, next_layer.n, abs(uz))
-                        if np.random.random() < r_fresnel:
+                            n[i], n[next_i], abs(uz))
+                        if self._rand() < r_fresnel:
                             uz = -uz
                         else:
                             z = next_z
@@ -433,34 +983,273 @@ class MonteCarloSimulator:
                     if next_z < 0:
                         # Exiting top (diffuse reflectance)
                         r_fresnel = self._fresnel_reflectance(
-                            layer.n, self.n_ambient, abs(uz))
-                        if np.random.random() < r_fresnel:
+                            n[i], self.n_ambient, abs(uz))
+                        if self._rand() < r_fresnel:
                             uz = -uz
                         else:
                             reflected += weight
                             break
                     else:
-                        next_layer = self._get_layer_at_z(next_z)
-                        if next_layer:
+                        next_i = _find_layer(next_z, z_top, z_bottom)
+                        if next_i >= 0:
                             r_fresnel = self._fresnel_reflectance(
-                                layer.n, next_layer.n, abs(uz))
-                            if np.random.random() < r_fresnel:
+                                n[i], n[next_i], abs(uz))
+                            if self._rand() < r_fresnel:
                                 uz = -uz
                             else:
                                 z = next_z
             
             # Russian roulette
             if weight < self.WEIGHT_THRESHOLD:
-                if np.random.random() < self.ROULETTE_CHANCE:
+                if self._rand() < self.ROULETTE_CHANCE:
                     weight /= self.ROULETTE_CHANCE
                 else:
                     absorbed += weight
                     break
         
-        return reflected, transmitted, absorbed, np.array(deposits)
+        return reflected, transmitted, absorbed
+    
+    def _run_batch_python(self, n_photons: int, layers: Dict[str, np.ndarray],
+                          r_specular: float, inv_dz: float, inv_dr: float,
+                          fluence_z: np.ndarray,
+                          fluence_rz: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Trace photons one at a time with _trace_photon (reference backend).
+        
+        Deposits are scored into list-backed tallies allocated once per
+        batch and added to the arrays at the end, which avoids boxing a
+        NumPy scalar on every absorption event.
+        """
+        layers = {k: v.tolist() for k, v in layers.items()}
+        tally_z = [0.0] * len(fluence_z)
+        tally_rz = [[0.0] * fluence_rz.shape[1] for _ in range(fluence_rz.shape[0])]
+        reflected = transmitted = absorbed = 0.0
+        for _ in range(n_photons):
+            r, t, a = self._trace_photon(layers, r_specular, tally_z, tally_rz,
+                                         inv_dz, inv_dr)
+            reflected += r
+            transmitted += t
+            absorbed += a
+        fluence_z += tally_z
+        fluence_rz += tally_rz
+        return reflected, transmitted, absorbed
+    
+    def _run_batch_numba(self, n_photons: int, layers: Dict[str, np.ndarray],
+                         r_specular: float, inv_dz: float, inv_dr: float, fluence_z: np.ndarray,
+                         fluence_rz: np.ndarray) -> Tuple[float, float, float]:
+        """Trace photons with the parallel Numba kernel _run_batch_jit."""
+        seeds = self.rng.integers(2**63, size=min(self.N_CHUNKS, max(1, n_photons)))
+        totals, fz, frz = _run_batch_jit(
+            *(layers[k] for k in ('z_top', 'z_bottom', 'mua_over_mut', 'inv_mu_t', 'g')),
+            r_specular, self.WEIGHT_THRESHOLD, self.ROULETTE_CHANCE,
+            self.COS_CRITICAL, *self._fresnel_table(layers), n_photons, seeds,
+            self.MAX_STEPS, inv_dz, inv_dr, self.n_z, self.n_r)
+        fluence_z += fz.sum(axis=0, dtype=np.float64)
+        fluence_rz += frz.sum(axis=0, dtype=np.float64)
+        return tuple(totals.sum(axis=0).tolist())
+    
+    def _scatter_batch(self, ux: np.ndarray, uy: np.ndarray, uz: np.ndarray,
+                       g: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Henyey-Greenstein scattering for a batch of photons (see _trace_photon)."""
+        k = len(uz)
+        isotropic = np.abs(g) < 1e-6
+        g_safe = np.where(isotropic, 0.5, g)
+        
+        xi = self.rng.random(k)
+        temp = (1 - g_safe**2) / (1 - g_safe + 2*g_safe*xi)
+        cos_theta = np.where(isotropic, 2*xi - 1,
+                             (1 + g_safe**2 - temp**2) / (2*g_safe))
+        sin_theta = np.sqrt(np.maximum(0.0, 1 - cos_theta**2))
+        
+        phi = 2 * np.pi * self.rng.random(k)
+        cos_phi = np.cos(phi)
+        sin_phi = np.sin(phi)
+        
+        vertical = np.abs(uz) > self.COS_CRITICAL
+        temp = np.sqrt(np.where(vertical, 1.0, 1 - uz**2))
+        ux_new = np.where(vertical, sin_theta * cos_phi,
+                          sin_theta * (ux*uz*cos_phi - uy*sin_phi) / temp + ux * cos_theta)
+        uy_new = np.where(vertical, sin_theta * sin_phi,
+                          sin_theta * (uy*uz*cos_phi + ux*sin_phi) / temp + uy * cos_theta)
+        uz_new = np.where(vertical, np.sign(uz) * cos_theta,
+                          -sin_theta * cos_phi * temp + uz * cos_theta)
+        
+        return ux_new, uy_new, uz_new
+    
+    def _run_batch_numpy(self, n_photons: int, layers: Dict[str, np.ndarray],
+                         r_specular: float, inv_dz: float, inv_dr: float, fluence_z: np.ndarray,
+                         fluence_rz: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Transport all photons together as structure-of-arrays NumPy batches.
+        
+        Every iteration advances each live photon by one interaction or
+        boundary hit; the physics mirrors _trace_photon step for step.
+        Fluence is accumulated in place.
+        
+        Returns:
+        --------
+        tuple : (reflected_weight, transmitted_weight, absorbed_weight) totals
+        """
+        z_top, z_bottom = layers['z_top'], layers['z_bottom']
+        n, g = layers['n'], layers['g']
+        mua_over_mut, inv_mu_t = layers['mua_over_mut'], layers['inv_mu_t']
+        n_z, n_r = self.n_z, self.n_r
+        rand = self.rng.random
+        fresnel_lut, cos_tir = self._fresnel_table(layers)
+        
+        reflected = r_specular * n_photons
+        transmitted = 0.0
+        absorbed = 0.0
+        
+        x = np.zeros(n_photons)
+        y = np.zeros(n_photons)
+        z = np.zeros(n_photons)
+        ux = np.zeros(n_photons)
+        uy = np.zeros(n_photons)
+        uz = np.ones(n_photons)
+        weight = np.full(n_photons, 1 - r_specular)
+        alive = np.ones(n_photons, dtype=bool)
+        
+        for _ in range(self.MAX_STEPS):
+            alive &= weight >= 1e-10
+            n_alive = np.count_nonzero(alive)
+            if n_alive == 0:
+                break
+            
+            # Compact once most of the batch has terminated
+            if n_alive < 0.5 * len(alive):
+                x, y, z = x[alive], y[alive], z[alive]
+                ux, uy, uz = ux[alive], uy[alive], uz[alive]
+                weight = weight[alive]
+                alive = np.ones(n_alive, dtype=bool)
+            
+            i = _find_layer_vec(z, z_top, z_bottom)
+            
+            # Escaped
+            escaped = alive & (i < 0)
+            up = escaped & (uz < 0)
+            reflected += weight[up].sum()
+            transmitted += weight[escaped & ~up].sum()
+            alive &= ~escaped
+            
+            act = np.flatnonzero(alive)
+            ia = i[act]
+            uza = uz[act]
+            za = z[act]
+            
+            # Sample step size and distance to the layer boundaries
+            inv_mt = inv_mu_t[ia]
+            with np.errstate(divide='ignore'):
+                step = np.where(inv_mt > 0, -np.log(rand(len(act))) * inv_mt, 1e10)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                dist = np.where(uza > 0, (z_bottom[ia] - za) / uza,
+                                np.where(uza < 0, (z_top[ia] - za) / uza, 1e10))
+            
+            interact = step < dist
+            
+            # Interaction within layer: absorb, score, scatter
+            p = act[interact]
+            if len(p):
+                s = step[interact]
+                ip = ia[interact]
+                x[p] += s * ux[p]
+                y[p] += s * uy[p]
+                z[p] += s * uz[p]
+                
+                delta_w = weight[p] * mua_over_mut[ip]
+                weight[p] -= delta_w
+                absorbed += delta_w.sum()
+                
+                iz = (z[p] * inv_dz).astype(np.int64)
+                ir = (np.sqrt(x[p]**2 + y[p]**2) * inv_dr).astype(np.int64)
+                in_z = (iz >= 0) & (iz < n_z)
+                np.add.at(fluence_z, iz[in_z], delta_w[in_z])
+                in_rz = in_z & (ir >= 0) & (ir < n_r)
+                np.add.at(fluence_rz, (ir[in_rz], iz[in_rz]), delta_w[in_rz])
+                
+                ux[p], uy[p], uz[p] = self._scatter_batch(ux[p], uy[p], uz[p], g[ip])
+            
+            # Boundary hit: move to the interface, then Fresnel reflect/transmit
+            b = act[~interact]
+            if len(b):
+                d = dist[~interact]
+                ib = ia[~interact]
+                x[b] += d * ux[b]
+                y[b] += d * uy[b]
+                z[b] += d * uz[b]
+                
+                uzb = uz[b]
+                down = uzb > 0
+                next_z = np.where(down, z[b] + 1e-6, z[b] - 1e-6)
+                next_i = _find_layer_vec(next_z, z_top, z_bottom)
+                exits = np.where(down, next_i < 0, next_z < 0)
+                # Upward step into a gap between layers: no interface
+                crosses = exits | (next_i >= 0)
+                
+                r_fresnel = _fresnel_lut_vec(fresnel_lut, cos_tir, ib, np.where(down, 0, 1),
+                                             np.abs(uzb))
+                bounce = crosses & (rand(len(b)) < r_fresnel)
+                
+                uz[b] = np.where(bounce, -uzb, uzb)
+                
+                leave = crosses & ~bounce & exits
+                wl = weight[b[leave]]
+                transmitted += wl[down[leave]].sum()
+                reflected += wl[~down[leave]].sum()
+                alive[b[leave]] = False
+                
+                enter = crosses & ~bounce & ~exits
+                z[b[enter]] = next_z[enter]
+            
+            # Russian roulette
+            low = np.flatnonzero(alive & (weight < self.WEIGHT_THRESHOLD))
+            if len(low):
+                survive = rand(len(low)) < self.ROULETTE_CHANCE
+                weight[low[survive]] /= self.ROULETTE_CHANCE
+                absorbed += weight[low[~survive]].sum()
+                alive[low[~survive]] = False
+        
+        return float(reflected), float(transmitted), float(absorbed)
+    
+    def _run_batch_cuda(self, n_photons: int, layers: Dict[str, np.ndarray],
+                        r_specular: float, inv_dz: float, inv_dr: float, fluence_z: np.ndarray,
+                        fluence_rz: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Transport photons on the GPU with _run_photons_cuda.
+        
+        Tallies live in device memory and are added into fluence_z /
+        fluence_rz after the kernel completes. They stay float64: every
+        photon lands in the same global arrays, so float32 bins would
+        swallow small deposits at large photon counts.
+        
+        Returns:
+        --------
+        tuple : (reflected_weight, transmitted_weight, absorbed_weight) totals
+        """
+        n_threads = min(max(1, n_photons), self.CUDA_MAX_THREADS)
+        n_blocks = (n_threads + self.CUDA_BLOCK - 1) // self.CUDA_BLOCK
+        rng_states = create_xoroshiro128p_states(
+            n_blocks * self.CUDA_BLOCK, seed=int(self.rng.integers(2**63)))
+        
+        fresnel_lut, cos_tir = self._fresnel_table(layers)
+        d_totals = cuda.to_device(np.zeros(3))
+        d_fluence_z = cuda.to_device(np.zeros_like(fluence_z))
+        d_fluence_rz = cuda.to_device(np.zeros_like(fluence_rz))
+        
+        _run_photons_cuda[n_blocks, self.CUDA_BLOCK](
+            *(cuda.to_device(layers[k]) for k in ('z_top', 'z_bottom', 'mua_over_mut', 'inv_mu_t', 'g')),
+            r_specular, self.WEIGHT_THRESHOLD, self.ROULETTE_CHANCE, self.COS_CRITICAL,
+            cuda.to_device(fresnel_lut), cuda.to_device(cos_tir), n_photons,
+            self.MAX_STEPS, inv_dz, inv_dr, rng_states,
+            d_totals, d_fluence_z, d_fluence_rz)
+        
+        fluence_z += d_fluence_z.copy_to_host()
+        fluence_rz += d_fluence_rz.copy_to_host()
+        return tuple(d_totals.copy_to_host().tolist())
     
     def run(self, n_photons: int = 100000, wavelength: float = 630.0,
-            geometry: str = 'pencil_beam', verbose: bool = True) -> SimulationResult:
+            geometry: str = 'pencil_beam', verbose: bool = True,
+            backend: Optional[str] = None) -> SimulationResult:
         """
         Run Monte Carlo simulation.
         
@@ -474,6 +1263,11 @@ class MonteCarloSimulator:
             Source geometry ('pencil_beam', 'gaussian', 'fiber')
         verbose : bool
             Print progress
+        backend : str, optional
+            Transport backend: 'numba' (JIT, parallel over CPU cores), 'numpy'
+            (vectorized photon batches), 'cuda' (GPU kernel, for very large
+            photon counts), 'python' (reference loop) or 'auto'.
+            Defaults to self.backend.
             
         Returns:
         --------
@@ -482,6 +1276,16 @@ class MonteCarloSimulator:
         if len(self.layers) == 0:
             raise ValueError("No layers defined. Use add_layer() first.")
         
+        backend = backend or self.backend
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from {self.BACKENDS}")
+        if backend == 'auto':
+            backend = 'numba' if NUMBA_AVAILABLE else 'numpy'
+        elif backend == 'numba' and not NUMBA_AVAILABLE:
+            raise ImportError("numba is required for backend='numba'")
+        elif backend == 'cuda' and not CUDA_AVAILABLE:
+            raise ImportError("backend='cuda' requires numba.cuda and a CUDA GPU")
+        
         start_time = time.time()
         
         # Initialize scoring arrays
@@ -489,6 +1293,8 @@ class MonteCarloSimulator:
         r_bins = np.linspace(0, self.r_max, self.n_r + 1)
         dz = z_bins[1] - z_bins[0]
         dr = r_bins[1] - r_bins[0]
+        inv_dz = self.n_z / self.z_max
+        inv_dr = self.n_r / self.r_max
         
         fluence_z = np.zeros(self.n_z)
         fluence_rz = np.zeros((self.n_r, self.n_z))
@@ -497,35 +1303,37 @@ class MonteCarloSimulator:
         total_transmitted = 0.0
         total_absorbed = 0.0
         
-        # Run simulation
-        report_interval = max(1, n_photons // 10)
+        # Pack layer properties once; layers start at the surface (z = 0), so
+        # the specular reflectance is fixed for the whole simulation
+        packed = self._layer_arrays()
+        r_specular = self._fresnel_reflectance(self.n_ambient, self.layers[0].n, 1.0)
+        run_batch = {
+            'numba': self._run_batch_numba,
+            'numpy': self._run_batch_numpy,
+            'cuda': self._run_batch_cuda,
+            'python': self._run_batch_python,
+        }[backend]
         
-        for i in range(n_photons):
-            if verbose and (i + 1) % report_interval == 0:
-                progress = (i + 1) / n_photons * 100
-                elapsed = time.time() - start_time
-                rate = (i + 1) / elapsed
-                print(f"  Progress: {progress:.0f}% ({rate:.0f} photons/s)")
-            
-            reflected, transmitted, absorbed, deposits = self._trace_photon()
+        # Run simulation in batches, reporting progress between them. The
+        # NumPy backend runs as one batch: each batch pays for its own tail of
+        # long-lived photons, which dominates at small vector widths.
+        n_batches = 1 if backend == 'numpy' else 10
+        batch_size = max(1, -(-n_photons // n_batches))
+        
+        for start in range(0, n_photons, batch_size):
+            n_batch = min(batch_size, n_photons - start)
+            reflected, transmitted, absorbed = run_batch(
+                n_batch, packed, r_specular, inv_dz, inv_dr, fluence_z, fluence_rz)
             
             total_reflected += reflected
             total_transmitted += transmitted
             total_absorbed += absorbed
             
-            # Score deposits
-            for dep in deposits:
-                if len(dep) == 3:
-                    z_dep, r_dep, w_dep = dep
-                    
-                    iz = int(z_dep / dz)
-                    ir = int(r_dep / dr)
-                    
-                    if 0 <= iz < self.n_z:
-                        fluence_z[iz] += w_dep
-                        
-                        if 0 <= ir < self.n_r:
-                            fluence_rz[ir, iz] += w_dep
+            if verbose:
+                done = start + n_batch
+                elapsed = time.time() - start_time
+                print(f"  Progress: {done / n_photons * 100:.0f}% "
+                      f"({done / elapsed:.0f} photons/s)")
         
         # Normalize
         total_reflected /= n_photons
@@ -533,16 +1341,9 @@ class MonteCarloSimulator:
         total_absorbed /= n_photons
         
         # Normalize fluence (per unit volume)
-        for iz in range(self.n_z):
-            z_center = (z_bins[iz] + z_bins[iz + 1]) / 2
-            fluence_z[iz] /= (n_photons * dz)
-        
-        for ir in range(self.n_r):
-            r_center = (r_bins[ir] + r_bins[ir + 1]) / 2
-            ring_area = np.pi * ((r_bins[ir + 1])**2 - (r_bins[ir])**2)
-            for iz in range(self.n_z):
-                if ring_area > 0:
-                    fluence_rz[ir, iz] /= (n_photons * ring_area * dz)
+        fluence_z /= (n_photons * dz)
+        ring_area = np.pi * np.diff(r_bins**2)
+        fluence_rz /= (n_photons * dz * ring_area[:, None])
         
         # Calculate penetration depths
         z_centers = (z_bins[:-1] + z_bins[1:]) / 2
@@ -563,12 +1364,12 @@ class MonteCarloSimulator:
         
         # Fit effective attenuation
         valid = fluence_z > 0
-        if np.sum(valid) > 2:
-            z_valid = z_centers[valid]
-            f_valid = fluence_z[valid]
-            # Linear fit in log space
-            coeffs = np.polyfit(z_valid, np.log(f_valid), 1)
-            mu_eff = -coeffs[0]
+        if np.count_nonzero(valid) > 2:
+            # Least-squares slope of log(fluence) vs depth, in closed form
+            z_fit = z_centers[valid]
+            z_fit = z_fit - z_fit.mean()
+            log_f = np.log(fluence_z[valid])
+            mu_eff = -float(np.dot(z_fit, log_f - log_f.mean()) / np.dot(z_fit, z_fit))
         else:
             mu_eff = 0.0
         
@@ -605,6 +1406,46 @@ class MonteCarloSimulator:
             print(f"   Time: {elapsed:.2f}s ({n_photons/elapsed:.0f} photons/s)")
         
         return result
+    
+    def run_wavelengths(self, tissue_id: str, wavelengths: List[float],
+                        n_photons: int = 50000, thickness: float = np.inf,
+                        verbose: bool = False,
+                        backend: Optional[str] = None) -> List[SimulationResult]:
+        """
+        Simulate a single tissue layer at several wavelengths.
+        
+        One simulator, tissue database, RNG stream and set of compiled
+        kernels serve the whole sweep, so only the first wavelength pays
+        any setup cost. Replaces the simulator's current layers.
+        
+        Parameters:
+        -----------
+        tissue_id : str
+            Tissue ID from database
+        wavelengths : list of float
+            Wavelengths in nm
+        n_photons : int
+            Number of photons per wavelength
+        thickness : float
+            Layer thickness in mm (np.inf for semi-infinite)
+        verbose : bool
+            Print progress for each run
+        backend : str, optional
+            Transport backend, as for run()
+            
+        Returns:
+        --------
+        list of SimulationResult, one per wavelength
+        """
+        from photonpath import TissueDB
+        db = TissueDB()
+        
+        results = []
+        for wl in wavelengths:
+            self.reset()
+            self.add_layer_from_db(tissue_id, wl, thickness=thickness, db=db)
+            results.append(self.run(n_photons, wl, verbose=verbose, backend=backend))
+        return results
 
 
 # ============================================================================
@@ -730,8 +1571,9 @@ if __name__ == "__main__":
     print("=" * 60)
     
     wavelengths = [480, 530, 630, 800]
-    for wl in wavelengths:
-        result = simulate_single_layer("brain_gray_matter", wl, n_photons=5000)
+    sim = MonteCarloSimulator()
+    results = sim.run_wavelengths("brain_gray_matter", wavelengths, n_photons=5000)
+    for wl, result in zip(wavelengths, results):
         print(f"  {wl}nm: δ = {result.penetration_depth_1e:.2f} mm, "
               f"R = {result.reflectance:.1%}")
     
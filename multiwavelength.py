@@ -17,6 +17,46 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
 
+# Classification buckets: ascending thresholds and one label per interval,
+# looked up with np.searchsorted so they also apply to arrays of values
+_FIT_QUALITY_THRESHOLDS = np.array([0.5, 0.8, 0.95])
+_FIT_QUALITY_LABELS = np.array(["poor", "fair", "good", "excellent"])
+
+_CROSSTALK_SEVERITY_THRESHOLDS = np.array([0.01, 0.05, 0.2])
+_CROSSTALK_SEVERITY_LABELS = np.array(["negligible", "low", "moderate", "high"])
+
+_CROSSTALK_ADVICE_THRESHOLDS = np.array([0.01, 0.2])
+_CROSSTALK_ADVICE_LABELS = np.array(["No correction needed",
+                                     "Linear unmixing recommended",
+                                     "Choose different wavelengths"])
+
+
+def _penetration_depth(mu_eff: np.ndarray) -> np.ndarray:
+    """Penetration depth 1/mu_eff (mm), or 10 mm where mu_eff is not positive."""
+    penetration = np.full_like(mu_eff, 10.0)
+    np.reciprocal(mu_eff, out=penetration, where=mu_eff > 0)
+    return penetration
+
+
+# exp(-50) ~ 2e-22 is already far below any reported precision
+_GAUSSIAN_TAIL_CUTOFF = 50.0
+
+
+def _gaussian_overlap(separation, bandwidth: float):
+    """
+    Gaussian filter overlap exp(-sep^2 / (2 bw^2)) for scalars or arrays.
+    
+    Exponents beyond _GAUSSIAN_TAIL_CUTOFF are set to zero without
+    evaluating exp, which is the common case for widely separated channels.
+    """
+    sep = np.asarray(separation, dtype=np.float64)
+    z = sep * sep / (2.0 * bandwidth * bandwidth)
+    overlap = np.zeros_like(z)
+    valid = z < _GAUSSIAN_TAIL_CUTOFF
+    overlap[valid] = np.exp(-z[valid])
+    return overlap[()] if overlap.ndim == 0 else overlap
+
+
 @dataclass
 class WavelengthOptimizationResult:
     """Result of wavelength optimization."""
@@ -53,37 +93,25 @@ def multi_wavelength_sweep(
     """
     wavelengths = np.arange(wavelength_min, wavelength_max + 1, step)
     
-    mu_a = []
-    mu_s_prime = []
-    mu_eff = []
-    penetration = []
-    albedo = []
-    
-    for wl in wavelengths:
-        props = tissue_db.get_properties(tissue_id, float(wl))
-        mu_a.append(props.mu_a)
-        mu_s_prime.append(props.mu_s_prime)
-        
-        eff = np.sqrt(3 * props.mu_a * (props.mu_a + props.mu_s_prime))
-        mu_eff.append(eff)
-        penetration.append(1.0 / eff if eff > 0 else 10.0)
-        albedo.append(props.mu_s_prime / (props.mu_a + props.mu_s_prime))
+    mu_a, mu_s_prime = tissue_db.get_properties_batch(tissue_id, wavelengths)
+    mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+    penetration = _penetration_depth(mu_eff)
+    albedo = mu_s_prime / (mu_a + mu_s_prime)
     
     # Find optimal wavelengths
-    pen_array = np.array(penetration)
-    best_pen_idx = np.argmax(pen_array)
+    best_pen_idx = np.argmax(penetration)
     
     return {
         "tissue_id": tissue_id,
         "wavelengths_nm": wavelengths.tolist(),
-        "mu_a": [round(x, 6) for x in mu_a],
-        "mu_s_prime": [round(x, 4) for x in mu_s_prime],
-        "mu_eff": [round(x, 4) for x in mu_eff],
-        "penetration_depth_mm": [round(x, 3) for x in penetration],
-        "albedo": [round(x, 4) for x in albedo],
+        "mu_a": np.round(mu_a, 6).tolist(),
+        "mu_s_prime": np.round(mu_s_prime, 4).tolist(),
+        "mu_eff": np.round(mu_eff, 4).tolist(),
+        "penetration_depth_mm": np.round(penetration, 3).tolist(),
+        "albedo": np.round(albedo, 4).tolist(),
         "analysis": {
             "best_penetration_wavelength_nm": float(wavelengths[best_pen_idx]),
-            "best_penetration_depth_mm": round(penetration[best_pen_idx], 3),
+            "best_penetration_depth_mm": round(float(penetration[best_pen_idx]), 3),
             "min_absorption_wavelength_nm": float(wavelengths[np.argmin(mu_a)]),
             "therapeutic_window": {
                 "start_nm": 600,
@@ -123,30 +151,32 @@ def optimize_wavelength_for_depth(
     """
     wavelengths = np.arange(wavelength_range[0], wavelength_range[1] + 1, 5)
     
-    results = []
-    for wl in wavelengths:
-        props = tissue_db.get_properties(tissue_id, float(wl))
-        mu_eff = np.sqrt(3 * props.mu_a * (props.mu_a + props.mu_s_prime))
-        
-        # Power remaining at target depth
-        power_fraction = np.exp(-mu_eff * target_depth_mm)
-        
-        # Score: higher is better
-        # Penalize if power fraction is too low
-        if power_fraction >= min_power_efficiency:
-            score = power_fraction * 100
-        else:
-            score = power_fraction * 100 * (power_fraction / min_power_efficiency)
-        
-        results.append({
-            "wavelength": float(wl),
-            "power_at_depth": round(power_fraction, 4),
-            "penetration_depth_mm": round(1/mu_eff if mu_eff > 0 else 10, 3),
-            "score": round(score, 1)
-        })
+    mu_a, mu_s_prime = tissue_db.get_properties_batch(tissue_id, wavelengths)
+    mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+    
+    # Power remaining at target depth
+    power_fraction = np.exp(-mu_eff * target_depth_mm)
+    penetration = _penetration_depth(mu_eff)
     
-    # Sort by score
-    results.sort(key=lambda x: x["score"], reverse=True)
+    # Score: higher is better
+    # Penalize if power fraction is too low
+    score = np.where(power_fraction >= min_power_efficiency,
+                     power_fraction * 100,
+                     power_fraction * 100 * (power_fraction / min_power_efficiency))
+    score = np.round(score, 1)
+    
+    # Sort by score (stable, so ties keep wavelength order); only the top 5
+    # are reported
+    top = np.argsort(-score, kind='stable')[:5]
+    results = [
+        {
+            "wavelength": float(wavelengths[k]),
+            "power_at_depth": round(float(power_fraction[k]), 4),
+            "penetration_depth_mm": round(float(penetration[k]), 3),
+            "score": float(score[k])
+        }
+        for k in top
+    ]
     
     best = results[0]
     
@@ -183,23 +213,32 @@ def multi_tissue_wavelength_comparison(
     --------
     dict : Comparison matrix
     """
+    # Validate every tissue up front so the loop below cannot fail
+    available = set(tissue_db.tissue_list)
+    unknown = [tid for tid in tissue_ids if tid not in available]
+    if unknown:
+        raise ValueError(f"Unknown tissue(s): {', '.join(unknown)}. "
+                         f"Available: {tissue_db.tissue_list}")
+    
     comparison = {}
+    wl_arr = np.asarray(wavelengths, dtype=np.float64)
+    wl_keys = [str(int(wl)) for wl in wavelengths]
     
-    for tissue_id in tissue_ids:
-        tissue_data = {}
-        for wl in wavelengths:
-            try:
-                props = tissue_db.get_properties(tissue_id, wl)
-                mu_eff = np.sqrt(3 * props.mu_a * (props.mu_a + props.mu_s_prime))
-                tissue_data[str(int(wl))] = {
-                    "mu_a": round(props.mu_a, 6),
-                    "mu_s_prime": round(props.mu_s_prime, 4),
-                    "penetration_mm": round(1/mu_eff if mu_eff > 0 else 10, 3)
-                }
-            except Exception as e:
-                tissue_data[str(int(wl))] = {"error": str(e)}
-        
-        comparison[tissue_id] = tissue_data
+    # All tissues in one (tissues x wavelengths) evaluation
+    matrix = tissue_db.spectrum_matrix(tissue_ids, wl_arr)
+    mu_a, mu_s_prime = matrix['mu_a'], matrix['mu_s_prime']
+    mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+    penetration = _penetration_depth(mu_eff)
+    
+    rows = zip(tissue_ids,
+               np.round(mu_a, 6).tolist(),
+               np.round(mu_s_prime, 4).tolist(),
+               np.round(penetration, 3).tolist())
+    for tissue_id, row_a, row_s, row_p in rows:
+        comparison[tissue_id] = {
+            key: {"mu_a": a, "mu_s_prime": s, "penetration_mm": p}
+            for key, a, s, p in zip(wl_keys, row_a, row_s, row_p)
+        }
     
     return {
         "tissues": tissue_ids,
@@ -257,11 +296,11 @@ def plan_dual_wavelength_experiment(
         purpose2 = "NIR - deepest penetration"
     
     # Get properties at both wavelengths
-    props1 = tissue_db.get_properties(tissue_id, wl1)
-    props2 = tissue_db.get_properties(tissue_id, wl2)
-    
-    mu_eff1 = np.sqrt(3 * props1.mu_a * (props1.mu_a + props1.mu_s_prime))
-    mu_eff2 = np.sqrt(3 * props2.mu_a * (props2.mu_a + props2.mu_s_prime))
+    mu_a, mu_s_prime = tissue_db.get_properties_batch(tissue_id, [wl1, wl2])
+    mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+    pen1, pen2 = _penetration_depth(mu_eff).tolist()
+    mu_a1, mu_a2 = mu_a.tolist()
+    mu_s_prime1, mu_s_prime2 = mu_s_prime.tolist()
     
     return {
         "application": application,
@@ -269,18 +308,18 @@ def plan_dual_wavelength_experiment(
         "wavelength_1": {
             "wavelength_nm": wl1,
             "purpose": purpose1,
-            "mu_a": round(props1.mu_a, 6),
-            "mu_s_prime": round(props1.mu_s_prime, 4),
-            "penetration_mm": round(1/mu_eff1, 3)
+            "mu_a": round(mu_a1, 6),
+            "mu_s_prime": round(mu_s_prime1, 4),
+            "penetration_mm": round(pen1, 3)
         },
         "wavelength_2": {
             "wavelength_nm": wl2,
             "purpose": purpose2,
-            "mu_a": round(props2.mu_a, 6),
-            "mu_s_prime": round(props2.mu_s_prime, 4),
-            "penetration_mm": round(1/mu_eff2, 3)
+            "mu_a": round(mu_a2, 6),
+            "mu_s_prime": round(mu_s_prime2, 4),
+            "penetration_mm": round(pen2, 3)
         },
-        "penetration_ratio": round((1/mu_eff2) / (1/mu_eff1), 2),
+        "penetration_ratio": round(pen2 / pen1, 2),
         "recommended_filters": {
             "wavelength_1": f"BP{wl1}/20",
             "wavelength_2": f"BP{wl2}/20",
@@ -291,12 +330,16 @@ def plan_dual_wavelength_experiment(
 
 def spectral_unmixing_analysis(
     measured_spectrum: Dict[float, float],
-    components: Dict[str, Dict[float, float]]
+    components: Dict[str, Dict[float, float]],
+    return_dict: bool = False,
+    nonnegative: bool = False
 ) -> Dict:
     """
     Perform spectral unmixing to determine component concentrations.
     
-    Uses least-squares fitting.
+    Uses least-squares fitting: the normal equations for the usual
+    tall-skinny (few components) case, falling back to SVD-based lstsq when
+    they are singular.
     
     Parameters:
     -----------
@@ -304,31 +347,57 @@ def spectral_unmixing_analysis(
         {wavelength: intensity} measured values
     components : dict
         {component_name: {wavelength: intensity}} reference spectra
+    return_dict : bool
+        Also return the deprecated {wavelength: intensity} 'fitted_spectrum'
+        dict alongside the parallel lists
+    nonnegative : bool
+        Solve a true non-negative least-squares problem (scipy nnls) instead
+        of clamping negative concentrations of the unconstrained fit
         
     Returns:
     --------
-    dict : Unmixing results with component fractions
+    dict : Unmixing results with component fractions; the fitted spectrum
+    is given as parallel 'fitted_wavelengths' / 'fitted_intensities' lists
     """
     wavelengths = sorted(measured_spectrum.keys())
+    wl_arr = np.array(wavelengths, dtype=np.float64)
     n_wl = len(wavelengths)
     n_components = len(components)
     
-    # Build matrix A (wavelengths × components)
+    # Build matrix A (wavelengths × components): each reference spectrum is
+    # materialized once as sorted arrays and matched to the measured
+    # wavelengths by binary search; wavelengths it lacks contribute 0
     A = np.zeros((n_wl, n_components))
     component_names = list(components.keys())
     
     for j, comp_name in enumerate(component_names):
-        for i, wl in enumerate(wavelengths):
-            A[i, j] = components[comp_name].get(wl, 0)
+        spectrum = components[comp_name]
+        if not spectrum:
+            continue
+        comp_wl = np.fromiter(spectrum.keys(), dtype=np.float64, count=len(spectrum))
+        comp_val = np.fromiter(spectrum.values(), dtype=np.float64, count=len(spectrum))
+        order = np.argsort(comp_wl)
+        comp_wl, comp_val = comp_wl[order], comp_val[order]
+        
+        idx = np.minimum(np.searchsorted(comp_wl, wl_arr), len(comp_wl) - 1)
+        A[:, j] = np.where(comp_wl[idx] == wl_arr, comp_val[idx], 0.0)
     
     # Measured values
-    b = np.array([measured_spectrum[wl] for wl in wavelengths])
+    b = np.fromiter((measured_spectrum[wl] for wl in wavelengths),
+                    dtype=np.float64, count=n_wl)
     
     # Solve least squares with non-negative constraint
-    # Using simple approach: solve, then clamp negatives
+    # Default approach: solve, then clamp negatives
     try:
-        x, residuals, rank, s = np.linalg.lstsq(A, b, rcond=None)
-        x = np.maximum(x, 0)  # Non-negative
+        if nonnegative:
+            from scipy.optimize import nnls
+            x, _ = nnls(A, b)
+        else:
+            try:
+                x = np.linalg.solve(A.T @ A, A.T @ b)
+            except np.linalg.LinAlgError:
+                x = np.linalg.lstsq(A, b, rcond=None)[0]
+            x = np.maximum(x, 0)  # Non-negative
         
         # Normalize to fractions
         total = np.sum(x)
@@ -337,26 +406,34 @@ def spectral_unmixing_analysis(
         else:
             fractions = x
         
-        # Calculate residual
+        # Calculate residual (sums of squares as dot products, computed once)
         fitted = A @ x
-        residual = np.sqrt(np.mean((b - fitted) ** 2))
-        r_squared = 1 - np.sum((b - fitted) ** 2) / np.sum((b - np.mean(b)) ** 2)
+        diff = b - fitted
+        ss_res = np.dot(diff, diff)
+        b_centered = b - b.mean()
+        ss_tot = np.dot(b_centered, b_centered)
+        residual = np.sqrt(ss_res / n_wl)
+        r_squared = 1 - ss_res / ss_tot
         
         result = {
             "components": {
-                name: {
-                    "concentration": round(float(x[i]), 4),
-                    "fraction": round(float(fractions[i]), 4)
-                }
-                for i, name in enumerate(component_names)
+                name: {"concentration": conc, "fraction": frac}
+                for name, conc, frac in zip(component_names,
+                                            np.round(x, 4).tolist(),
+                                            np.round(fractions, 4).tolist())
             },
             "fit_quality": {
                 "residual": round(float(residual), 4),
                 "r_squared": round(float(max(0, r_squared)), 4),
-                "quality": "excellent" if r_squared > 0.95 else "good" if r_squared > 0.8 else "fair" if r_squared > 0.5 else "poor"
+                # Lower-bound-exclusive buckets (r² > threshold)
+                "quality": str(_FIT_QUALITY_LABELS[np.searchsorted(
+                    _FIT_QUALITY_THRESHOLDS, max(0, r_squared), side='left')])
             },
-            "fitted_spectrum": {wl: round(float(fitted[i]), 4) for i, wl in enumerate(wavelengths)}
+            "fitted_wavelengths": wavelengths,
+            "fitted_intensities": np.round(fitted, 4).tolist()
         }
+        if return_dict:
+            result["fitted_spectrum"] = dict(zip(wavelengths, result["fitted_intensities"]))
         
     except Exception as e:
         result = {
@@ -391,11 +468,11 @@ def calculate_crosstalk(
     """
     # Excitation crosstalk
     ex_separation = abs(channel_1["excitation_nm"] - channel_2["excitation_nm"])
-    ex_crosstalk = np.exp(-(ex_separation ** 2) / (2 * filter_bandwidth ** 2))
+    ex_crosstalk = _gaussian_overlap(ex_separation, filter_bandwidth)
     
     # Emission crosstalk
     em_separation = abs(channel_1["emission_nm"] - channel_2["emission_nm"])
-    em_crosstalk = np.exp(-(em_separation ** 2) / (2 * filter_bandwidth ** 2))
+    em_crosstalk = _gaussian_overlap(em_separation, filter_bandwidth)
     
     # Total crosstalk (assume independent)
     total_crosstalk = ex_crosstalk * em_crosstalk
@@ -408,6 +485,8 @@ def calculate_crosstalk(
         "excitation_crosstalk": round(ex_crosstalk * 100, 2),
         "emission_crosstalk": round(em_crosstalk * 100, 2),
         "total_crosstalk_percent": round(total_crosstalk * 100, 3),
-        "severity": "negligible" if total_crosstalk < 0.01 else "low" if total_crosstalk < 0.05 else "moderate" if total_crosstalk < 0.2 else "high",
-        "recommendation": "No correction needed" if total_crosstalk < 0.01 else "Linear unmixing recommended" if total_crosstalk < 0.2 else "Choose different wavelengths"
+        "severity": str(_CROSSTALK_SEVERITY_LABELS[np.searchsorted(
+            _CROSSTALK_SEVERITY_THRESHOLDS, total_crosstalk, side='right')]),
+        "recommendation": str(_CROSSTALK_ADVICE_LABELS[np.searchsorted(
+            _CROSSTALK_ADVICE_THRESHOLDS, total_crosstalk, side='right')])
     }
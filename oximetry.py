@@ -12,9 +12,17 @@ Version: 1.0.0
 """
 
 import numpy as np
+from functools import lru_cache
 from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 
+# Numba is optional: fused, multi-threaded StO2 kernel for large images
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 # ============================================================================
 # HEMOGLOBIN EXTINCTION COEFFICIENTS
@@ -65,10 +73,69 @@ HEMOGLOBIN_EXTINCTION = {
     1000: (528, 258),
 }
 
+# Structure-of-arrays copy of the table, built once in wavelength order:
+# _WL_SORTED is the grid and _EXTINCTION holds one contiguous row per species
+# (row 0 = HbO2, row 1 = Hb). All numerical code reads these; the dict above
+# stays as the human-readable source and public constant. The coefficients
+# are integers below 2**24, so float32 stores them exactly; np.interp still
+# interpolates in float64.
+_table = sorted(HEMOGLOBIN_EXTINCTION.items())
+_WL_SORTED = np.array([wl for wl, _ in _table], dtype=np.float64)
+_EXTINCTION = np.array([eps for _, eps in _table], dtype=np.float32).T.copy()
+_E_HBO2, _E_HB = _EXTINCTION
+del _table
+
+# Physiological interpretation of StO2: ascending thresholds and one note
+# per interval (StO2 > threshold), looked up with np.searchsorted
+_STO2_THRESHOLDS = np.array([0.50, 0.70, 0.95])
+_STO2_NOTES = np.array(["Severe hypoxia or measurement artifact",
+                        "Reduced oxygenation - potential hypoxia",
+                        "Normal venous/tissue oxygenation",
+                        "Normal arterial oxygenation"])
+
 # Isosbestic points (where HbO2 ≈ Hb)
 ISOSBESTIC_POINTS = [390, 422, 452, 500, 530, 545, 570, 584, 797]
 
 
+# Arrays smaller than this take the NumPy path (no JIT dispatch/compile cost)
+_JIT_MIN_PIXELS = 4096
+
+
+# ============================================================================
+# NUMBA KERNELS
+# ============================================================================
+
+if NUMBA_AVAILABLE:
+    
+    @njit(parallel=True, cache=True)
+    def _sto2_kernel(mu_a_1, mu_a_2, e1_HbO2, e1_Hb, e2_HbO2, e2_Hb, det,
+                     pathlength_factor, out_StO2, out_HbO2, out_Hb):
+        """
+        Cramer's-rule StO2 solve fused into one pass over flattened pixels.
+        Same clipping/defaults as the NumPy path, including NaN propagation.
+        """
+        inv_det = 1.0 / det
+        inv_dpf = 1.0 / pathlength_factor
+        for k in prange(mu_a_1.shape[0]):
+            a1 = mu_a_1[k] * inv_dpf
+            a2 = mu_a_2[k] * inv_dpf
+            c_HbO2 = (a1 * e2_Hb - a2 * e1_Hb) * inv_det
+            c_Hb = (e1_HbO2 * a2 - e2_HbO2 * a1) * inv_det
+            if c_HbO2 < 0.0:
+                c_HbO2 = 0.0
+            if c_Hb < 0.0:
+                c_Hb = 0.0
+            total = c_HbO2 + c_Hb
+            s = c_HbO2 / total if total > 0.0 else 0.5
+            if s < 0.0:
+                s = 0.0
+            elif s > 1.0:
+                s = 1.0
+            out_StO2[k] = s
+            out_HbO2[k] = c_HbO2
+            out_Hb[k] = c_Hb
+
+
 @dataclass
 class OximetryResult:
     """Blood oxygenation measurement result."""
@@ -86,7 +153,7 @@ class OximetryResult:
 def get_extinction_coefficients(wavelength: float) -> Tuple[float, float]:
     """
     Get HbO2 and Hb extinction coefficients at a wavelength.
-    Uses linear interpolation between known values.
+    Uses linear interpolation between known values (clamped at the ends).
     
     Parameters:
     -----------
@@ -97,28 +164,34 @@ def get_extinction_coefficients(wavelength: float) -> Tuple[float, float]:
     --------
     tuple : (epsilon_HbO2, epsilon_Hb) in cm^-1 M^-1
     """
-    wavelengths = sorted(HEMOGLOBIN_EXTINCTION.keys())
-    
-    if wavelength <= wavelengths[0]:
-        return HEMOGLOBIN_EXTINCTION[wavelengths[0]]
-    if wavelength >= wavelengths[-1]:
-        return HEMOGLOBIN_EXTINCTION[wavelengths[-1]]
-    
-    # Find bracketing wavelengths
-    for i in range(len(wavelengths) - 1):
-        if wavelengths[i] <= wavelength <= wavelengths[i + 1]:
-            wl1, wl2 = wavelengths[i], wavelengths[i + 1]
-            e1 = HEMOGLOBIN_EXTINCTION[wl1]
-            e2 = HEMOGLOBIN_EXTINCTION[wl2]
-            
-            # Linear interpolation
-            t = (wavelength - wl1) / (wl2 - wl1)
-            epsilon_HbO2 = e1[0] + t * (e2[0] - e1[0])
-            epsilon_Hb = e1[1] + t * (e2[1] - e1[1])
-            
-            return (epsilon_HbO2, epsilon_Hb)
+    # Keyed on the exact wavelength: repeated pairs (e.g. per-pixel
+    # oximetry loops) hit the cache without changing the interpolation
+    return _extinction_cached(float(wavelength))
+
+
+@lru_cache(maxsize=4096)
+def _extinction_cached(wavelength: float) -> Tuple[float, float]:
+    """Memoized extinction lookup, keyed on the wavelength as a float."""
+    return (float(np.interp(wavelength, _WL_SORTED, _E_HBO2)),
+            float(np.interp(wavelength, _WL_SORTED, _E_HB)))
+
+
+def get_extinction_coefficients_vec(wavelengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized get_extinction_coefficients over an array of wavelengths.
     
-    return HEMOGLOBIN_EXTINCTION[wavelengths[-1]]
+    Parameters:
+    -----------
+    wavelengths : array-like
+        Wavelengths in nm
+        
+    Returns:
+    --------
+    tuple : (epsilon_HbO2, epsilon_Hb) arrays in cm^-1 M^-1
+    """
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    return (np.interp(wavelengths, _WL_SORTED, _E_HBO2),
+            np.interp(wavelengths, _WL_SORTED, _E_HB))
 
 
 def calculate_StO2_dual_wavelength(
@@ -151,32 +224,10 @@ def calculate_StO2_dual_wavelength(
     --------
     OximetryResult : Oxygen saturation and concentrations
     """
-    # Get extinction coefficients (convert from cm^-1 M^-1 to mm^-1 μM^-1)
-    # Factor: 1 cm = 10 mm, 1 M = 10^6 μM
-    # So: cm^-1 M^-1 → mm^-1 μM^-1 = × 10^-7
-    
-    e1_HbO2, e1_Hb = get_extinction_coefficients(wavelength_1)
-    e2_HbO2, e2_Hb = get_extinction_coefficients(wavelength_2)
+    sat = calculate_StO2_dual_wavelength_batch(
+        mu_a_1, mu_a_2, wavelength_1, wavelength_2, pathlength_factor)
     
-    # Convert units: cm^-1 M^-1 to mm^-1 mM^-1
-    conv = 1e-4  # = 0.1 (cm to mm) × 1e-3 (M to mM)
-    e1_HbO2 *= conv
-    e1_Hb *= conv
-    e2_HbO2 *= conv
-    e2_Hb *= conv
-    
-    # Apply pathlength correction to measured absorption
-    mu_a_1_corr = mu_a_1 / pathlength_factor
-    mu_a_2_corr = mu_a_2 / pathlength_factor
-    
-    # Solve 2x2 system:
-    # μₐ₁ = ε₁_HbO2 × [HbO2] + ε₁_Hb × [Hb]
-    # μₐ₂ = ε₂_HbO2 × [HbO2] + ε₂_Hb × [Hb]
-    
-    # Using Cramer's rule
-    det = e1_HbO2 * e2_Hb - e1_Hb * e2_HbO2
-    
-    if abs(det) < 1e-10:
+    if sat is None:
         return OximetryResult(
             StO2=0.5, StO2_percent=50.0,
             HbO2_concentration=0, Hb_concentration=0, total_Hb=0,
@@ -185,22 +236,10 @@ def calculate_StO2_dual_wavelength(
             notes="Wavelengths too close - poor discrimination"
         )
     
-    c_HbO2 = (mu_a_1_corr * e2_Hb - mu_a_2_corr * e1_Hb) / det
-    c_Hb = (e1_HbO2 * mu_a_2_corr - e2_HbO2 * mu_a_1_corr) / det
-    
-    # Handle negative concentrations (measurement noise)
-    c_HbO2 = max(0, c_HbO2)
-    c_Hb = max(0, c_Hb)
-    
-    total_Hb = c_HbO2 + c_Hb
-    
-    if total_Hb > 0:
-        StO2 = c_HbO2 / total_Hb
-    else:
-        StO2 = 0.5  # Default if no signal
-    
-    # Clamp to valid range
-    StO2 = max(0, min(1, StO2))
+    StO2 = float(sat['StO2'])
+    c_HbO2 = float(sat['HbO2_concentration'])
+    c_Hb = float(sat['Hb_concentration'])
+    total_Hb = float(sat['total_Hb'])
     
     # Assess confidence based on wavelength separation and ratio
     wl_sep = abs(wavelength_2 - wavelength_1)
@@ -212,14 +251,7 @@ def calculate_StO2_dual_wavelength(
         confidence = "low"
     
     # Physiological notes
-    if StO2 > 0.95:
-        notes = "Normal arterial oxygenation"
-    elif StO2 > 0.70:
-        notes = "Normal venous/tissue oxygenation"
-    elif StO2 > 0.50:
-        notes = "Reduced oxygenation - potential hypoxia"
-    else:
-        notes = "Severe hypoxia or measurement artifact"
+    notes = str(_STO2_NOTES[np.searchsorted(_STO2_THRESHOLDS, StO2, side='left')])
     
     return OximetryResult(
         StO2=round(StO2, 4),
@@ -234,6 +266,121 @@ def calculate_StO2_dual_wavelength(
     )
 
 
+def calculate_StO2_dual_wavelength_batch(
+    mu_a_1: np.ndarray,
+    mu_a_2: np.ndarray,
+    wavelength_1: float,
+    wavelength_2: float,
+    pathlength_factor: float = 1.0
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Vectorized dual-wavelength StO2 for whole images or frame stacks.
+    
+    Same Beer-Lambert / Cramer's-rule solve as
+    calculate_StO2_dual_wavelength, applied elementwise to arrays of
+    absorption coefficients, with no per-pixel result objects.
+    
+    Parameters:
+    -----------
+    mu_a_1, mu_a_2 : array-like
+        Absorption coefficients at wavelengths 1 and 2 (mm^-1), same shape
+    wavelength_1, wavelength_2 : float
+        Measurement wavelengths (nm)
+    pathlength_factor : float
+        Differential pathlength factor (DPF), typically 1-6
+        
+    Returns:
+    --------
+    dict of arrays : 'StO2' (0-1), 'HbO2_concentration', 'Hb_concentration',
+    'total_Hb' (mM), or None if the wavelengths are too close to
+    discriminate the two species
+    """
+    system = _extinction_system(wavelength_1, wavelength_2)
+    if system is None:
+        return None
+    return _solve_StO2(mu_a_1, mu_a_2, system, pathlength_factor)
+
+
+def _extinction_system(wavelength_1: float,
+                       wavelength_2: float) -> Optional[Tuple[float, ...]]:
+    """
+    Extinction coefficients of the dual-wavelength system in mm^-1 mM^-1.
+    
+    Returns:
+    --------
+    tuple : (e1_HbO2, e1_Hb, e2_HbO2, e2_Hb, det), or None if the
+    wavelengths are too close to discriminate the two species
+    """
+    # Get extinction coefficients (convert from cm^-1 M^-1 to mm^-1 μM^-1)
+    # Factor: 1 cm = 10 mm, 1 M = 10^6 μM
+    # So: cm^-1 M^-1 → mm^-1 μM^-1 = × 10^-7
+    
+    e1_HbO2, e1_Hb = get_extinction_coefficients(wavelength_1)
+    e2_HbO2, e2_Hb = get_extinction_coefficients(wavelength_2)
+    
+    # Convert units: cm^-1 M^-1 to mm^-1 mM^-1
+    conv = 1e-4  # = 0.1 (cm to mm) × 1e-3 (M to mM)
+    e1_HbO2 *= conv
+    e1_Hb *= conv
+    e2_HbO2 *= conv
+    e2_Hb *= conv
+    
+    # Solve 2x2 system with Cramer's rule:
+    # μₐ₁ = ε₁_HbO2 × [HbO2] + ε₁_Hb × [Hb]
+    # μₐ₂ = ε₂_HbO2 × [HbO2] + ε₂_Hb × [Hb]
+    det = e1_HbO2 * e2_Hb - e1_Hb * e2_HbO2
+    if abs(det) < 1e-10:
+        return None
+    return e1_HbO2, e1_Hb, e2_HbO2, e2_Hb, det
+
+
+def _solve_StO2(mu_a_1: np.ndarray, mu_a_2: np.ndarray, system: Tuple[float, ...],
+                pathlength_factor: float) -> Dict[str, np.ndarray]:
+    """Elementwise Cramer's-rule solve for a system from _extinction_system."""
+    e1_HbO2, e1_Hb, e2_HbO2, e2_Hb, det = system
+    
+    mu_a_1 = np.asarray(mu_a_1, dtype=np.float64)
+    mu_a_2 = np.asarray(mu_a_2, dtype=np.float64)
+    
+    if NUMBA_AVAILABLE and mu_a_1.size >= _JIT_MIN_PIXELS:
+        shape = np.broadcast_shapes(mu_a_1.shape, mu_a_2.shape)
+        flat_1 = np.ascontiguousarray(np.broadcast_to(mu_a_1, shape)).ravel()
+        flat_2 = np.ascontiguousarray(np.broadcast_to(mu_a_2, shape)).ravel()
+        StO2 = np.empty(flat_1.size)
+        c_HbO2 = np.empty(flat_1.size)
+        c_Hb = np.empty(flat_1.size)
+        _sto2_kernel(flat_1, flat_2, e1_HbO2, e1_Hb, e2_HbO2, e2_Hb, det,
+                     float(pathlength_factor), StO2, c_HbO2, c_Hb)
+        StO2, c_HbO2, c_Hb = (a.reshape(shape) for a in (StO2, c_HbO2, c_Hb))
+        return {
+            "StO2": StO2,
+            "HbO2_concentration": c_HbO2,
+            "Hb_concentration": c_Hb,
+            "total_Hb": c_HbO2 + c_Hb
+        }
+    
+    # Apply pathlength correction to measured absorption
+    mu_a_1_corr = mu_a_1 / pathlength_factor
+    mu_a_2_corr = mu_a_2 / pathlength_factor
+    
+    # Negative concentrations (measurement noise) are clipped to zero
+    c_HbO2 = np.maximum((mu_a_1_corr * e2_Hb - mu_a_2_corr * e1_Hb) / det, 0.0)
+    c_Hb = np.maximum((e1_HbO2 * mu_a_2_corr - e2_HbO2 * mu_a_1_corr) / det, 0.0)
+    total_Hb = c_HbO2 + c_Hb
+    
+    # Default to 0.5 where there is no signal, then clamp to [0, 1]
+    StO2 = np.divide(c_HbO2, total_Hb, out=np.full_like(total_Hb, 0.5),
+                     where=total_Hb > 0)
+    np.clip(StO2, 0.0, 1.0, out=StO2)
+    
+    return {
+        "StO2": StO2,
+        "HbO2_concentration": c_HbO2,
+        "Hb_concentration": c_Hb,
+        "total_Hb": total_Hb
+    }
+
+
 def calculate_StO2_from_tissue(
     tissue_db,
     tissue_id: str,
@@ -275,6 +422,78 @@ def calculate_StO2_from_tissue(
     )
 
 
+class StO2ImageSolver:
+    """
+    Dual-wavelength StO2 solver precomputed for one tissue.
+    
+    Tissue properties, extinction coefficients and the system determinant
+    are fetched once in __init__; solve() then maps whole absorption images
+    (or hyperspectral frame stacks) to StO2 with the vectorized solve.
+    
+    Example:
+    --------
+    >>> solver = StO2ImageSolver(db, "skin_dermis", 660, 940)
+    >>> sto2 = solver.solve(mu_a_660_image, mu_a_940_image)
+    """
+    
+    BASELINE_MU_A = 0.01  # Approximate non-blood background absorption (mm^-1)
+    
+    def __init__(self, tissue_db, tissue_id: str, wavelength_1: float = 660,
+                 wavelength_2: float = 940, blood_volume_fraction: float = 0.05):
+        """
+        Parameters:
+        -----------
+        tissue_db : TissueDB
+            Tissue database instance
+        tissue_id : str
+            Tissue identifier
+        wavelength_1, wavelength_2 : float
+            Measurement wavelengths (nm)
+        blood_volume_fraction : float
+            Estimated blood volume fraction in tissue (0-1)
+        """
+        self.tissue_id = tissue_id
+        self.wavelength_1 = wavelength_1
+        self.wavelength_2 = wavelength_2
+        self.blood_volume_fraction = blood_volume_fraction
+        
+        # Tabulated tissue absorption at both wavelengths (reference values)
+        self.reference_mu_a = (tissue_db.get_properties(tissue_id, wavelength_1).mu_a,
+                               tissue_db.get_properties(tissue_id, wavelength_2).mu_a)
+        
+        self._system = _extinction_system(wavelength_1, wavelength_2)
+    
+    def solve(self, mu_a_1: np.ndarray, mu_a_2: np.ndarray) -> np.ndarray:
+        """
+        StO2 (0-1) for arrays of measured tissue absorption.
+        
+        Parameters:
+        -----------
+        mu_a_1, mu_a_2 : array-like
+            Tissue absorption coefficients at wavelengths 1 and 2 (mm^-1)
+            
+        Returns:
+        --------
+        np.ndarray : StO2 per element (0.5 everywhere if the wavelengths
+        cannot discriminate HbO2 from Hb)
+        """
+        mu_a_1 = np.asarray(mu_a_1, dtype=np.float64)
+        mu_a_2 = np.asarray(mu_a_2, dtype=np.float64)
+        if self._system is None:
+            return np.full(np.broadcast_shapes(mu_a_1.shape, mu_a_2.shape), 0.5)
+        
+        # Blood contribution to absorption
+        scale = 1.0 / self.blood_volume_fraction
+        blood_mu_a_1 = (mu_a_1 - self.BASELINE_MU_A) * scale
+        blood_mu_a_2 = (mu_a_2 - self.BASELINE_MU_A) * scale
+        
+        return _solve_StO2(blood_mu_a_1, blood_mu_a_2, self._system, 1.0)["StO2"]
+    
+    def solve_reference(self) -> float:
+        """StO2 implied by the tabulated tissue absorption (unrounded)."""
+        return float(self.solve(*self.reference_mu_a))
+
+
 def get_optimal_wavelength_pair(target_depth_mm: float = 5.0) -> Dict:
     """
     Recommend optimal wavelength pair for oximetry at a given depth.
@@ -346,21 +565,14 @@ def get_hemoglobin_spectrum(
     """
     wavelengths = np.arange(wavelength_min, wavelength_max + 1, step)
     
-    epsilon_HbO2 = []
-    epsilon_Hb = []
-    epsilon_mixed = []
-    
-    for wl in wavelengths:
-        e_HbO2, e_Hb = get_extinction_coefficients(wl)
-        epsilon_HbO2.append(e_HbO2)
-        epsilon_Hb.append(e_Hb)
-        epsilon_mixed.append(StO2 * e_HbO2 + (1 - StO2) * e_Hb)
+    epsilon_HbO2, epsilon_Hb = get_extinction_coefficients_vec(wavelengths)
+    epsilon_mixed = StO2 * epsilon_HbO2 + (1 - StO2) * epsilon_Hb
     
     return {
         "wavelengths_nm": wavelengths.tolist(),
-        "epsilon_HbO2": epsilon_HbO2,
-        "epsilon_Hb": epsilon_Hb,
-        "epsilon_blood": epsilon_mixed,
+        "epsilon_HbO2": epsilon_HbO2.tolist(),
+        "epsilon_Hb": epsilon_Hb.tolist(),
+        "epsilon_blood": epsilon_mixed.tolist(),
         "StO2": StO2,
         "units": "cm^-1 M^-1"
     }
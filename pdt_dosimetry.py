@@ -18,8 +18,10 @@ Author: PhotonPath
 Version: 1.0.0
 """
 
+import math
+from collections.abc import Mapping
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -158,6 +160,90 @@ PHOTOSENSITIZERS = {
 }
 
 
+class Photosensitizer(NamedTuple):
+    """Immutable photosensitizer record (attribute access instead of key lookups)."""
+    generic_name: str
+    type: PhotosensitizerType
+    activation_wavelength: float
+    absorption_peak: float
+    extinction_coefficient: float
+    singlet_oxygen_yield: float
+    drug_light_interval_h: float
+    typical_dose_mg_kg: float
+    approved_indications: List[str]
+    tissue_half_life_h: float
+    photosensitivity_days: float
+    notes: str
+
+
+# Record view used by the planning code; the dicts stay the serializable source
+PHOTOSENSITIZER_RECORDS = {ps_id: Photosensitizer(**ps) for ps_id, ps in PHOTOSENSITIZERS.items()}
+
+# Columnar view of the numeric photosensitizer properties (one record per
+# entry, in PHOTOSENSITIZERS order) for vectorized filtering; the dict above
+# remains the declarative source
+_PS_NUMERIC_FIELDS = ("activation_wavelength", "absorption_peak", "extinction_coefficient",
+                      "singlet_oxygen_yield", "drug_light_interval_h", "typical_dose_mg_kg",
+                      "tissue_half_life_h", "photosensitivity_days")
+
+PHOTOSENSITIZER_TABLE = np.array(
+    [(ps_id, *(getattr(ps, f) for f in _PS_NUMERIC_FIELDS))
+     for ps_id, ps in PHOTOSENSITIZER_RECORDS.items()],
+    dtype=[("id", "U32")] + [(f, np.float64) for f in _PS_NUMERIC_FIELDS]
+)
+
+# Ranking score used by compare_photosensitizers, rounded as reported, and
+# the resulting (stable) ranking; filtering a pre-ranked list keeps it ranked
+_PS_SCORE = np.array([round(score, 1) for score in (
+    PHOTOSENSITIZER_TABLE["extinction_coefficient"] / 1000          # Higher absorption = better
+    + PHOTOSENSITIZER_TABLE["singlet_oxygen_yield"] * 50            # Higher yield = better
+    + (800 - PHOTOSENSITIZER_TABLE["activation_wavelength"]) / 10   # Longer wavelength = better penetration
+    - PHOTOSENSITIZER_TABLE["photosensitivity_days"]                # Less photosensitivity = better
+).tolist()])
+_PS_RANKED = [(PHOTOSENSITIZER_TABLE["id"][i].item(), _PS_SCORE[i].item())
+              for i in np.argsort(-_PS_SCORE, kind='stable')]
+
+
+def select_photosensitizers(
+    wavelength_range: Optional[Tuple[float, float]] = None,
+    min_singlet_oxygen_yield: Optional[float] = None,
+    max_photosensitivity_days: Optional[float] = None,
+    max_drug_light_interval_h: Optional[float] = None
+) -> List[str]:
+    """
+    Find photosensitizers matching numeric criteria.
+    
+    Parameters:
+    -----------
+    wavelength_range : tuple, optional
+        (min, max) activation wavelength in nm, inclusive
+    min_singlet_oxygen_yield : float, optional
+        Minimum singlet oxygen quantum yield
+    max_photosensitivity_days : float, optional
+        Maximum duration of skin photosensitivity
+    max_drug_light_interval_h : float, optional
+        Maximum drug-light interval in hours
+        
+    Returns:
+    --------
+    list : Matching photosensitizer IDs, in database order
+    """
+    t = PHOTOSENSITIZER_TABLE
+    mask = np.ones(len(t), dtype=bool)
+    
+    if wavelength_range is not None:
+        mask &= (t["activation_wavelength"] >= wavelength_range[0]) & \
+                (t["activation_wavelength"] <= wavelength_range[1])
+    if min_singlet_oxygen_yield is not None:
+        mask &= t["singlet_oxygen_yield"] >= min_singlet_oxygen_yield
+    if max_photosensitivity_days is not None:
+        mask &= t["photosensitivity_days"] <= max_photosensitivity_days
+    if max_drug_light_interval_h is not None:
+        mask &= t["drug_light_interval_h"] <= max_drug_light_interval_h
+    
+    return t["id"][mask].tolist()
+
+
 # ============================================================================
 # THRESHOLD DOSES BY INDICATION
 # ============================================================================
@@ -231,11 +317,49 @@ PDT_THRESHOLD_DOSES = {
 }
 
 
+class PDTProtocol(NamedTuple):
+    """Immutable treatment protocol record."""
+    photosensitizer: str
+    fluence_J_cm2: float
+    irradiance_mW_cm2: float
+    exposure_time_s: float
+    wavelength_nm: float
+    source: str = ""
+
+
+PDT_PROTOCOLS = {ind: PDTProtocol(**p) for ind, p in PDT_THRESHOLD_DOSES.items()}
+
+# Protocol used for indications not listed above
+_DEFAULT_PROTOCOL = PDTProtocol(
+    photosensitizer="ALA",
+    fluence_J_cm2=100,
+    irradiance_mW_cm2=100,
+    exposure_time_s=1000,
+    wavelength_nm=635
+)
+
+# Upper bound on the depth correction applied to a protocol's fluence
+_MAX_FLUENCE_BOOST = 3.0
+
+# Thermal safety (max ~200 mW/cm² for prolonged exposure)
+_THERMAL_LIMIT_MW_CM2 = 200
+
+# Struct-of-arrays view of the protocols for indexed/vectorized planning:
+# row i is the i-th indication, and the last row (index -1) is the default
+_INDICATION_INDEX = {ind: i for i, ind in enumerate(PDT_PROTOCOLS)}
+_PROTOCOLS = [*PDT_PROTOCOLS.values(), _DEFAULT_PROTOCOL]
+
+_PROTOCOL_PS = [p.photosensitizer for p in _PROTOCOLS]
+_PROTOCOL_FLUENCE = np.array([p.fluence_J_cm2 for p in _PROTOCOLS], dtype=np.float64)
+_PROTOCOL_IRRADIANCE = np.array([p.irradiance_mW_cm2 for p in _PROTOCOLS], dtype=np.float64)
+_PROTOCOL_WAVELENGTH = np.array([p.wavelength_nm for p in _PROTOCOLS], dtype=np.float64)
+
+
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class PDTDoseResult:
     """PDT dosimetry calculation result."""
     # Light dose
@@ -259,7 +383,7 @@ class PDTDoseResult:
     notes: str
 
 
-@dataclass 
+@dataclass(slots=True)
 class TreatmentPlan:
     """Complete PDT treatment plan."""
     indication: str
@@ -293,16 +417,223 @@ class TreatmentPlan:
     notes: List[str]
 
 
+class _ResultRecord(Mapping):
+    """
+    Read-only dict interface for the calculation results: result["key"],
+    .get(), .keys() and dict(result) work as with the former return dicts.
+    
+    Keys are the field names, in declaration order, except where _RENAMED
+    gives the serialized key of a field.
+    """
+    __slots__ = ()
+    _RENAMED: Dict[str, str] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # dict key -> attribute
+        cls._KEYS = {cls._RENAMED.get(name, name): name
+                     for name in cls.__dict__.get("__annotations__", {})}
+    
+    def __getitem__(self, key: str):
+        try:
+            attr = self._KEYS[key]
+        except KeyError:
+            raise KeyError(key) from None
+        return getattr(self, attr)
+    
+    def __iter__(self):
+        return iter(self._KEYS)
+    
+    def __len__(self) -> int:
+        return len(self._KEYS)
+    
+    def to_dict(self) -> dict:
+        return {key: getattr(self, attr) for key, attr in self._KEYS.items()}
+
+
+@dataclass(slots=True)
+class FluenceResult(_ResultRecord):
+    """Light fluence at surface and depth (see calculate_fluence_at_depth)."""
+    surface_fluence_J_cm2: float
+    depth_fluence_J_cm2: float      # array for a depth profile
+    peak_fluence_J_cm2: float
+    peak_depth_mm: float
+    transmission_fraction: float    # array for a depth profile
+    buildup_factor: float
+
+
+@dataclass(slots=True)
+class PDTDoseMetrics(_ResultRecord):
+    """Photodynamic dose metrics (see calculate_pdt_dose)."""
+    absorbed_light_dose: float
+    singlet_oxygen_dose: float
+    pdt_dose_relative: float
+    therapeutic_index: float
+
+
+@dataclass(slots=True)
+class TreatmentTime(_ResultRecord):
+    """Exposure timing for a target fluence (see calculate_treatment_time)."""
+    exposure_time_s: float
+    exposure_time_min: float
+    target_fluence_J_cm2: float
+    effective_irradiance_mW_cm2: float
+    safety_margin: float
+
+
+@dataclass(slots=True)
+class TreatmentDepth(_ResultRecord):
+    """Effective treatment depth analysis (see calculate_effective_treatment_depth)."""
+    wavelength_nm: float
+    mu_eff_mm_inv: float            # key "mu_eff_mm-1"
+    penetration_depth_mm: float
+    effective_treatment_depth_mm: float
+    fluence_at_1mm: float
+    fluence_at_3mm: float
+    fluence_at_5mm: float
+    
+    _RENAMED = {"mu_eff_mm_inv": "mu_eff_mm-1"}
+
+
+# ============================================================================
+# RESULT FORMATTING
+# ============================================================================
+
+# Display precision of the calculation results. The calculations below
+# round to it by default; rounded=False returns full-precision values
+FLUENCE_DECIMALS = {
+    "surface_fluence_J_cm2": 2,
+    "depth_fluence_J_cm2": 4,
+    "peak_fluence_J_cm2": 2,
+    "peak_depth_mm": 2,
+    "transmission_fraction": 4
+}
+
+PDT_DOSE_DECIMALS = {
+    "absorbed_light_dose": 6,
+    "singlet_oxygen_dose": 6,
+    "pdt_dose_relative": 2,
+    "therapeutic_index": 2
+}
+
+TREATMENT_TIME_DECIMALS = {
+    "exposure_time_s": 1,
+    "exposure_time_min": 1,
+    "effective_irradiance_mW_cm2": 1
+}
+
+TREATMENT_DEPTH_DECIMALS = {
+    "mu_eff_mm-1": 4,
+    "penetration_depth_mm": 2,
+    "effective_treatment_depth_mm": 2,
+    "fluence_at_1mm": 3,
+    "fluence_at_3mm": 4,
+    "fluence_at_5mm": 5
+}
+
+
+def round_result(result, decimals: Dict[str, int]) -> Dict:
+    """
+    Round a calculation result for presentation.
+    
+    Parameters:
+    -----------
+    result : result object or dict
+        Output of one of the calculation functions (anything with to_dict())
+    decimals : dict
+        Decimals per key (e.g. FLUENCE_DECIMALS); other keys pass through
+        
+    Returns:
+    --------
+    dict : Serializable copy of result with the listed entries rounded
+    """
+    rounded = result.to_dict() if hasattr(result, "to_dict") else dict(result)
+    for key, n in decimals.items():
+        value = rounded.get(key)
+        if isinstance(value, np.ndarray):
+            rounded[key] = np.round(value, n)
+        elif value is not None:
+            rounded[key] = round(value, n)
+    return rounded
+
+
+def _round_fields(result: _ResultRecord, decimals: Dict[str, int]) -> _ResultRecord:
+    """Round the listed entries of a result object in place (see round_result)."""
+    for key, n in decimals.items():
+        attr = result._KEYS[key]
+        value = getattr(result, attr)
+        setattr(result, attr, np.round(value, n) if isinstance(value, np.ndarray) else round(value, n))
+    return result
+
+
 # ============================================================================
 # CORE CALCULATIONS
 # ============================================================================
 
+# Backscatter buildup of diffuse light (typically 3-5 for red light in
+# tissue) and the constants derived from it, folded once at import
+_BUILDUP_FACTOR = 3.0
+_LOG_BUILDUP = math.log(_BUILDUP_FACTOR)
+_INV_E = math.exp(-1.0)
+
+
+def _invert_fluence(
+    buildup_factor: float,
+    mu_eff: float,
+    target_fraction: float,
+    z0: float = 0.0,
+    max_iter: int = 20,
+    tol: float = 1e-12
+) -> float:
+    """
+    Depth (mm) where the relative fluence k × exp(-μeff z) falls to target_fraction.
+    
+    Newton iteration on the log-fluence residual. For the single-exponential
+    model the residual is linear in z and the first step lands on the root;
+    buildup curves without a closed-form inverse plug in here.
+    """
+    log_buildup = _LOG_BUILDUP if buildup_factor == _BUILDUP_FACTOR else math.log(buildup_factor)
+    log_target = math.log(target_fraction)
+    z = z0
+    for _ in range(max_iter):
+        residual = log_buildup - mu_eff * z - log_target
+        if abs(residual) < tol:
+            break
+        z += residual / mu_eff  # Newton step: d(residual)/dz = -mu_eff
+    return z
+
+
+def _beer_lambert_core(
+    mu_a: float,
+    mu_s_prime: float,
+    threshold_fluence_fraction: float,
+    fallback_depth_mm: float,
+    buildup_factor: float = _BUILDUP_FACTOR
+) -> Tuple[float, float, float]:
+    """
+    Diffusion attenuation shared by the depth and planning functions.
+    
+    Returns (mu_eff, penetration depth, effective treatment depth), with the
+    depths in mm; both depths fall back to fallback_depth_mm when mu_eff is
+    not positive. Plain math on floats, which beats ufunc dispatch here.
+    """
+    x = 3 * mu_a * (mu_a + mu_s_prime)
+    mu_eff = math.sqrt(x) if x >= 0 else math.nan
+    if not mu_eff > 0:
+        return mu_eff, fallback_depth_mm, fallback_depth_mm
+    
+    # Effective depth: where buildup × exp(-μeff z) drops to the threshold
+    effective_depth = _invert_fluence(buildup_factor, mu_eff, threshold_fluence_fraction)
+    return mu_eff, 1 / mu_eff, effective_depth
+
+
 def calculate_fluence_at_depth(
     surface_irradiance_mW_cm2: float,
     exposure_time_s: float,
-    depth_mm: float,
-    mu_eff: float
-) -> Dict:
+    depth_mm,
+    mu_eff: float,
+    rounded: bool = True
+) -> FluenceResult:
     """
     Calculate light fluence at depth in tissue.
     
@@ -317,47 +648,47 @@ def calculate_fluence_at_depth(
         Incident irradiance at tissue surface
     exposure_time_s : float
         Total exposure time
-    depth_mm : float
-        Target depth in tissue
+    depth_mm : float or array-like
+        Target depth(s) in tissue; an array evaluates a whole depth profile
     mu_eff : float
         Effective attenuation coefficient (mm^-1)
+    rounded : bool
+        Round to FLUENCE_DECIMALS (False: full precision)
         
     Returns:
     --------
-    dict : Fluence calculations
+    FluenceResult : Fluence calculations (also readable as a dict);
+                    depth-dependent fields are arrays when depth_mm is an array
     """
     # Surface fluence (J/cm²)
     surface_fluence = surface_irradiance_mW_cm2 * exposure_time_s / 1000
     
-    # Buildup factor for diffuse light (typically 3-5 for red light in tissue)
-    buildup_factor = 3.0
-    
-    # Fluence at depth
-    depth_cm = depth_mm / 10
-    transmission = np.exp(-mu_eff * depth_mm)
+    # Buildup factor for diffuse light
+    buildup_factor = _BUILDUP_FACTOR
     
     # Peak fluence occurs just below surface due to backscatter
     peak_depth_mm = 1.0 / mu_eff if mu_eff > 0 else 1.0
-    peak_fluence = surface_fluence * buildup_factor * np.exp(-1)
+    peak_fluence = surface_fluence * buildup_factor * _INV_E
     
-    depth_fluence = surface_fluence * buildup_factor * transmission
+    # Fluence at depth: math.exp for a single depth, one ufunc pass for a profile
+    if np.ndim(depth_mm) == 0:
+        transmission = math.exp(-mu_eff * depth_mm)
+    else:
+        transmission = np.exp(-mu_eff * np.asarray(depth_mm, dtype=np.float64))
+    depth_fluence = (surface_fluence * buildup_factor) * transmission
     
-    return {
-        "surface_fluence_J_cm2": round(surface_fluence, 2),
-        "depth_fluence_J_cm2": round(depth_fluence, 4),
-        "peak_fluence_J_cm2": round(peak_fluence, 2),
-        "peak_depth_mm": round(peak_depth_mm, 2),
-        "transmission_fraction": round(transmission, 4),
-        "buildup_factor": buildup_factor
-    }
+    result = FluenceResult(surface_fluence, depth_fluence, peak_fluence,
+                           peak_depth_mm, transmission, buildup_factor)
+    return _round_fields(result, FLUENCE_DECIMALS) if rounded else result
 
 
 def calculate_pdt_dose(
     fluence_J_cm2: float,
     drug_concentration_uM: float,
     extinction_coefficient: float,
-    singlet_oxygen_yield: float
-) -> Dict:
+    singlet_oxygen_yield: float,
+    rounded: bool = True
+) -> PDTDoseMetrics:
     """
     Calculate photodynamic dose (PDT dose).
     
@@ -379,10 +710,12 @@ def calculate_pdt_dose(
         Molar extinction coefficient (M^-1 cm^-1)
     singlet_oxygen_yield : float
         Singlet oxygen quantum yield (0-1)
+    rounded : bool
+        Round to PDT_DOSE_DECIMALS (False: full precision)
         
     Returns:
     --------
-    dict : PDT dose metrics
+    PDTDoseMetrics : PDT dose metrics (also readable as a dict)
     """
     # Convert concentration to M
     concentration_M = drug_concentration_uM * 1e-6
@@ -397,19 +730,21 @@ def calculate_pdt_dose(
     # Normalized PDT dose
     pdt_dose = singlet_oxygen_dose * 1000  # Arbitrary scaling for readability
     
-    return {
-        "absorbed_light_dose": round(absorbed_dose, 6),
-        "singlet_oxygen_dose": round(singlet_oxygen_dose, 6),
-        "pdt_dose_relative": round(pdt_dose, 2),
-        "therapeutic_index": round(pdt_dose / 10, 2) if pdt_dose > 0 else 0  # Normalized to threshold
-    }
+    result = PDTDoseMetrics(
+        absorbed_dose,
+        singlet_oxygen_dose,
+        pdt_dose,
+        pdt_dose / 10 if pdt_dose > 0 else 0  # Therapeutic index, normalized to threshold
+    )
+    return _round_fields(result, PDT_DOSE_DECIMALS) if rounded else result
 
 
 def calculate_treatment_time(
     target_fluence_J_cm2: float,
     irradiance_mW_cm2: float,
-    safety_margin: float = 0.9
-) -> Dict:
+    safety_margin: float = 0.9,
+    rounded: bool = True
+) -> TreatmentTime:
     """
     Calculate required treatment time for target fluence.
     
@@ -421,31 +756,30 @@ def calculate_treatment_time(
         Applied irradiance
     safety_margin : float
         Fraction of power actually delivered (accounts for losses)
+    rounded : bool
+        Round to TREATMENT_TIME_DECIMALS (False: full precision)
         
     Returns:
     --------
-    dict : Treatment timing
+    TreatmentTime : Treatment timing (also readable as a dict)
     """
     effective_irradiance = irradiance_mW_cm2 * safety_margin
     
     # Time = Fluence / Irradiance (converting units)
     time_s = target_fluence_J_cm2 * 1000 / effective_irradiance
     
-    return {
-        "exposure_time_s": round(time_s, 1),
-        "exposure_time_min": round(time_s / 60, 1),
-        "target_fluence_J_cm2": target_fluence_J_cm2,
-        "effective_irradiance_mW_cm2": round(effective_irradiance, 1),
-        "safety_margin": safety_margin
-    }
+    result = TreatmentTime(time_s, time_s / 60, target_fluence_J_cm2,
+                           effective_irradiance, safety_margin)
+    return _round_fields(result, TREATMENT_TIME_DECIMALS) if rounded else result
 
 
 def calculate_effective_treatment_depth(
     wavelength: float,
     mu_a: float,
     mu_s_prime: float,
-    threshold_fluence_fraction: float = 0.1
-) -> Dict:
+    threshold_fluence_fraction: float = 0.1,
+    rounded: bool = True
+) -> TreatmentDepth:
     """
     Calculate effective PDT treatment depth.
     
@@ -453,38 +787,95 @@ def calculate_effective_treatment_depth(
     
     Parameters:
     -----------
-    wavelength : float
-        Treatment wavelength (nm)
-    mu_a : float
-        Absorption coefficient (mm^-1)
-    mu_s_prime : float
-        Reduced scattering coefficient (mm^-1)
+    wavelength : float or array-like
+        Treatment wavelength(s) (nm)
+    mu_a : float or array-like
+        Absorption coefficient(s) (mm^-1)
+    mu_s_prime : float or array-like
+        Reduced scattering coefficient(s) (mm^-1), parallel to mu_a
     threshold_fluence_fraction : float
         Minimum effective fluence as fraction of surface (typically 0.1)
+    rounded : bool
+        Round to TREATMENT_DEPTH_DECIMALS (False: full precision)
         
     Returns:
     --------
-    dict : Treatment depth analysis
+    TreatmentDepth : Treatment depth analysis (also readable as a dict);
+                     fields are arrays when mu_a / mu_s_prime are arrays
+    """
+    # Effective attenuation, 1/e penetration depth and the depth where
+    # fluence = threshold × surface (accounting for buildup factor ~3)
+    if np.ndim(mu_a) == 0 and np.ndim(mu_s_prime) == 0:
+        mu_eff, penetration_depth, effective_depth = _beer_lambert_core(
+            mu_a, mu_s_prime, threshold_fluence_fraction, 10)
+        exp = math.exp
+    else:
+        mu_a = np.asarray(mu_a, dtype=np.float64)
+        mu_s_prime = np.asarray(mu_s_prime, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+        positive = mu_eff > 0
+        penetration_depth = np.full_like(mu_eff, 10.0)
+        effective_depth = np.full_like(mu_eff, 10.0)
+        np.reciprocal(mu_eff, out=penetration_depth, where=positive)
+        # First Newton step of _invert_fluence from z = 0, exact for this model
+        np.divide(_LOG_BUILDUP - math.log(threshold_fluence_fraction), mu_eff,
+                  out=effective_depth, where=positive)
+        exp = np.exp
+    
+    result = TreatmentDepth(
+        wavelength,
+        mu_eff,
+        penetration_depth,
+        effective_depth,
+        _BUILDUP_FACTOR * exp(-mu_eff * 1),
+        _BUILDUP_FACTOR * exp(-mu_eff * 3),
+        _BUILDUP_FACTOR * exp(-mu_eff * 5)
+    )
+    return _round_fields(result, TREATMENT_DEPTH_DECIMALS) if rounded else result
+
+
+def _planning_optics(tissue_db, tissue_id: str,
+                     wavelengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (mu_a, mu_s_prime) arrays used for planning, looked up in one batched
+    call, with generic soft-tissue defaults where the database has no data.
+    """
+    mu_a = np.full(len(wavelengths), 0.05)
+    mu_s_prime = np.full(len(wavelengths), 1.5)
+    if tissue_db:
+        covered = np.array([tissue_db.has(tissue_id, wl) for wl in wavelengths.tolist()],
+                           dtype=bool)
+        if covered.any():
+            mu_a[covered], mu_s_prime[covered] = tissue_db.get_properties_batch(
+                tissue_id, wavelengths[covered])
+    return mu_a, mu_s_prime
+
+
+def _make_light_planner(protocol: PDTProtocol):
     """
-    # Effective attenuation
-    mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+    Light-dose arithmetic specialized to one protocol.
     
-    # Penetration depth (1/e)
-    penetration_depth = 1 / mu_eff if mu_eff > 0 else 10
+    The protocol constants (and the irradiance already clamped to the
+    thermal limit) are bound once as closure variables, so a plan only
+    evaluates the depth-dependent part.
+    """
+    base_fluence = protocol.fluence_J_cm2
+    irradiance = protocol.irradiance_mW_cm2
+    safe_irradiance = min(irradiance, _THERMAL_LIMIT_MW_CM2)
     
-    # Effective treatment depth (where fluence = threshold × surface)
-    # Accounting for buildup factor ~3
-    effective_depth = -np.log(threshold_fluence_fraction / 3) / mu_eff if mu_eff > 0 else 10
+    def plan_light(mu_eff: float, thickness_mm: float) -> Tuple[float, float, float]:
+        """(adjusted fluence, exposure time, safe irradiance) for one lesion."""
+        # Exponent bounded so math.exp cannot overflow; the cap applies far below
+        depth_factor = math.exp(min(mu_eff * thickness_mm, 700.0))
+        fluence = base_fluence * min(depth_factor, _MAX_FLUENCE_BOOST)
+        return fluence, fluence * 1000 / irradiance, safe_irradiance
     
-    return {
-        "wavelength_nm": wavelength,
-        "mu_eff_mm-1": round(mu_eff, 4),
-        "penetration_depth_mm": round(penetration_depth, 2),
-        "effective_treatment_depth_mm": round(effective_depth, 2),
-        "fluence_at_1mm": round(3 * np.exp(-mu_eff * 1), 3),
-        "fluence_at_3mm": round(3 * np.exp(-mu_eff * 3), 4),
-        "fluence_at_5mm": round(3 * np.exp(-mu_eff * 5), 5)
-    }
+    return plan_light
+
+
+# One specialized planner per protocol row (same indexing as _PROTOCOLS)
+_LIGHT_PLANNERS = [_make_light_planner(p) for p in _PROTOCOLS]
 
 
 def generate_treatment_plan(
@@ -514,84 +905,150 @@ def generate_treatment_plan(
     --------
     TreatmentPlan
     """
-    # Get protocol for indication
-    if indication not in PDT_THRESHOLD_DOSES:
-        # Default protocol
-        protocol = {
-            "photosensitizer": custom_photosensitizer or "ALA",
-            "fluence_J_cm2": 100,
-            "irradiance_mW_cm2": 100,
-            "exposure_time_s": 1000,
-            "wavelength_nm": 635
-        }
+    # A single plan stays on scalar math; generate_treatment_plans only pays
+    # off once its NumPy dispatch is amortized over many lesions
+    idx = _INDICATION_INDEX.get(indication, -1)
+    protocol = _PROTOCOLS[idx]
+    
+    # Get tissue optical properties (default values if no db)
+    if tissue_db and tissue_db.has(tissue_id, protocol.wavelength_nm):
+        props = tissue_db.get_properties(tissue_id, protocol.wavelength_nm)
+        mu_a, mu_s_prime = props.mu_a, props.mu_s_prime
     else:
-        protocol = PDT_THRESHOLD_DOSES[indication]
+        mu_a, mu_s_prime = 0.05, 1.5
     
-    ps_name = custom_photosensitizer or protocol["photosensitizer"]
-    ps = PHOTOSENSITIZERS.get(ps_name, PHOTOSENSITIZERS["ALA"])
+    mu_eff, penetration_depth, effective_depth = _beer_lambert_core(
+        mu_a, mu_s_prime, 0.1, 5)
     
-    # Calculate treatment parameters
-    wavelength = protocol["wavelength_nm"]
+    # Adjust fluence for depth and derive exposure time
+    adjusted_fluence, exposure_time, safe_irradiance = _LIGHT_PLANNERS[idx](
+        mu_eff, tumor_thickness_mm)
+    spot_diameter = max(tumor_thickness_mm * 2, 1.0)
     
-    # Get tissue optical properties (default values if no db)
-    if tissue_db:
-        try:
-            props = tissue_db.get_properties(tissue_id, wavelength)
-            mu_a = props.mu_a
-            mu_s_prime = props.mu_s_prime
-        except:
-            mu_a = 0.05
-            mu_s_prime = 1.5
-    else:
-        mu_a = 0.05
-        mu_s_prime = 1.5
+    return _assemble_plan(
+        indication, idx, tissue_id, custom_photosensitizer, tumor_thickness_mm,
+        protocol.wavelength_nm, protocol.fluence_J_cm2, adjusted_fluence,
+        exposure_time, safe_irradiance,
+        spot_diameter, safe_irradiance * math.pi * (spot_diameter / 2) ** 2,
+        penetration_depth, effective_depth
+    )
+
+
+def generate_treatment_plans(
+    indications,
+    tissue_db=None,
+    tissue_id: str = "skin_dermis",
+    tumor_thicknesses_mm=2.0,
+    custom_photosensitizer: str = None
+) -> List[TreatmentPlan]:
+    """
+    Generate PDT treatment plans for a cohort of lesions.
+    
+    Indications and tumor thicknesses are broadcast against each other, so
+    a single indication can be swept over many thicknesses (or vice versa).
+    Tissue properties are looked up once per protocol wavelength and the
+    depth/fluence arithmetic runs on whole arrays.
     
-    mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
-    penetration_depth = 1 / mu_eff if mu_eff > 0 else 5
+    Parameters:
+    -----------
+    indications : str or list of str
+        Clinical indication(s) (from PDT_THRESHOLD_DOSES)
+    tissue_db : TissueDB, optional
+        Tissue database for optical properties
+    tissue_id : str
+        Target tissue type
+    tumor_thicknesses_mm : float or array-like
+        Estimated tumor thickness(es)
+    custom_photosensitizer : str, optional
+        Override default photosensitizer
+        
+    Returns:
+    --------
+    list : TreatmentPlan per (indication, thickness) pair, in broadcast order
+    """
+    if isinstance(indications, str):
+        indications = [indications]
+    
+    # Protocol rows per lesion (unknown indications get the default)
+    idx = np.array([_INDICATION_INDEX.get(ind, -1) for ind in indications], dtype=np.intp)
+    ind_arr, idx, thickness = np.broadcast_arrays(
+        np.array(indications, dtype=object), idx, np.asarray(tumor_thicknesses_mm))
+    ind_arr, idx, thickness = ind_arr.ravel(), idx.ravel(), thickness.ravel()
+    
+    base_fluence = _PROTOCOL_FLUENCE[idx]
+    irradiance = _PROTOCOL_IRRADIANCE[idx]
+    wavelength = _PROTOCOL_WAVELENGTH[idx]
+    
+    # Tissue optics depend only on the protocol wavelength: one lookup for
+    # the distinct wavelengths, then scattered back to the lesions
+    unique_wl, inverse = np.unique(wavelength, return_inverse=True)
+    mu_a, mu_s_prime = _planning_optics(tissue_db, tissue_id, unique_wl)
+    optics = np.array([_beer_lambert_core(a, s, 0.1, 5)
+                       for a, s in zip(mu_a.tolist(), mu_s_prime.tolist())])
+    mu_eff, penetration_depth, effective_depth = optics[inverse].T
     
-    # Adjust fluence for depth
-    depth_factor = np.exp(mu_eff * tumor_thickness_mm)
-    adjusted_fluence = protocol["fluence_J_cm2"] * min(depth_factor, 3)  # Cap at 3x
+    # Adjust fluence for depth: branchless cap, in place on the buffer
+    depth_factor = np.exp(mu_eff * thickness)
+    np.minimum(depth_factor, _MAX_FLUENCE_BOOST, out=depth_factor)
+    adjusted_fluence = base_fluence * depth_factor
     
     # Calculate exposure time
-    exposure_time = adjusted_fluence * 1000 / protocol["irradiance_mW_cm2"]
+    exposure_time = adjusted_fluence * 1000 / irradiance
     
-    # Thermal safety (max ~200 mW/cm² for prolonged exposure)
-    thermal_limit = 200
-    safe_irradiance = min(protocol["irradiance_mW_cm2"], thermal_limit)
+    safe_irradiance = np.minimum(irradiance, _THERMAL_LIMIT_MW_CM2)
     
     # Spot size for typical lesion
-    spot_diameter = max(tumor_thickness_mm * 2, 1.0)
+    spot_diameter = np.maximum(thickness * 2, 1.0)
+    max_safe_power = safe_irradiance * np.pi * (spot_diameter / 2) ** 2
     
-    # Treatment depth
-    effective_depth = -np.log(0.1 / 3) / mu_eff if mu_eff > 0 else 5
+    return [
+        _assemble_plan(indication, i, tissue_id, custom_photosensitizer, *values)
+        for indication, i, *values in zip(
+            ind_arr.tolist(), idx.tolist(), thickness.tolist(),
+            wavelength.tolist(), base_fluence.tolist(),
+            adjusted_fluence.tolist(), exposure_time.tolist(),
+            safe_irradiance.tolist(), spot_diameter.tolist(),
+            max_safe_power.tolist(), penetration_depth.tolist(),
+            effective_depth.tolist())
+    ]
+
+
+def _assemble_plan(indication: str, protocol_idx: int, tissue_id: str,
+                   custom_photosensitizer: Optional[str], thickness: float,
+                   wavelength: float, base_fluence: float, fluence: float,
+                   exposure_time: float, irradiance: float, spot_diameter: float,
+                   max_safe_power: float, penetration_depth: float,
+                   effective_depth: float) -> TreatmentPlan:
+    """Attach drug data, notes and schedule to computed light parameters."""
+    ps_name = custom_photosensitizer or _PROTOCOL_PS[protocol_idx]
+    ps = PHOTOSENSITIZER_RECORDS.get(ps_name, PHOTOSENSITIZER_RECORDS["ALA"])
     
     notes = []
-    notes.append(f"Drug-light interval: {ps['drug_light_interval_h']} hours")
-    notes.append(f"Photosensitivity duration: {ps['photosensitivity_days']} days")
-    if tumor_thickness_mm > effective_depth:
-        notes.append(f"⚠️ Tumor thickness ({tumor_thickness_mm}mm) exceeds treatment depth ({effective_depth:.1f}mm)")
+    notes.append(f"Drug-light interval: {ps.drug_light_interval_h} hours")
+    notes.append(f"Photosensitivity duration: {ps.photosensitivity_days} days")
+    if thickness > effective_depth:
+        notes.append(f"⚠️ Tumor thickness ({thickness}mm) exceeds treatment depth ({effective_depth:.1f}mm)")
         notes.append("Consider: debulking, multiple sessions, or interstitial illumination")
-    if adjusted_fluence > protocol["fluence_J_cm2"]:
-        notes.append(f"Fluence increased to {adjusted_fluence:.0f} J/cm² for deeper penetration")
+    if fluence > base_fluence:
+        notes.append(f"Fluence increased to {fluence:.0f} J/cm² for deeper penetration")
     
     return TreatmentPlan(
         indication=indication,
         photosensitizer=ps_name,
-        drug_dose_mg_kg=ps["typical_dose_mg_kg"],
-        drug_route="IV" if ps["typical_dose_mg_kg"] < 10 else "topical",
-        drug_light_interval_h=ps["drug_light_interval_h"],
+        drug_dose_mg_kg=ps.typical_dose_mg_kg,
+        drug_route="IV" if ps.typical_dose_mg_kg < 10 else "topical",
+        drug_light_interval_h=ps.drug_light_interval_h,
         wavelength_nm=wavelength,
-        target_fluence_J_cm2=adjusted_fluence,
-        irradiance_mW_cm2=safe_irradiance,
+        target_fluence_J_cm2=fluence,
+        irradiance_mW_cm2=irradiance,
         exposure_time_s=exposure_time,
         spot_diameter_cm=spot_diameter,
         tissue_type=tissue_id,
         penetration_depth_mm=penetration_depth,
         effective_treatment_depth_mm=effective_depth,
-        max_safe_power_mW=safe_irradiance * np.pi * (spot_diameter/2)**2,
-        thermal_limit_mW_cm2=thermal_limit,
-        sessions=2 if "nodular" in indication or tumor_thickness_mm > 2 else 1,
+        max_safe_power_mW=max_safe_power,
+        thermal_limit_mW_cm2=_THERMAL_LIMIT_MW_CM2,
+        sessions=2 if "nodular" in indication or thickness > 2 else 1,
         interval_weeks=1,
         notes=notes
     )
@@ -615,41 +1072,34 @@ def compare_photosensitizers(
     --------
     list : Ranked photosensitizers
     """
+    indication_lower = indication.lower() if indication else None
     results = []
     
-    for ps_id, ps in PHOTOSENSITIZERS.items():
+    for ps_id, score in _PS_RANKED:
+        ps = PHOTOSENSITIZER_RECORDS[ps_id]
+        
         # Filter by wavelength if specified
-        if wavelength and abs(ps["activation_wavelength"] - wavelength) > 30:
+        if wavelength and abs(ps.activation_wavelength - wavelength) > 30:
             continue
         
         # Filter by indication if specified
         if indication:
-            indication_lower = indication.lower()
-            approved = [ind.lower() for ind in ps["approved_indications"]]
+            approved = [ind.lower() for ind in ps.approved_indications]
             if not any(indication_lower in ind or ind in indication_lower for ind in approved):
                 continue
         
-        # Score based on properties
-        score = 0
-        score += ps["extinction_coefficient"] / 1000  # Higher absorption = better
-        score += ps["singlet_oxygen_yield"] * 50  # Higher yield = better
-        score += (800 - ps["activation_wavelength"]) / 10  # Longer wavelength = better penetration
-        score -= ps["photosensitivity_days"]  # Less photosensitivity = better
-        
         results.append({
             "id": ps_id,
-            "name": ps["generic_name"],
-            "wavelength_nm": ps["activation_wavelength"],
-            "extinction_coefficient": ps["extinction_coefficient"],
-            "singlet_oxygen_yield": ps["singlet_oxygen_yield"],
-            "drug_light_interval_h": ps["drug_light_interval_h"],
-            "photosensitivity_days": ps["photosensitivity_days"],
-            "approved_indications": ps["approved_indications"],
-            "score": round(score, 1)
+            "name": ps.generic_name,
+            "wavelength_nm": ps.activation_wavelength,
+            "extinction_coefficient": ps.extinction_coefficient,
+            "singlet_oxygen_yield": ps.singlet_oxygen_yield,
+            "drug_light_interval_h": ps.drug_light_interval_h,
+            "photosensitivity_days": ps.photosensitivity_days,
+            "approved_indications": ps.approved_indications,
+            "score": score
         })
     
-    # Sort by score
-    results.sort(key=lambda x: x["score"], reverse=True)
     return results
 
 
@@ -15,7 +15,7 @@ Usage:
     
     # Get properties for brain gray matter at 630nm
     props = get_tissue("brain_gray_matter", wavelength=630)
-    print(props)
+    print(props.pretty())
     
     # Calculate penetration depth
     depth = calculate_penetration_depth("brain_gray_matter", 630)
@@ -23,19 +23,36 @@ Usage:
 """
 
 import json
+from bisect import bisect_right
 import numpy as np
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional, Dict, List, Tuple, Union
-from scipy.interpolate import interp1d
+from functools import lru_cache
+from scipy.interpolate import CubicSpline, PPoly
+import threading
 import warnings
 
+# orjson is optional: faster parsing of the tissue database
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Numba is optional: fused kernel for derived properties over long spectra
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 # ============================================================================
 # DATA CLASSES
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OpticalProperties:
     """Optical properties at a specific wavelength."""
     wavelength: float           # nm
@@ -48,6 +65,12 @@ class OpticalProperties:
     tissue_name: str
     
     def __repr__(self):
+        # Compact ASCII form, cheap enough for logging in bulk
+        return (f"OpticalProperties({self.tissue_name}, {self.wavelength}nm, "
+                f"mu_a={self.mu_a:.4g}, mu_s'={self.mu_s_prime:.4g})")
+    
+    def pretty(self) -> str:
+        """Multi-line, human-readable summary."""
         return (f"OpticalProperties({self.tissue_name} @ {self.wavelength}nm)\n"
                 f"  μₐ = {self.mu_a:.4f} mm⁻¹\n"
                 f"  μₛ' = {self.mu_s_prime:.4f} mm⁻¹\n"
@@ -69,7 +92,7 @@ class OpticalProperties:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TissueInfo:
     """Complete tissue information."""
     id: str
@@ -92,6 +115,136 @@ class TissueInfo:
                 f"  Wavelengths: {min(self.available_wavelengths)}-{max(self.available_wavelengths)} nm")
 
 
+# ============================================================================
+# INTERPOLATION
+# ============================================================================
+
+# Channel order of the stacked per-tissue spline
+_MU_A, _MU_S_PRIME, _G = 0, 1, 2
+
+
+def _stacked_spline(wavelengths: np.ndarray, mu_a: np.ndarray,
+                    mu_s_prime: np.ndarray, g: np.ndarray) -> PPoly:
+    """
+    One piecewise polynomial evaluating (mu_a, mu_s_prime, g) together.
+    
+    mu_a and mu_s_prime are not-a-knot cubic splines; g is piecewise linear
+    so it cannot overshoot the measured values. All three share the knots,
+    so their coefficients sit in one contiguous (4, n-1, 3) array and a
+    single evaluation returns every channel. PPoly extrapolates with the end
+    pieces, which for g extends the end segments linearly.
+    """
+    cubic = CubicSpline(wavelengths, np.stack([mu_a, mu_s_prime], axis=1),
+                        extrapolate=True)
+    coeffs = np.zeros((4, len(wavelengths) - 1, 3))
+    coeffs[:, :, [_MU_A, _MU_S_PRIME]] = cubic.c
+    coeffs[2, :, _G] = np.diff(g) / np.diff(wavelengths)
+    coeffs[3, :, _G] = g[:-1]
+    return PPoly(coeffs, wavelengths, extrapolate=True)
+
+
+def _eval_stacked_scalar(knots: List[float], coeffs: List[List[List[float]]],
+                         wavelength: float) -> List[float]:
+    """
+    Evaluate a stacked spline at one wavelength in plain Python.
+    
+    knots and coeffs are PPoly.x and PPoly.c (segment, channel, power) as
+    lists. Uses the same segment choice and power-sum order as PPoly, so the
+    values are bit-identical, without the array dispatch cost of a call.
+    """
+    i = min(max(bisect_right(knots, wavelength) - 1, 0), len(knots) - 2)
+    dx = wavelength - knots[i]
+    dx2 = dx * dx
+    dx3 = dx2 * dx
+    return [c3 + c2 * dx + c1 * dx2 + c0 * dx3 for c0, c1, c2, c3 in coeffs[i]]
+
+
+if NUMBA_AVAILABLE:
+    
+    @njit(parallel=True, cache=True)
+    def _stacked_eval_kernel(knots, n_knots, coeffs, rows, wavelengths, out):
+        """
+        Stacked-table evaluation, one thread per tissue row.
+        
+        A linear knot scan (at most a few dozen knots) replaces the
+        (tissues x knots x wavelengths) comparison of the NumPy path; the
+        arithmetic order is the same, so results are bit-identical.
+        """
+        for t in prange(rows.shape[0]):
+            r = rows[t]
+            last = n_knots[r] - 2
+            for j in range(wavelengths.shape[0]):
+                w = wavelengths[j]
+                s = 0
+                while s < last and knots[r, s + 1] <= w:
+                    s += 1
+                dx = w - knots[r, s]
+                dx2 = dx * dx
+                dx3 = dx2 * dx
+                for ch in range(3):
+                    out[t, j, ch] = (coeffs[r, s, 3, ch] + coeffs[r, s, 2, ch] * dx
+                                     + coeffs[r, s, 1, ch] * dx2 + coeffs[r, s, 0, ch] * dx3)
+
+
+# Spectra shorter than this take the NumPy path (no JIT dispatch/compile cost)
+_JIT_MIN_SAMPLES = 1024
+
+# Comparisons of fewer tissues go through the cached get_properties instead
+_BATCH_MIN_TISSUES = 6
+
+
+# ============================================================================
+# DERIVED PROPERTIES
+# ============================================================================
+
+if NUMBA_AVAILABLE:
+    
+    # error_model='numpy' keeps g == 1 as inf instead of raising, like NumPy.
+    # No fastmath: it would assume away the inf penetration depths.
+    @njit(parallel=True, cache=True, error_model='numpy')
+    def _derived_kernel(mu_a, mu_s_prime, g, out_mu_s, out_penetration):
+        """mu_s and penetration depth fused into one pass over the spectrum."""
+        for i in prange(mu_a.shape[0]):
+            a = mu_a[i]
+            sp = mu_s_prime[i]
+            out_mu_s[i] = sp / (1.0 - g[i])
+            if a > 0.0 and sp > 0.0:
+                out_penetration[i] = 1.0 / np.sqrt(3.0 * a * (a + sp))
+            else:
+                out_penetration[i] = np.inf
+
+
+def _penetration_depth_vec(mu_a: np.ndarray, mu_s_prime: np.ndarray) -> np.ndarray:
+    """
+    Penetration depth over arrays, without a per-element branch.
+    
+    mu_eff is computed everywhere and the invalid points (μₐ or μₛ' not
+    positive, or NaN) are masked to inf afterwards.
+    """
+    valid = (mu_a > 0) & (mu_s_prime > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu_eff = np.sqrt(3 * mu_a * (mu_a + mu_s_prime))
+        return np.where(valid, 1.0 / mu_eff, np.inf)
+
+
+def _derived_properties(mu_a: np.ndarray, mu_s_prime: np.ndarray,
+                        g: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scattering coefficient and penetration depth over a spectrum.
+    
+    μₛ = μₛ' / (1 - g),  δ = 1 / sqrt(3 * μₐ * (μₐ + μₛ')),
+    with δ = inf wherever μₐ or μₛ' is not positive.
+    """
+    if NUMBA_AVAILABLE and mu_a.size >= _JIT_MIN_SAMPLES:
+        mu_s = np.empty_like(mu_a)
+        penetration_depth = np.empty_like(mu_a)
+        _derived_kernel(mu_a, mu_s_prime, g, mu_s, penetration_depth)
+        return mu_s, penetration_depth
+    
+    mu_s = mu_s_prime / (1 - g)
+    return mu_s, _penetration_depth_vec(mu_a, mu_s_prime)
+
+
 # ============================================================================
 # MAIN DATABASE CLASS
 # ============================================================================
@@ -107,6 +260,9 @@ class TissueDB:
     >>> print(props.penetration_depth)
     """
     
+    BATCH_CACHE_SIZE = 64         # Spectral sweeps kept by get_properties_batch
+    PROPERTIES_CACHE_SIZE = 4096  # Single-wavelength lookups kept by get_properties
+    
     def __init__(self, db_path: Optional[str] = None):
         """
         Initialize the database.
@@ -119,47 +275,146 @@ class TissueDB:
         if db_path is None:
             db_path = Path(__file__).parent / "tissue_optical_properties.json"
         
-        with open(db_path, 'r', encoding='utf-8') as f:
-            self._data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(db_path, 'rb') as f:
+                self._data = orjson.loads(f.read())
+        else:
+            with open(db_path, 'r', encoding='utf-8') as f:
+                self._data = json.load(f)
         
         self._tissues = self._data['tissues']
         self._metadata = self._data['_metadata']
         self._chromophores = self._data.get('chromophores', {})
         self._common_wavelengths = self._data.get('common_wavelengths', {})
         
+        # Listings built once; accessors hand out list copies
+        self._tissue_list = tuple(self._tissues)
+        self._tissue_names = {tid: t['name'] for tid, t in self._tissues.items()}
+        by_category = {}
+        for tid, t in self._tissues.items():
+            by_category.setdefault(t['category'], []).append(tid)
+        self._by_category = {cat: tuple(tids) for cat, tids in by_category.items()}
+        self._categories = tuple(self._by_category)
+        
         # Build interpolators for each tissue
         self._interpolators = {}
+        self._wl_bounds = {}   # (first, last) measured wavelength per tissue
         self._build_interpolators()
+        self._build_stacked_table()
+        
+        # Batched spectral lookups, keyed by (tissue_id, wavelength grid)
+        self._batch_cache = {}
+        
+        # Single-wavelength lookups, keyed by (tissue_id, wavelength).
+        # Bound per instance so the cache is dropped with the database.
+        self._properties_cached = lru_cache(maxsize=self.PROPERTIES_CACHE_SIZE,
+                                            typed=True)(self._compute_properties)
+        
+        # Lowercased search text per tissue; NUL-separated so a query can
+        # only match within one field, as when fields were checked one by one
+        self._search_text = {
+            tid: '\0'.join([tid, t['name'], t.get('name_fr', t['name']),
+                            t.get('description', '')]).lower()
+            for tid, t in self._tissues.items()
+        }
     
     def _build_interpolators(self):
-        """Build interpolation functions for each tissue."""
+        """
+        Build interpolation functions for each tissue.
+        
+        Each tissue gets one stacked spline (see _stacked_spline), so a
+        lookup is a single evaluation for all three properties: compiled
+        for arrays, plain Python for single wavelengths.
+        """
         for tissue_id, tissue_data in self._tissues.items():
-            wavelength_data = tissue_data['wavelength_data']
-            wavelengths = sorted([int(w) for w in wavelength_data.keys()])
-            
-            mu_a_values = [wavelength_data[str(w)]['mu_a'] for w in wavelengths]
-            mu_s_prime_values = [wavelength_data[str(w)]['mu_s_prime'] for w in wavelengths]
-            g_values = [wavelength_data[str(w)]['g'] for w in wavelengths]
+            # One pass over the entries, sorted by numeric wavelength
+            entries = sorted(((int(w), v['mu_a'], v['mu_s_prime'], v['g'])
+                              for w, v in tissue_data['wavelength_data'].items()),
+                             key=lambda e: e[0])
+            wavelengths = [e[0] for e in entries]
+            columns = np.array(entries, dtype=np.float64)
             
+            spline = _stacked_spline(columns[:, 0], columns[:, 1],
+                                     columns[:, 2], columns[:, 3])
+            self._wl_bounds[tissue_id] = (wavelengths[0], wavelengths[-1])
             self._interpolators[tissue_id] = {
                 'wavelengths': wavelengths,
-                'mu_a': interp1d(wavelengths, mu_a_values, kind='cubic', 
-                                 bounds_error=False, fill_value='extrapolate'),
-                'mu_s_prime': interp1d(wavelengths, mu_s_prime_values, kind='cubic',
-                                       bounds_error=False, fill_value='extrapolate'),
-                'g': interp1d(wavelengths, g_values, kind='linear',
-                             bounds_error=False, fill_value='extrapolate')
+                'spline': spline,
+                # Plain-list copies for single-wavelength lookups
+                'knots': spline.x.tolist(),
+                'coeffs': spline.c.transpose(1, 2, 0).tolist()
             }
     
+    def _build_stacked_table(self):
+        """
+        Stack every tissue's spline into padded cross-tissue arrays.
+        
+        Row i of _stacked_knots / _stacked_coeffs holds the tissue at
+        _tissue_index position i; knot rows are padded with +inf past each
+        tissue's last knot. This lets compare_tissues evaluate any set of
+        tissues at one wavelength with a handful of array operations.
+        """
+        self._tissue_index = {tid: i for i, tid in enumerate(self._tissues)}
+        splines = [self._interpolators[tid]['spline'] for tid in self._tissues]
+        max_knots = max(len(s.x) for s in splines)
+        
+        self._stacked_knots = np.full((len(splines), max_knots), np.inf)
+        self._stacked_n_knots = np.empty(len(splines), dtype=np.intp)
+        self._stacked_coeffs = np.zeros((len(splines), max_knots - 1, 4, 3))
+        for i, s in enumerate(splines):
+            n_knots = len(s.x)
+            self._stacked_knots[i, :n_knots] = s.x
+            self._stacked_n_knots[i] = n_knots
+            self._stacked_coeffs[i, :n_knots - 1] = s.c.transpose(1, 0, 2)
+    
+    def _evaluate_tissues(self, tissue_ids: List[str], wavelengths: np.ndarray) -> np.ndarray:
+        """
+        (mu_a, mu_s_prime, g) for several tissues over a 1-D wavelength array.
+        
+        Returns shape (len(tissue_ids), len(wavelengths), 3). Segment choice
+        and power-sum order follow PPoly, so values match the per-tissue
+        splines exactly.
+        """
+        rows = np.fromiter((self._tissue_index[tid] for tid in tissue_ids),
+                           dtype=np.intp, count=len(tissue_ids))
+        
+        if NUMBA_AVAILABLE and rows.size * wavelengths.size >= _JIT_MIN_SAMPLES:
+            out = np.empty((rows.size, wavelengths.size, 3))
+            _stacked_eval_kernel(self._stacked_knots, self._stacked_n_knots,
+                                 self._stacked_coeffs, rows, wavelengths, out)
+            return out
+        
+        knots = self._stacked_knots[rows]
+        
+        # Segment holding each wavelength; the end pieces extrapolate
+        seg = (knots[:, :, None] <= wavelengths).sum(axis=1) - 1
+        seg = np.clip(seg, 0, (self._stacked_n_knots[rows] - 2)[:, None])
+        dx = (wavelengths - np.take_along_axis(knots, seg, axis=1))[..., None]
+        c = self._stacked_coeffs[rows[:, None], seg]
+        dx2 = dx * dx
+        return c[..., 3, :] + c[..., 2, :] * dx + c[..., 1, :] * dx2 + c[..., 0, :] * (dx2 * dx)
+    
     @property
     def tissue_list(self) -> List[str]:
         """Get list of all available tissue IDs."""
-        return list(self._tissues.keys())
+        return list(self._tissue_list)
     
     @property
     def tissue_names(self) -> Dict[str, str]:
         """Get dictionary of tissue IDs to names."""
-        return {tid: self._tissues[tid]['name'] for tid in self._tissues}
+        return dict(self._tissue_names)
+    
+    def has(self, tissue_id: str, wavelength: Optional[float] = None) -> bool:
+        """
+        Check whether get_properties can serve a lookup without raising.
+        
+        True if the tissue exists and the wavelength, when given, is finite.
+        Wavelengths outside the measured range still count: they are
+        extrapolated (with a warning), as in get_properties.
+        """
+        if tissue_id not in self._tissues:
+            return False
+        return wavelength is None or bool(np.isfinite(wavelength))
     
     def get_tissue_info(self, tissue_id: str) -> TissueInfo:
         """
@@ -179,7 +434,8 @@ class TissueDB:
                            f"Available: {self.tissue_list}")
         
         t = self._tissues[tissue_id]
-        wavelengths = sorted([int(w) for w in t['wavelength_data'].keys()])
+        # Sorted once in _build_interpolators; copied so callers can't alter it
+        wavelengths = list(self._interpolators[tissue_id]['wavelengths'])
         
         return TissueInfo(
             id=tissue_id,
@@ -195,10 +451,22 @@ class TissueDB:
             available_wavelengths=wavelengths
         )
     
+    def _warn_out_of_range(self, tissue_id: str, wavelengths: np.ndarray):
+        """One aggregated extrapolation warning for a whole wavelength sweep."""
+        wl_min, wl_max = self._wl_bounds[tissue_id]
+        n_out = np.count_nonzero((wavelengths < wl_min) | (wavelengths > wl_max))
+        if n_out:
+            warnings.warn(f"{n_out} of {wavelengths.size} wavelengths are outside the "
+                         f"measured range ({wl_min}-{wl_max}nm). Extrapolating.")
+    
     def get_properties(self, tissue_id: str, wavelength: float) -> OpticalProperties:
         """
         Get optical properties for a tissue at a specific wavelength.
         
+        Results are kept in an LRU cache keyed on (tissue_id, wavelength),
+        so model builders that look up the same layers repeatedly only
+        interpolate once. OpticalProperties is frozen, so sharing is safe.
+        
         Parameters:
         -----------
         tissue_id : str
@@ -214,19 +482,22 @@ class TissueDB:
             raise ValueError(f"Unknown tissue: {tissue_id}. "
                            f"Available: {self.tissue_list}")
         
+        # Check wavelength range (outside the cache, so repeats still warn)
+        wl_min, wl_max = self._wl_bounds[tissue_id]
+        if wavelength < wl_min or wavelength > wl_max:
+            warnings.warn(f"Wavelength {wavelength}nm is outside the measured range "
+                         f"({wl_min}-{wl_max}nm). Extrapolating.")
+        
+        return self._properties_cached(tissue_id, wavelength)
+    
+    def _compute_properties(self, tissue_id: str, wavelength: float) -> OpticalProperties:
+        """Interpolate and derive the properties behind get_properties."""
         tissue = self._tissues[tissue_id]
         interp = self._interpolators[tissue_id]
         
-        # Check wavelength range
-        wl_range = interp['wavelengths']
-        if wavelength < wl_range[0] or wavelength > wl_range[-1]:
-            warnings.warn(f"Wavelength {wavelength}nm is outside the measured range "
-                         f"({wl_range[0]}-{wl_range[-1]}nm). Extrapolating.")
-        
         # Get interpolated values
-        mu_a = float(interp['mu_a'](wavelength))
-        mu_s_prime = float(interp['mu_s_prime'](wavelength))
-        g = float(interp['g'](wavelength))
+        mu_a, mu_s_prime, g = _eval_stacked_scalar(interp['knots'], interp['coeffs'],
+                                                   float(wavelength))
         n = tissue['refractive_index']['n']
         
         # Calculate derived values
@@ -244,6 +515,53 @@ class TissueDB:
             tissue_name=tissue['name']
         )
     
+    def get_properties_batch(self, tissue_id: str,
+                             wavelengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get absorption and reduced scattering over an array of wavelengths.
+        
+        Evaluates the interpolators once on the whole array instead of
+        building an OpticalProperties object per wavelength. Results are
+        cached per (tissue, wavelength grid), so workflows that sweep the
+        same grid repeatedly only interpolate once; the returned arrays are
+        read-only.
+        
+        Parameters:
+        -----------
+        tissue_id : str
+            Tissue identifier
+        wavelengths : array-like
+            Wavelengths in nm
+            
+        Returns:
+        --------
+        tuple : (mu_a, mu_s_prime) arrays in mm^-1
+        """
+        if tissue_id not in self._tissues:
+            raise ValueError(f"Unknown tissue: {tissue_id}. "
+                           f"Available: {self.tissue_list}")
+        
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        key = (tissue_id, wavelengths.shape, wavelengths.tobytes())
+        cached = self._batch_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        interp = self._interpolators[tissue_id]
+        self._warn_out_of_range(tissue_id, wavelengths)
+        
+        values = interp['spline'](wavelengths)
+        mu_a = values[..., _MU_A].copy()
+        mu_s_prime = values[..., _MU_S_PRIME].copy()
+        mu_a.flags.writeable = False
+        mu_s_prime.flags.writeable = False
+        
+        # Evict the oldest entry once full (dicts keep insertion order)
+        if len(self._batch_cache) >= self.BATCH_CACHE_SIZE:
+            del self._batch_cache[next(iter(self._batch_cache))]
+        self._batch_cache[key] = (mu_a, mu_s_prime)
+        return mu_a, mu_s_prime
+    
     def _calculate_penetration_depth(self, mu_a: float, mu_s_prime: float) -> float:
         """
         Calculate optical penetration depth (1/e depth).
@@ -275,32 +593,90 @@ class TissueDB:
         if wavelengths is None:
             wavelengths = np.arange(400, 1001, 10)
         
+        if tissue_id not in self._tissues:
+            raise ValueError(f"Unknown tissue: {tissue_id}. "
+                           f"Available: {self.tissue_list}")
+        
         wavelengths = np.array(wavelengths)
-        n_wl = len(wavelengths)
+        interp = self._interpolators[tissue_id]
+        
+        # Warn once for the whole sweep rather than per sample
+        self._warn_out_of_range(tissue_id, wavelengths)
+        
+        # Evaluate the stacked spline once on the whole array
+        values = interp['spline'](wavelengths)
+        mu_a = values[..., _MU_A].copy()
+        mu_s_prime = values[..., _MU_S_PRIME].copy()
+        g = values[..., _G].copy()
+        
+        # Derived values, same formulas as get_properties
+        mu_s, penetration_depth = _derived_properties(mu_a, mu_s_prime, g)
         
-        result = {
+        return {
             'wavelengths': wavelengths,
-            'mu_a': np.zeros(n_wl),
-            'mu_s_prime': np.zeros(n_wl),
-            'mu_s': np.zeros(n_wl),
-            'g': np.zeros(n_wl),
-            'penetration_depth': np.zeros(n_wl)
+            'mu_a': mu_a,
+            'mu_s_prime': mu_s_prime,
+            'mu_s': mu_s,
+            'g': g,
+            'penetration_depth': penetration_depth
         }
+    
+    def spectrum_matrix(self, tissue_ids: List[str],
+                        wavelengths: Optional[List[float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get optical properties of several tissues across a range of wavelengths.
+        
+        All tissues are evaluated together over the stacked cross-tissue
+        table, instead of one spectrum per tissue. Values match get_spectrum.
+        
+        Parameters:
+        -----------
+        tissue_ids : list of str
+            Tissue identifiers (one row each)
+        wavelengths : list of float, optional
+            Wavelengths in nm (one column each). If None, uses 400-1000nm.
+            
+        Returns:
+        --------
+        dict with 'tissue_ids', 'wavelengths' and (tissues x wavelengths)
+        arrays: 'mu_a', 'mu_s_prime', 'mu_s', 'g', 'penetration_depth'
+        """
+        if wavelengths is None:
+            wavelengths = np.arange(400, 1001, 10)
         
-        for i, wl in enumerate(wavelengths):
-            props = self.get_properties(tissue_id, wl)
-            result['mu_a'][i] = props.mu_a
-            result['mu_s_prime'][i] = props.mu_s_prime
-            result['mu_s'][i] = props.mu_s
-            result['g'][i] = props.g
-            result['penetration_depth'][i] = props.penetration_depth
+        wavelengths = np.array(wavelengths)
+        for tid in tissue_ids:
+            if tid not in self._tissues:
+                raise ValueError(f"Unknown tissue: {tid}. "
+                               f"Available: {self.tissue_list}")
+            self._warn_out_of_range(tid, wavelengths)
         
-        return result
+        shape = (len(tissue_ids), len(wavelengths))
+        values = self._evaluate_tissues(list(tissue_ids),
+                                        wavelengths.astype(np.float64).reshape(-1))
+        mu_a = np.ascontiguousarray(values[..., _MU_A])
+        mu_s_prime = np.ascontiguousarray(values[..., _MU_S_PRIME])
+        g = np.ascontiguousarray(values[..., _G])
+        mu_s, penetration_depth = _derived_properties(mu_a.ravel(), mu_s_prime.ravel(),
+                                                      g.ravel())
+        
+        return {
+            'tissue_ids': list(tissue_ids),
+            'wavelengths': wavelengths,
+            'mu_a': mu_a,
+            'mu_s_prime': mu_s_prime,
+            'mu_s': mu_s.reshape(shape),
+            'g': g,
+            'penetration_depth': penetration_depth.reshape(shape)
+        }
     
     def compare_tissues(self, tissue_ids: List[str], wavelength: float) -> Dict[str, OpticalProperties]:
         """
         Compare optical properties of multiple tissues at a wavelength.
         
+        Larger comparisons evaluate every tissue's spline in one pass over
+        the stacked cross-tissue table; small ones reuse get_properties.
+        
         Parameters:
         -----------
         tissue_ids : list of str
@@ -312,7 +688,40 @@ class TissueDB:
         --------
         dict mapping tissue_id to OpticalProperties
         """
-        return {tid: self.get_properties(tid, wavelength) for tid in tissue_ids}
+        if len(tissue_ids) < _BATCH_MIN_TISSUES:
+            return {tid: self.get_properties(tid, wavelength) for tid in tissue_ids}
+        
+        for tid in tissue_ids:
+            if tid not in self._tissues:
+                raise ValueError(f"Unknown tissue: {tid}. "
+                               f"Available: {self.tissue_list}")
+            wl_min, wl_max = self._wl_bounds[tid]
+            if wavelength < wl_min or wavelength > wl_max:
+                warnings.warn(f"Wavelength {wavelength}nm is outside the measured range "
+                             f"({wl_min}-{wl_max}nm). Extrapolating.")
+        
+        # One evaluation across all requested tissues
+        values = self._evaluate_tissues(tissue_ids, np.array([wavelength], dtype=np.float64))[:, 0]
+        mu_a = values[:, _MU_A]
+        mu_s_prime = values[:, _MU_S_PRIME]
+        g = values[:, _G]
+        mu_s, penetration_depth = _derived_properties(mu_a, mu_s_prime, g)
+        
+        rows = zip(tissue_ids, mu_a.tolist(), mu_s_prime.tolist(), mu_s.tolist(),
+                   g.tolist(), penetration_depth.tolist())
+        return {
+            tid: OpticalProperties(
+                wavelength=wavelength,
+                mu_a=a,
+                mu_s_prime=sp,
+                mu_s=s,
+                g=gi,
+                n=self._tissues[tid]['refractive_index']['n'],
+                penetration_depth=pen,
+                tissue_name=self._tissues[tid]['name']
+            )
+            for tid, a, sp, s, gi, pen in rows
+        }
     
     def find_optimal_wavelength(self, tissue_id: str, 
                                 objective: str = 'max_penetration',
@@ -335,30 +744,32 @@ class TissueDB:
         --------
         tuple : (optimal_wavelength, optimal_value)
         """
+        # Only mu_a and mu_s' are needed; the batch cache keeps them per grid,
+        # so repeated searches over the same range skip the interpolation
         wavelengths = np.arange(wavelength_range[0], wavelength_range[1] + 1, 5)
-        spectrum = self.get_spectrum(tissue_id, wavelengths)
+        mu_a, mu_s_prime = self.get_properties_batch(tissue_id, wavelengths)
         
         if objective == 'max_penetration':
-            idx = np.argmax(spectrum['penetration_depth'])
-            return wavelengths[idx], spectrum['penetration_depth'][idx]
+            penetration_depth = _penetration_depth_vec(mu_a, mu_s_prime)
+            idx = np.argmax(penetration_depth)
+            return wavelengths[idx], penetration_depth[idx]
         elif objective == 'min_absorption':
-            idx = np.argmin(spectrum['mu_a'])
-            return wavelengths[idx], spectrum['mu_a'][idx]
+            idx = np.argmin(mu_a)
+            return wavelengths[idx], mu_a[idx]
         elif objective == 'min_scattering':
-            idx = np.argmin(spectrum['mu_s_prime'])
-            return wavelengths[idx], spectrum['mu_s_prime'][idx]
+            idx = np.argmin(mu_s_prime)
+            return wavelengths[idx], mu_s_prime[idx]
         else:
             raise ValueError(f"Unknown objective: {objective}")
     
     def get_tissues_by_category(self, category: str) -> List[str]:
         """Get all tissues in a category."""
-        return [tid for tid, t in self._tissues.items() 
-                if t['category'] == category]
+        return list(self._by_category.get(category, ()))
     
     @property
     def categories(self) -> List[str]:
-        """Get list of all tissue categories."""
-        return list(set(t['category'] for t in self._tissues.values()))
+        """Get list of all tissue categories, in order of first appearance."""
+        return list(self._categories)
     
     def search_tissues(self, query: str) -> List[str]:
         """
@@ -374,16 +785,7 @@ class TissueDB:
         list of matching tissue IDs
         """
         query = query.lower()
-        results = []
-        
-        for tid, t in self._tissues.items():
-            if (query in tid.lower() or 
-                query in t['name'].lower() or 
-                query in t['name_fr'].lower() or
-                query in t['description'].lower()):
-                results.append(tid)
-        
-        return results
+        return [tid for tid, text in self._search_text.items() if query in text]
     
     def export_to_csv(self, output_path: str, tissue_ids: Optional[List[str]] = None):
         """
@@ -399,43 +801,73 @@ class TissueDB:
         if tissue_ids is None:
             tissue_ids = self.tissue_list
         
-        rows = []
         header = ['tissue_id', 'tissue_name', 'wavelength_nm', 
                   'mu_a_mm-1', 'mu_s_prime_mm-1', 'mu_s_mm-1', 
                   'g', 'n', 'penetration_depth_mm']
+        fmt = '%s,%s,%d,%.6f,%.6f,%.6f,%.4f,%.3f,%.4f'
+        
+        id_width = max((len(tid) for tid in tissue_ids), default=1)
+        name_width = max((len(self._tissues[tid]['name']) for tid in tissue_ids), default=1)
+        dtype = np.dtype([('tissue_id', f'U{id_width}'), ('tissue_name', f'U{name_width}'),
+                          ('wavelength_nm', np.int64), ('mu_a', np.float64),
+                          ('mu_s_prime', np.float64), ('mu_s', np.float64),
+                          ('g', np.float64), ('n', np.float64),
+                          ('penetration_depth', np.float64)])
         
+        # One vectorized spectrum per tissue over its measured wavelengths
+        blocks = []
         for tid in tissue_ids:
             tissue = self._tissues[tid]
-            for wl_str, data in tissue['wavelength_data'].items():
-                wl = int(wl_str)
-                props = self.get_properties(tid, wl)
-                rows.append([
-                    tid, tissue['name'], wl,
-                    f"{props.mu_a:.6f}", f"{props.mu_s_prime:.6f}", f"{props.mu_s:.6f}",
-                    f"{props.g:.4f}", f"{props.n:.3f}", f"{props.penetration_depth:.4f}"
-                ])
+            wavelengths = np.array([int(w) for w in tissue['wavelength_data']], dtype=np.int64)
+            spectrum = self.get_spectrum(tid, wavelengths)
+            
+            block = np.empty(len(wavelengths), dtype=dtype)
+            block['tissue_id'] = tid
+            block['tissue_name'] = tissue['name']
+            block['wavelength_nm'] = wavelengths
+            for field in ('mu_a', 'mu_s_prime', 'mu_s', 'g', 'penetration_depth'):
+                block[field] = spectrum[field]
+            block['n'] = tissue['refractive_index']['n']
+            blocks.append(block)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(','.join(header) + '\n')
-            for row in rows:
-                f.write(','.join(map(str, row)) + '\n')
+        records = np.concatenate(blocks) if blocks else np.empty(0, dtype=dtype)
+        np.savetxt(output_path, records, fmt=fmt, header=','.join(header),
+                   comments='', encoding='utf-8')
         
-        print(f"Exported {len(rows)} records to {output_path}")
+        print(f"Exported {len(records)} records to {output_path}")
 
 
 # ============================================================================
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-# Global database instance
+# Global database instance, created on first use
 _db = None
+_db_lock = threading.Lock()
 
 def _get_db() -> TissueDB:
     """Get or create the global database instance."""
     global _db
-    if _db is None:
-        _db = TissueDB()
-    return _db
+    db = _db
+    if db is None:
+        # Double-checked so concurrent first calls build only one database
+        with _db_lock:
+            if _db is None:
+                _db = TissueDB()
+            db = _db
+    return db
+
+
+def set_db(db: TissueDB) -> None:
+    """
+    Install a database instance for the convenience functions.
+    
+    Lets a worker process reuse a pre-built (and pre-warmed) TissueDB instead
+    of loading its own on first use.
+    """
+    global _db
+    with _db_lock:
+        _db = db
 
 
 def get_tissue(tissue_id: str, wavelength: float) -> OpticalProperties:
@@ -564,14 +996,42 @@ def get_mcml_params(tissue_id: str, wavelength: float) -> dict:
 # MULTILAYER TISSUE MODELS
 # ============================================================================
 
-def create_skin_model(wavelength: float, melanin_fraction: float = 0.02) -> List[dict]:
+def _layer_properties(tissue_id: str,
+                      wavelength: Union[float, np.ndarray]) -> OpticalProperties:
+    """
+    Layer optics at one wavelength, or over a wavelength array.
+    
+    For an array the spectrum is evaluated in one vectorized call and the
+    returned OpticalProperties holds arrays in its per-wavelength fields.
+    """
+    if np.ndim(wavelength) == 0:
+        return get_tissue(tissue_id, wavelength)
+    
+    db = _get_db()
+    spectrum = db.get_spectrum(tissue_id, wavelength)
+    tissue = db._tissues[tissue_id]
+    return OpticalProperties(
+        wavelength=spectrum['wavelengths'],
+        mu_a=spectrum['mu_a'],
+        mu_s_prime=spectrum['mu_s_prime'],
+        mu_s=spectrum['mu_s'],
+        g=spectrum['g'],
+        n=tissue['refractive_index']['n'],
+        penetration_depth=spectrum['penetration_depth'],
+        tissue_name=tissue['name']
+    )
+
+
+def create_skin_model(wavelength: Union[float, np.ndarray],
+                      melanin_fraction: float = 0.02) -> List[dict]:
     """
     Create a multi-layer skin model.
     
     Parameters:
     -----------
-    wavelength : float
-        Wavelength in nm
+    wavelength : float or array
+        Wavelength in nm. An array gives array-valued 'mu_a', 'mu_s' and
+        'g' in each layer, for parameter sweeps.
     melanin_fraction : float
         Melanin volume fraction in epidermis (0.01-0.15)
         
@@ -579,9 +1039,12 @@ def create_skin_model(wavelength: float, melanin_fraction: float = 0.02) -> List
     --------
     list of layer dictionaries for Monte Carlo simulation
     """
-    epi = get_tissue("skin_epidermis", wavelength)
-    derm = get_tissue("skin_dermis", wavelength)
-    fat = get_tissue("adipose_tissue", wavelength)
+    if np.ndim(wavelength) != 0:
+        wavelength = np.asarray(wavelength, dtype=np.float64)
+    
+    epi = _layer_properties("skin_epidermis", wavelength)
+    derm = _layer_properties("skin_dermis", wavelength)
+    fat = _layer_properties("adipose_tissue", wavelength)
     
     # Adjust epidermis absorption for melanin
     melanin_mu_a = 519 * (wavelength / 500) ** (-3.0) * melanin_fraction
@@ -704,7 +1167,7 @@ if __name__ == "__main__":
     print("=" * 60)
     
     props = db.get_properties("brain_gray_matter", 630)
-    print(props)
+    print(props.pretty())
     
     print("\n" + "=" * 60)
     print("Optimal wavelengths for maximum penetration:")
@@ -6,12 +6,20 @@ Simple Python client for the PhotonPath API.
 
 Installation:
     pip install requests
+    pip install aiohttp        # optional, for AsyncPhotonPathClient
+    pip install orjson         # optional, faster JSON encoding/decoding
+    pip install numpy numba    # optional, spectrum arrays and JIT reductions
+    pip install "httpx[http2]" # optional, HTTP/2 transport
+    pip install ijson          # optional, streamed simulate_summary
 
 Usage:
     from photonpath_sdk import PhotonPathClient
     
     client = PhotonPathClient(api_key="your_api_key")
     
+    # Reuse one client for all calls: it keeps a pooled, keep-alive
+    # session, so only the first request pays the TCP+TLS handshake.
+    
     # Get tissue properties
     props = client.get_tissue("brain_gray_matter", wavelength=630)
     print(f"Penetration depth: {props['derived']['penetration_depth_mm']} mm")
@@ -25,17 +33,105 @@ Version: 2.0.0
 License: MIT
 """
 
+import asyncio
+import codecs
+import csv
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Any, Tuple, Iterator
 from dataclasses import dataclass
 import json
 
+# orjson is optional: faster JSON for large responses and POST bodies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# NumPy is optional: array helpers (spectrum_as_arrays, spectrum reductions)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Numba is optional: JIT-compiled spectrum reductions
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# httpx is optional: HTTP/2 transport (pip install "httpx[http2]")
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# ijson is optional: incremental parsing for simulate_summary
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# aiohttp is optional: only needed for AsyncPhotonPathClient
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
 
 class PhotonPathError(Exception):
     """PhotonPath API error."""
     pass
 
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_json(data: Any) -> bytes:
+    """Serialize a request body, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _decode_json(content: bytes) -> Any:
+    """Decode a JSON response body, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _error_detail(content: bytes) -> str:
+    """The API's error "detail" from a failed response body, if any."""
+    try:
+        return _decode_json(content).get("detail", "")
+    except Exception:
+        return ""
+
+
+def _iter_text_lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    """Split a stream of UTF-8 byte chunks into text lines."""
+    pending = ""
+    for text in codecs.iterdecode(chunks, "utf-8"):
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        yield from (line.rstrip("\r") for line in lines)
+    if pending:
+        yield pending.rstrip("\r")
+
+
 class PhotonPathClient:
     """
     PhotonPath API Client.
@@ -48,48 +144,199 @@ class PhotonPathClient:
         API base URL (default: https://photonpath-api-production.up.railway.app)
     timeout : int
         Request timeout in seconds
+    cache_ttl : float
+        Seconds to keep GET responses in the client-side cache (0 disables)
+    transport : str
+        "requests" (default) or "httpx": an HTTP/2 ``httpx.Client`` that
+        multiplexes concurrent calls over one connection (needs httpx[http2])
+    
+    Calls share one pooled HTTP adapter (each thread gets its own
+    ``requests.Session`` on top of it); create a single client and reuse it
+    so connections are kept alive between calls. Threaded bulk helpers
+    such as ``map_get_tissues`` scale with worker count up to POOL_MAXSIZE.
+    GET responses are cached per (endpoint, params) for ``cache_ttl``
+    seconds, so repeated lookups in analysis loops skip the network;
+    call ``clear_cache()`` to force fresh results. Monte Carlo simulations
+    are stochastic and always hit the API.
     """
     
     DEFAULT_URL = "https://photonpath-api-production.up.railway.app"
+    POOL_CONNECTIONS = 20
+    POOL_MAXSIZE = 50
+    CACHE_MAXSIZE = 1024
+    BATCH_MAX_QUERIES = 100  # server limit for /v2/batch/tissues
     
     def __init__(
         self,
         api_key: str = "demo_key_12345",
         base_url: str = None,
-        timeout: int = 30
+        timeout: int = 30,
+        cache_ttl: float = 300,
+        transport: str = "requests"
     ):
+        if transport not in ("requests", "httpx"):
+            raise ValueError(f"Unknown transport: {transport}")
+        if transport == "httpx" and not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for transport='httpx'")
         self.api_key = api_key
         self.base_url = base_url or self.DEFAULT_URL
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({"X-API-Key": api_key})
+        self.cache_ttl = cache_ttl
+        # (endpoint, params) -> (expires_at, response body bytes)
+        self._cache: "OrderedDict[tuple, Tuple[float, bytes]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=Retry(total=3, backoff_factor=0.2,
+                              status_forcelist=[502, 503, 504]),
+        )
+        self._sessions = threading.local()
+        self._httpx = None
+        if transport == "httpx":
+            self._httpx = httpx.Client(
+                headers={"X-API-Key": api_key, "Accept-Encoding": "gzip, deflate"},
+                timeout=timeout,
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=3,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+                ),
+            )
     
-    def _request(self, method: str, endpoint: str, **kwargs) -> Dict:
-        """Make API request."""
+    @property
+    def session(self) -> requests.Session:
+        """This thread's Session, created on first use over the shared adapter."""
+        session = getattr(self._sessions, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "X-API-Key": self.api_key,
+                "Accept-Encoding": "gzip, deflate",
+            })
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            # Proxy/TLS settings from the environment, resolved once for _fast_get
+            self._sessions.send_settings = session.merge_environment_settings(
+                self.base_url, {}, False, None, None
+            )
+            self._sessions.session = session
+        return session
+    
+    def _fast_get(self, url: str, params: Optional[Dict], timeout: float) -> requests.Response:
+        """
+        GET straight through the shared adapter.
+        
+        Skips Session.request's per-call environment merge, cookie
+        extraction and hook dispatch, which a fixed single-host client
+        does not need. Redirects are rare here and fall back to the full
+        Session path.
+        """
+        session = self.session
+        prepared = session.prepare_request(requests.Request("GET", url, params=params))
+        response = self._adapter.send(prepared, timeout=timeout,
+                                      **self._sessions.send_settings)
+        if response.is_redirect:
+            response.close()
+            return session.request("GET", url, params=params, timeout=timeout)
+        return response
+    
+    def _send(self, method: str, endpoint: str, **kwargs) -> Any:
+        """Make API request and return the successful response."""
         url = f"{self.base_url}{endpoint}"
         kwargs.setdefault("timeout", self.timeout)
+        if self._httpx is not None:
+            return self._send_httpx(method, url, **kwargs)
         
         try:
-            response = self.session.request(method, url, **kwargs)
+            if method == "GET" and not kwargs.get("stream") and kwargs.keys() <= {"params", "timeout"}:
+                response = self._fast_get(url, kwargs.get("params"), kwargs["timeout"])
+            else:
+                response = self.session.request(method, url, **kwargs)
             response.raise_for_status()
-            return response.json()
+            return response
         except requests.exceptions.HTTPError as e:
-            error_detail = ""
-            try:
-                error_detail = response.json().get("detail", "")
-            except:
-                pass
-            raise PhotonPathError(f"API Error: {e} - {error_detail}")
+            raise PhotonPathError(f"API Error: {e} - {_error_detail(response.content)}")
         except requests.exceptions.RequestException as e:
             raise PhotonPathError(f"Request failed: {e}")
     
-    def _get(self, endpoint: str, params: Dict = None) -> Dict:
-        """GET request."""
-        return self._request("GET", endpoint, params=params)
+    def _send_httpx(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        """_send over the httpx (HTTP/2) transport."""
+        kwargs.pop("stream", None)  # streamed exports go through _stream()
+        try:
+            response = self._httpx.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as e:
+            raise PhotonPathError(f"API Error: {e} - {_error_detail(e.response.content)}")
+        except httpx.HTTPError as e:
+            raise PhotonPathError(f"Request failed: {e}")
     
-    def _post(self, endpoint: str, data: Dict = None) -> Dict:
-        """POST request."""
-        return self._request("POST", endpoint, json=data)
+    @contextmanager
+    def _stream(self, endpoint: str, params: Dict) -> Iterator[Iterator[bytes]]:
+        """Stream a GET response body as 64 kB chunks, on either transport."""
+        chunk_size = 64 * 1024
+        if self._httpx is None:
+            with self._send("GET", endpoint, params=params, stream=True) as response:
+                yield response.iter_content(chunk_size=chunk_size)
+            return
+        
+        url = f"{self.base_url}{endpoint}"
+        try:
+            with self._httpx.stream("GET", url, params=params) as response:
+                if response.is_error:
+                    response.read()
+                    response.raise_for_status()
+                yield response.iter_bytes(chunk_size=chunk_size)
+        except httpx.HTTPStatusError as e:
+            raise PhotonPathError(f"API Error: {e} - {_error_detail(e.response.content)}")
+        except httpx.HTTPError as e:
+            raise PhotonPathError(f"Request failed: {e}")
+    
+    def close(self):
+        """Close pooled connections (this thread's session and/or httpx client)."""
+        session = getattr(self._sessions, "session", None)
+        if session is not None:
+            session.close()
+            self._sessions.session = None
+        if self._httpx is not None:
+            self._httpx.close()
+    
+    def _request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make API request."""
+        return _decode_json(self._send(method, endpoint, **kwargs).content)
+    
+    def _get(self, endpoint: str, params: Dict = None, cache: bool = True) -> Dict:
+        """GET request, served from the response cache when possible."""
+        if not cache or self.cache_ttl <= 0:
+            return self._request("GET", endpoint, params=params)
+        
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                # Decode a fresh copy so callers may mutate the result
+                return _decode_json(entry[1])
+        
+        content = self._send("GET", endpoint, params=params).content
+        with self._cache_lock:
+            self._cache[key] = (now + self.cache_ttl, content)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAXSIZE:
+                self._cache.popitem(last=False)
+        return _decode_json(content)
+    
+    def clear_cache(self):
+        """Drop all cached GET responses."""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def _post(self, endpoint: str, data: Any = None) -> Dict:
+        """POST request (body serialized here, not inside requests)."""
+        return self._request("POST", endpoint, data=_encode_json(data),
+                             headers=_JSON_HEADERS)
     
     # =========================================================================
     # HEALTH & INFO
@@ -97,7 +344,7 @@ class PhotonPathClient:
     
     def health(self) -> Dict:
         """Check API health status."""
-        return self._get("/health")
+        return self._get("/health", cache=False)
     
     def info(self) -> Dict:
         """Get API information."""
@@ -138,6 +385,26 @@ class PhotonPathClient:
         """
         return self._get(f"/v2/tissues/{tissue_id}", {"wavelength": wavelength})
     
+    def map_get_tissues(
+        self,
+        tissue_ids: List[str],
+        wavelength: float,
+        max_workers: int = 10
+    ) -> List[Dict]:
+        """
+        Get several tissues at one wavelength concurrently.
+        
+        Requests run on a thread pool (one session per worker, one shared
+        connection pool), so N lookups cost roughly one round-trip of
+        wall-clock time instead of N.
+        Results are returned in the order of ``tissue_ids``.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(
+                lambda tissue_id: self.get_tissue(tissue_id, wavelength),
+                tissue_ids
+            ))
+    
     def get_tissue_spectrum(
         self,
         tissue_id: str,
@@ -150,6 +417,29 @@ class PhotonPathClient:
             "wl_min": wl_min, "wl_max": wl_max, "step": step
         })
     
+    def spectrum_as_arrays(
+        self,
+        tissue_id: str,
+        wl_min: float = 400,
+        wl_max: float = 900,
+        step: float = 10
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Get a tissue spectrum as float64 NumPy arrays (requires numpy).
+        
+        Returns:
+        --------
+        tuple : (wavelengths, mu_a, mu_s_prime, penetration_depth_mm),
+                ready for integrate_penetration / find_optical_window
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for spectrum_as_arrays")
+        data = self.get_tissue_spectrum(tissue_id, wl_min, wl_max, step)["data"]
+        return tuple(
+            np.asarray(data[name], dtype=np.float64)
+            for name in ("wavelengths", "mu_a", "mu_s_prime", "penetration_depth")
+        )
+    
     def compare_tissues(self, tissue_ids: List[str], wavelength: float) -> Dict:
         """Compare multiple tissues at a wavelength."""
         return self._get("/v2/tissues/compare", {
@@ -334,12 +624,12 @@ class PhotonPathClient:
         wavelength: float = 630,
         n_photons: int = 1000
     ) -> Dict:
-        """Run quick Monte Carlo simulation."""
+        """Run quick Monte Carlo simulation (never served from the cache)."""
         return self._get("/v2/simulate/quick", {
             "tissue_id": tissue_id,
             "wavelength": wavelength,
             "n_photons": n_photons
-        })
+        }, cache=False)
     
     def simulate(
         self,
@@ -358,6 +648,41 @@ class PhotonPathClient:
             "max_depth_mm": max_depth_mm
         })
     
+    def simulate_summary(
+        self,
+        tissue_id: str = "brain_gray_matter",
+        wavelength: float = 630,
+        n_photons: int = 1000,
+        beam_radius_mm: float = 0.1,
+        max_depth_mm: float = 10.0,
+        field: str = "results"
+    ) -> Dict:
+        """
+        Run a full Monte Carlo simulation but return only one top-level field.
+        
+        With ijson installed the response is parsed incrementally and
+        the connection is dropped once ``field`` (default "results":
+        reflectance, transmittance, penetration depths) has been read,
+        so the fluence profile arrays are never materialized. Without
+        ijson (or with the httpx transport) the full body is decoded.
+        """
+        data = {
+            "tissue_id": tissue_id,
+            "wavelength": wavelength,
+            "n_photons": n_photons,
+            "beam_radius_mm": beam_radius_mm,
+            "max_depth_mm": max_depth_mm
+        }
+        if not IJSON_AVAILABLE or self._httpx is not None:
+            return self._post("/v2/simulate", data)[field]
+        
+        with self._send("POST", "/v2/simulate", data=_encode_json(data),
+                        headers=_JSON_HEADERS, stream=True) as response:
+            response.raw.decode_content = True
+            for item in ijson.items(response.raw, field, use_float=True):
+                return item
+        raise PhotonPathError(f"Field not found in simulation response: {field}")
+    
     def simulate_multilayer(
         self,
         layers: List[Dict],
@@ -409,13 +734,46 @@ class PhotonPathClient:
     
     def export_csv(self, tissue_id: str, wl_min: float = 400, wl_max: float = 900) -> str:
         """Export tissue spectrum as CSV."""
-        response = self.session.get(
-            f"{self.base_url}/v2/export/csv",
-            params={"tissue_id": tissue_id, "wl_min": wl_min, "wl_max": wl_max},
-            timeout=self.timeout
-        )
-        response.raise_for_status()
-        return response.text
+        return self._send("GET", "/v2/export/csv", params={
+            "tissue_id": tissue_id, "wl_min": wl_min, "wl_max": wl_max
+        }).text
+    
+    export_csv_text = export_csv
+    
+    def _stream_csv(self, tissue_id: str, wl_min: float, wl_max: float):
+        """Open a streamed CSV export (context manager yielding byte chunks)."""
+        return self._stream("/v2/export/csv", {
+            "tissue_id": tissue_id, "wl_min": wl_min, "wl_max": wl_max
+        })
+    
+    def export_csv_to_file(
+        self,
+        tissue_id: str,
+        path: str,
+        wl_min: float = 400,
+        wl_max: float = 900
+    ) -> str:
+        """
+        Stream a tissue spectrum CSV straight to a file.
+        
+        The body is written in 64 kB chunks and never held in memory as
+        a whole. Returns the path written.
+        """
+        with self._stream_csv(tissue_id, wl_min, wl_max) as chunks:
+            with open(path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        return path
+    
+    def export_csv_rows(
+        self,
+        tissue_id: str,
+        wl_min: float = 400,
+        wl_max: float = 900
+    ) -> Iterator[List[str]]:
+        """Yield the parsed rows (header first) of a streamed CSV export."""
+        with self._stream_csv(tissue_id, wl_min, wl_max) as chunks:
+            yield from csv.reader(_iter_text_lines(chunks))
     
     # =========================================================================
     # BATCH
@@ -431,6 +789,249 @@ class PhotonPathClient:
             List of {"tissue_id": str, "wavelength": float}
         """
         return self._post("/v2/batch/tissues", queries)
+    
+    def get_tissues_bulk(self, queries: List[Tuple[str, float]]) -> List[Dict]:
+        """
+        Get many (tissue_id, wavelength) lookups with as few requests as possible.
+        
+        Queries are sent through the batch endpoint, BATCH_MAX_QUERIES per
+        request, instead of one HTTP round-trip each.
+        
+        Returns:
+        --------
+        list : One result per query, in input order, each with
+               tissue_id, wavelength, success, mu_a and penetration_mm
+               (or error when success is False)
+        """
+        payload = [{"tissue_id": t, "wavelength": w} for t, w in queries]
+        results = []
+        for start in range(0, len(payload), self.BATCH_MAX_QUERIES):
+            chunk = payload[start:start + self.BATCH_MAX_QUERIES]
+            results.extend(self.batch_query(chunk)["results"])
+        return results
+    
+    def spectrum_bulk(self, tissue_ids: List[str], wavelengths: List[float]) -> List[Dict]:
+        """Get every tissue at every wavelength (tissue-major order) in bulk."""
+        return self.get_tissues_bulk(
+            [(t, w) for t in tissue_ids for w in wavelengths]
+        )
+
+
+class AsyncPhotonPathClient:
+    """
+    Asynchronous PhotonPath API client (requires ``pip install aiohttp``).
+    
+    Mirrors the read-only calls of PhotonPathClient as coroutines. Many
+    calls awaited together (see ``gather_tissues``) share one keep-alive
+    connection pool, so N independent lookups take about one round-trip.
+    
+    Usage:
+        async with AsyncPhotonPathClient(api_key="your_api_key") as client:
+            results = await client.gather_tissues(["brain_gray_matter", "skin"], 630)
+    """
+    
+    DEFAULT_URL = PhotonPathClient.DEFAULT_URL
+    
+    def __init__(
+        self,
+        api_key: str = "demo_key_12345",
+        base_url: str = None,
+        timeout: int = 30
+    ):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for AsyncPhotonPathClient")
+        self.api_key = api_key
+        self.base_url = base_url or self.DEFAULT_URL
+        self.timeout = timeout
+        self._session = None
+    
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """Shared aiohttp session, created on first use inside the event loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={"X-API-Key": self.api_key},
+                connector=aiohttp.TCPConnector(
+                    limit=20, limit_per_host=10, keepalive_timeout=30
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the underlying connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _request(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """Make API request."""
+        url = f"{self.base_url}{endpoint}"
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                if response.status >= 400:
+                    error_detail = ""
+                    try:
+                        error_detail = _decode_json(await response.read()).get("detail", "")
+                    except Exception:
+                        pass
+                    raise PhotonPathError(
+                        f"API Error: {response.status} {response.reason} - {error_detail}"
+                    )
+                return _decode_json(await response.read())
+        except aiohttp.ClientError as e:
+            raise PhotonPathError(f"Request failed: {e}")
+    
+    async def _get(self, endpoint: str, params: Dict = None) -> Dict:
+        """GET request."""
+        return await self._request("GET", endpoint, params=params)
+    
+    async def _post(self, endpoint: str, data: Any = None) -> Dict:
+        """POST request."""
+        return await self._request("POST", endpoint, data=_encode_json(data),
+                                   headers=_JSON_HEADERS)
+    
+    async def health(self) -> Dict:
+        """Check API health status."""
+        return await self._get("/health")
+    
+    async def get_tissue(self, tissue_id: str, wavelength: float) -> Dict:
+        """Get optical properties of a tissue at a wavelength."""
+        return await self._get(f"/v2/tissues/{tissue_id}", {"wavelength": wavelength})
+    
+    async def get_tissue_spectrum(
+        self,
+        tissue_id: str,
+        wl_min: float = 400,
+        wl_max: float = 900,
+        step: float = 10
+    ) -> Dict:
+        """Get full spectrum of tissue optical properties."""
+        return await self._get(f"/v2/tissues/{tissue_id}/spectrum", {
+            "wl_min": wl_min, "wl_max": wl_max, "step": step
+        })
+    
+    async def gather_tissues(self, tissue_ids: List[str], wavelength: float) -> List[Dict]:
+        """Get several tissues at one wavelength concurrently, in input order."""
+        return await asyncio.gather(
+            *(self.get_tissue(tissue_id, wavelength) for tissue_id in tissue_ids)
+        )
+    
+    async def optogenetics_power(
+        self,
+        opsin_id: str,
+        depth_mm: float,
+        tissue_id: str = "brain_gray_matter",
+        fiber_diameter_um: float = 200,
+        fiber_NA: float = 0.39,
+        activation_factor: float = 2.0
+    ) -> Dict:
+        """Calculate required power for optogenetics."""
+        return await self._get("/v2/optogenetics/power-calculator", {
+            "opsin_id": opsin_id,
+            "target_depth_mm": depth_mm,
+            "tissue_id": tissue_id,
+            "fiber_diameter_um": fiber_diameter_um,
+            "fiber_NA": fiber_NA,
+            "activation_factor": activation_factor
+        })
+    
+    async def check_thermal_safety(
+        self,
+        power_mW: float,
+        wavelength: float = 470,
+        spot_mm: float = 0.2,
+        application: str = "chronic",
+        tissue_id: str = "brain_gray_matter"
+    ) -> Dict:
+        """Check thermal safety of illumination."""
+        return await self._get("/v2/thermal/check", {
+            "power_mW": power_mW,
+            "wavelength": wavelength,
+            "spot_mm": spot_mm,
+            "application": application,
+            "tissue_id": tissue_id
+        })
+    
+    async def batch_query(self, queries: List[Dict]) -> Dict:
+        """Batch query tissue properties."""
+        return await self._post("/v2/batch/tissues", queries)
+
+
+# =============================================================================
+# SPECTRUM REDUCTIONS
+# =============================================================================
+
+def _integrate_penetration_loop(wavelengths, penetration):
+    """Trapezoidal integral of penetration depth over wavelength (mm·nm)."""
+    total = 0.0
+    for i in range(1, wavelengths.shape[0]):
+        total += 0.5 * (penetration[i] + penetration[i - 1]) * (wavelengths[i] - wavelengths[i - 1])
+    return total
+
+
+def _find_optical_window_loop(wavelengths, penetration, fraction):
+    """Longest contiguous run with penetration >= fraction * max."""
+    n = wavelengths.shape[0]
+    if n == 0:
+        return np.nan, np.nan
+    threshold = fraction * penetration.max()
+    best_start, best_len = 0, 0
+    start = -1
+    for i in range(n + 1):
+        inside = i < n and penetration[i] >= threshold
+        if inside and start < 0:
+            start = i
+        elif not inside and start >= 0:
+            if i - start > best_len:
+                best_start, best_len = start, i - start
+            start = -1
+    return wavelengths[best_start], wavelengths[best_start + best_len - 1]
+
+
+if NUMBA_AVAILABLE:
+    _integrate_penetration_kernel = njit(cache=True)(_integrate_penetration_loop)
+    _find_optical_window_kernel = njit(cache=True)(_find_optical_window_loop)
+
+
+def integrate_penetration(wavelengths, penetration) -> float:
+    """
+    Trapezoidal integral of penetration depth over wavelength (mm·nm).
+    
+    Requires numpy; uses a Numba kernel when numba is installed, NumPy
+    otherwise.
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for integrate_penetration")
+    wavelengths = np.ascontiguousarray(wavelengths, dtype=np.float64)
+    penetration = np.ascontiguousarray(penetration, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return float(_integrate_penetration_kernel(wavelengths, penetration))
+    return float(np.sum(0.5 * (penetration[1:] + penetration[:-1]) * np.diff(wavelengths)))
+
+
+def find_optical_window(wavelengths, penetration, fraction: float = 0.8) -> Tuple[float, float]:
+    """
+    Widest contiguous wavelength band where penetration is at least
+    ``fraction`` of its maximum (requires numpy).
+    
+    Returns:
+    --------
+    tuple : (start_nm, end_nm)
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is required for find_optical_window")
+    wavelengths = np.ascontiguousarray(wavelengths, dtype=np.float64)
+    penetration = np.ascontiguousarray(penetration, dtype=np.float64)
+    kernel = _find_optical_window_kernel if NUMBA_AVAILABLE else _find_optical_window_loop
+    start, end = kernel(wavelengths, penetration, float(fraction))
+    return float(start), float(end)
 
 
 # =============================================================================
@@ -498,4 +1099,10 @@ if __name__ == "__main__":
     print(f"  ΔT = {thermal['prediction']['temperature_rise_C']}°C")
     print(f"  Safe = {thermal['safety']['is_safe']}")
     
+    # Bulk lookup: one request for all tissue/wavelength pairs
+    rows = client.spectrum_bulk(["brain_gray_matter", "brain_white_matter"], [470, 630, 850])
+    print(f"\nBulk penetration (mm):")
+    for row in rows:
+        print(f"  {row['tissue_id']} @ {row['wavelength']:.0f}nm = {row.get('penetration_mm')}")
+    
     print("\n✓ SDK working correctly!")
\ No newline at end of file
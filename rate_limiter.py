@@ -19,11 +19,15 @@ Author: PhotonPath
 Version: 1.0.0
 """
 
+import math
 import time
 import hashlib
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, NamedTuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from functools import lru_cache
 from enum import Enum
 
 # Try to import redis, fallback to in-memory if not available
@@ -83,7 +87,95 @@ PLAN_LIMITS = {
 }
 
 
-@dataclass
+class PlanLimits(NamedTuple):
+    """Limits of one plan, with attribute access for the hot path."""
+    requests_per_day: int
+    requests_per_minute: int
+    monte_carlo_per_day: int
+    batch_size: int
+    tissues_access: str
+
+
+# PLAN_LIMITS frozen into tuples once; PLAN_LIMITS stays the public dict form
+_PLAN_LIMIT_TABLE: Dict[Plan, PlanLimits] = {
+    plan: PlanLimits(**limits) for plan, limits in PLAN_LIMITS.items()
+}
+
+
+# One round-trip rate-limit check. The minute limit is a token bucket
+# (capacity = requests_per_minute, refilled continuously over 60s) kept as
+# a two-field hash {t: tokens, ts: last update ms}: constant memory per key
+# whatever the traffic. The day and Monte Carlo limits are plain counters.
+# Nothing is consumed unless every limit still has room, so the check and
+# the update are atomic.
+#   KEYS = [minute_key, day_key, mc_key]
+#   ARGV = [minute_limit, day_limit, mc_limit, is_mc ("1"/"0"), now_ms]
+# Returns {allowed, window, count, retry_after}; window is 1=minute,
+# 2=day, 3=mc and names the counter that denied the request (day when
+# allowed). retry_after is in seconds for the minute window and 0
+# otherwise (daily windows reset at UTC midnight, known to the caller).
+_RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[5])
+local cap = tonumber(ARGV[1])
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = cap
+if state[1] then
+    tokens = math.min(cap, tonumber(state[1]) + (now - tonumber(state[2])) * cap / 60000)
+end
+if tokens < 1 then
+    return {0, 1, 0, math.ceil((1 - tokens) * 60 / cap)}
+end
+local day = tonumber(redis.call('GET', KEYS[2]) or '0')
+local is_mc = ARGV[4] == '1'
+if is_mc then
+    local mc = tonumber(redis.call('GET', KEYS[3]) or '0')
+    if mc >= tonumber(ARGV[3]) then
+        return {0, 3, mc, 0}
+    end
+end
+if day >= tonumber(ARGV[2]) then
+    return {0, 2, day, 0}
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens - 1), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 60000)
+day = redis.call('INCR', KEYS[2])
+if day == 1 then
+    redis.call('EXPIRE', KEYS[2], 86400)
+end
+if is_mc and redis.call('INCR', KEYS[3]) == 1 then
+    redis.call('EXPIRE', KEYS[3], 86400)
+end
+return {1, 2, day, 0}
+"""
+
+# Windows reported by the rate-limit script
+_WINDOW_MINUTE = 1
+_WINDOW_DAY = 2
+_WINDOW_MC = 3
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utc_from_epoch(seconds: int) -> datetime:
+    """Naive UTC datetime for a Unix timestamp (same form as utcnow())."""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+def _to_int(value) -> int:
+    """Counter value from a store reply (bytes, str or None)."""
+    return int(value) if value is not None else 0
+
+
+def _bucket_tokens(state: list, capacity: int, now_ms: int) -> float:
+    """Tokens in a minute bucket now, from its stored [tokens, ts_ms] reply."""
+    tokens, updated_ms = state
+    if tokens is None:
+        return float(capacity)
+    return min(capacity, float(tokens) + (now_ms - int(updated_ms)) * capacity / 60000)
+
+
+@dataclass(frozen=True, slots=True)
 class RateLimitResult:
     allowed: bool
     remaining: int
@@ -93,50 +185,148 @@ class RateLimitResult:
 
 
 class InMemoryStore:
-    """Fallback in-memory rate limiter (for development only)."""
+    """
+    Fallback in-memory rate limiter (for development only).
+    
+    Thread-safe, and bounded to ``maxsize`` keys: when full, the least
+    recently used key is evicted, so memory stays flat however many
+    distinct API keys are seen. Expired entries are also swept every
+    SWEEP_EVERY rate-limit checks, so idle keys do not linger until
+    eviction.
+    """
     
-    def __init__(self):
-        self._store: Dict[str, Dict[str, Any]] = {}
+    SWEEP_EVERY = 1024
+    
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._ops = 0
+    
+    def _live(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entry for key if it has not expired (marks it recently used)."""
+        data = self._store.get(key)
+        if data is None:
+            return None
+        if data.get('expires_at', 0) <= time.time():
+            del self._store[key]
+            return None
+        self._store.move_to_end(key)
+        return data
+    
+    def _put(self, key: str, value: Any, expires_at: float):
+        self._store[key] = {'value': value, 'expires_at': expires_at}
+        self._store.move_to_end(key)
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
     
     def get(self, key: str) -> Optional[str]:
-        if key in self._store:
-            data = self._store[key]
-            if data.get('expires_at', 0) > time.time():
-                return str(data.get('value', 0))
-            else:
-                del self._store[key]
-        return None
+        with self._lock:
+            data = self._live(key)
+            return None if data is None else str(data.get('value', 0))
     
     def set(self, key: str, value: Any, ex: int = None):
-        self._store[key] = {
-            'value': value,
-            'expires_at': time.time() + (ex or 86400)
-        }
+        with self._lock:
+            self._put(key, value, time.time() + (ex or 86400))
     
     def incr(self, key: str) -> int:
-        current = int(self.get(key) or 0)
-        new_value = current + 1
-        # Preserve existing TTL
-        if key in self._store:
-            expires_at = self._store[key].get('expires_at', time.time() + 86400)
-            self._store[key] = {'value': new_value, 'expires_at': expires_at}
-        else:
-            self._store[key] = {'value': new_value, 'expires_at': time.time() + 86400}
-        return new_value
+        with self._lock:
+            data = self._live(key)
+            if data is None:
+                new_value = 1
+                self._put(key, new_value, time.time() + 86400)
+            else:
+                # Preserve existing TTL
+                new_value = int(data['value']) + 1
+                data['value'] = new_value
+            return new_value
     
     def ttl(self, key: str) -> int:
-        if key in self._store:
-            return max(0, int(self._store[key].get('expires_at', 0) - time.time()))
-        return 0
+        with self._lock:
+            data = self._live(key)
+            if data is None:
+                return 0
+            return max(0, int(data['expires_at'] - time.time()))
     
     def expire(self, key: str, seconds: int):
-        if key in self._store:
-            self._store[key]['expires_at'] = time.time() + seconds
+        with self._lock:
+            data = self._live(key)
+            if data is not None:
+                data['expires_at'] = time.time() + seconds
+    
+    def hmget(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        with self._lock:
+            data = self._live(key)
+            values = {} if data is None else data['value']
+            return [None if values.get(f) is None else str(values[f]) for f in fields]
+    
+    def hset(self, key: str, mapping: Dict[str, Any]):
+        with self._lock:
+            data = self._live(key)
+            if data is None:
+                self._put(key, dict(mapping), time.time() + 86400)
+            else:
+                data['value'].update(mapping)
+    
+    def rate_limit_script(self, keys: list, args: list) -> list:
+        """In-memory equivalent of _RATE_LIMIT_LUA (same keys, args and reply)."""
+        with self._lock:
+            self._ops += 1
+            if self._ops % self.SWEEP_EVERY == 0:
+                self._sweep()
+            return self._rate_limit_locked(keys, args)
+    
+    def _sweep(self):
+        """Drop every expired entry (caller holds the lock)."""
+        now = time.time()
+        for key in [k for k, data in self._store.items() if data['expires_at'] <= now]:
+            del self._store[key]
+    
+    def _rate_limit_locked(self, keys: list, args: list) -> list:
+        minute_key, day_key, mc_key = keys
+        minute_limit, day_limit, mc_limit, is_mc, now_ms = args
+        is_mc = str(is_mc) == "1"
+        
+        cap = int(minute_limit)
+        tokens = _bucket_tokens(self.hmget(minute_key, ["t", "ts"]), cap, now_ms)
+        if tokens < 1:
+            return [0, _WINDOW_MINUTE, 0, math.ceil((1 - tokens) * 60 / cap)]
+        day = _to_int(self.get(day_key))
+        if is_mc:
+            mc = _to_int(self.get(mc_key))
+            if mc >= int(mc_limit):
+                return [0, _WINDOW_MC, mc, 0]
+        if day >= int(day_limit):
+            return [0, _WINDOW_DAY, day, 0]
+        
+        self.hset(minute_key, {"t": tokens - 1, "ts": now_ms})
+        self.expire(minute_key, 60)
+        day = self.incr(day_key)
+        if day == 1:
+            self.expire(day_key, 86400)
+        if is_mc and self.incr(mc_key) == 1:
+            self.expire(mc_key, 86400)
+        return [1, _WINDOW_DAY, day, 0]
+
+
+REDIS_MAX_CONNECTIONS = 50
+
+
+@lru_cache(maxsize=None)
+def get_connection_pool(redis_url: str) -> "redis.ConnectionPool":
+    """
+    Process-wide connection pool for a Redis URL.
+    
+    Built on first use and shared by every limiter (and any other Redis
+    user, e.g. the billing customer store) for that URL, so re-initialising
+    never opens a fresh set of connections.
+    """
+    return redis.ConnectionPool.from_url(redis_url, max_connections=REDIS_MAX_CONNECTIONS)
 
 
 class RateLimiter:
     """
-    Redis-based rate limiter with sliding window.
+    Redis-based rate limiter: per-minute token bucket plus daily counters.
     
     Parameters:
     -----------
@@ -146,12 +336,15 @@ class RateLimiter:
         Key prefix for Redis keys
     """
     
+    MAX_CONNECTIONS = REDIS_MAX_CONNECTIONS
+    
     def __init__(self, redis_url: str = None, prefix: str = "photonpath"):
         self.prefix = prefix
         
         if redis_url and REDIS_AVAILABLE:
             try:
-                self.redis = redis.from_url(redis_url, decode_responses=True)
+                # Replies stay bytes: counters are parsed with int() directly
+                self.redis = redis.Redis(connection_pool=get_connection_pool(redis_url))
                 self.redis.ping()
                 self._using_redis = True
                 print(f"✅ Redis connected: {redis_url}")
@@ -164,15 +357,34 @@ class RateLimiter:
             self._using_redis = False
             if not REDIS_AVAILABLE:
                 print("⚠️ Redis package not installed. Using in-memory rate limiting.")
+        
+        if self._using_redis:
+            # register_script calls EVALSHA (re-loading on NOSCRIPT after a
+            # Redis restart); loading it now spares the first request that
+            # NOSCRIPT round-trip and surfaces script errors at startup.
+            self._rate_limit_script = self.redis.register_script(_RATE_LIMIT_LUA)
+            self.redis.script_load(_RATE_LIMIT_LUA)
+        else:
+            self._rate_limit_script = self.redis.rate_limit_script
     
     @property
     def is_redis(self) -> bool:
         return self._using_redis
     
+    @staticmethod
+    @lru_cache(maxsize=10000)
+    def _hash_key(api_key: str) -> str:
+        """Truncated md5 of an API key (unchanged Redis key names), cached for hot keys."""
+        return hashlib.md5(api_key.encode()).hexdigest()[:12]
+    
     def _get_key(self, api_key: str, window: str) -> str:
         """Generate Redis key for rate limiting."""
-        key_hash = hashlib.md5(api_key.encode()).hexdigest()[:12]
-        return f"{self.prefix}:ratelimit:{key_hash}:{window}"
+        return f"{self.prefix}:ratelimit:{self._hash_key(api_key)}:{window}"
+    
+    def _window_keys(self, api_key: str, day_bucket: int) -> Tuple[str, str, str]:
+        """(minute, day, monte carlo) keys for an API key, hashing it once."""
+        base = f"{self.prefix}:ratelimit:{self._hash_key(api_key)}:"
+        return base + "min", f"{base}d{day_bucket}", f"{base}mc_d{day_bucket}"
     
     def check_rate_limit(
         self,
@@ -196,103 +408,136 @@ class RateLimiter:
         --------
         RateLimitResult
         """
-        limits = PLAN_LIMITS[plan]
-        now = datetime.utcnow()
+        limits = _PLAN_LIMIT_TABLE[plan]
+        now_ms = int(time.time() * 1000)
         
-        # Check per-minute limit
-        minute_key = self._get_key(api_key, now.strftime("%Y%m%d%H%M"))
-        minute_count = int(self.redis.get(minute_key) or 0)
-        minute_limit = limits["requests_per_minute"]
+        # Check and increment all counters in one round-trip
+        keys, args = self._script_call(api_key, limits, endpoint_type, now_ms)
+        reply = self._rate_limit_script(keys=keys, args=args)
+        return self._to_result(reply, limits, now_ms)
+    
+    def check_rate_limit_batch(
+        self,
+        api_keys: List[str],
+        plan: Plan = Plan.SPARK,
+        endpoint_type: str = "general"
+    ) -> List[RateLimitResult]:
+        """
+        Check (and count) one request per entry of api_keys.
         
-        if minute_count >= minute_limit:
-            return RateLimitResult(
-                allowed=False,
-                remaining=0,
-                limit=minute_limit,
-                reset_at=now.replace(second=0, microsecond=0) + timedelta(minutes=1),
-                retry_after=60 - now.second
-            )
+        Equivalent to calling check_rate_limit for each key in order, but
+        with Redis all script calls go out in a single non-transactional
+        pipeline: one round-trip for the whole batch.
         
-        # Check per-day limit
-        day_key = self._get_key(api_key, now.strftime("%Y%m%d"))
-        day_count = int(self.redis.get(day_key) or 0)
-        day_limit = limits["requests_per_day"]
+        Returns:
+        --------
+        list of RateLimitResult, in the same order as api_keys
+        """
+        limits = _PLAN_LIMIT_TABLE[plan]
+        now_ms = int(time.time() * 1000)
+        calls = [self._script_call(key, limits, endpoint_type, now_ms) for key in api_keys]
         
-        # Special limits for Monte Carlo
-        if endpoint_type == "monte_carlo":
-            mc_key = self._get_key(api_key, f"mc_{now.strftime('%Y%m%d')}")
-            mc_count = int(self.redis.get(mc_key) or 0)
-            mc_limit = limits["monte_carlo_per_day"]
-            
-            if mc_count >= mc_limit:
-                return RateLimitResult(
-                    allowed=False,
-                    remaining=0,
-                    limit=mc_limit,
-                    reset_at=now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1),
-                    retry_after=self.redis.ttl(mc_key)
-                )
+        if self._using_redis:
+            pipe = self.redis.pipeline(transaction=False)
+            for keys, args in calls:
+                self._rate_limit_script(keys=keys, args=args, client=pipe)
+            replies = pipe.execute()
+        else:
+            replies = [self._rate_limit_script(keys=keys, args=args) for keys, args in calls]
+        
+        return [self._to_result(reply, limits, now_ms) for reply in replies]
+    
+    def _script_call(
+        self,
+        api_key: str,
+        limits: PlanLimits,
+        endpoint_type: str,
+        now_ms: int
+    ) -> Tuple[list, list]:
+        """KEYS and ARGV of one rate-limit script call."""
+        minute_key, day_key, mc_key = self._window_keys(api_key, now_ms // 86400000)
+        return (
+            [minute_key, day_key, mc_key],
+            [limits.requests_per_minute, limits.requests_per_day, limits.monte_carlo_per_day,
+             1 if endpoint_type == "monte_carlo" else 0,
+             now_ms]
+        )
+    
+    @staticmethod
+    def _to_result(reply: list, limits: PlanLimits, now_ms: int) -> RateLimitResult:
+        """Build the RateLimitResult for a script reply."""
+        allowed, window, count, ttl = reply
+        t = now_ms // 1000
+        reset_epoch = (t // 86400 + 1) * 86400
+        day_limit = limits.requests_per_day
         
-        if day_count >= day_limit:
+        if allowed:
             return RateLimitResult(
-                allowed=False,
-                remaining=0,
+                allowed=True,
+                remaining=day_limit - count,
                 limit=day_limit,
-                reset_at=now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1),
-                retry_after=self.redis.ttl(day_key)
+                reset_at=_utc_from_epoch(reset_epoch)
             )
         
-        # Increment counters
-        new_minute = self.redis.incr(minute_key)
-        if new_minute == 1:
-            self.redis.expire(minute_key, 60)
-        
-        new_day = self.redis.incr(day_key)
-        if new_day == 1:
-            self.redis.expire(day_key, 86400)
-        
-        if endpoint_type == "monte_carlo":
-            mc_key = self._get_key(api_key, f"mc_{now.strftime('%Y%m%d')}")
-            new_mc = self.redis.incr(mc_key)
-            if new_mc == 1:
-                self.redis.expire(mc_key, 86400)
+        if window == _WINDOW_MINUTE:
+            retry_after = int(ttl)
+            return RateLimitResult(
+                allowed=False,
+                remaining=0,
+                limit=limits.requests_per_minute,
+                reset_at=_utc_from_epoch(t + retry_after),
+                retry_after=retry_after
+            )
         
         return RateLimitResult(
-            allowed=True,
-            remaining=day_limit - new_day,
-            limit=day_limit,
-            reset_at=now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            allowed=False,
+            remaining=0,
+            limit=limits.monte_carlo_per_day if window == _WINDOW_MC else day_limit,
+            reset_at=_utc_from_epoch(reset_epoch),
+            retry_after=reset_epoch - t
         )
     
     def get_usage(self, api_key: str, plan: Plan = Plan.SPARK) -> Dict[str, Any]:
         """Get current usage statistics for an API key."""
-        now = datetime.utcnow()
-        limits = PLAN_LIMITS[plan]
+        now_ms = int(time.time() * 1000)
+        t = now_ms // 1000
+        day_bucket = t // 86400
+        limits = _PLAN_LIMIT_TABLE[plan]
         
-        day_key = self._get_key(api_key, now.strftime("%Y%m%d"))
-        minute_key = self._get_key(api_key, now.strftime("%Y%m%d%H%M"))
-        mc_key = self._get_key(api_key, f"mc_{now.strftime('%Y%m%d')}")
+        minute_key, day_key, mc_key = self._window_keys(api_key, day_bucket)
         
-        day_count = int(self.redis.get(day_key) or 0)
-        minute_count = int(self.redis.get(minute_key) or 0)
-        mc_count = int(self.redis.get(mc_key) or 0)
+        # All three reads in one round-trip with Redis
+        client = self.redis.pipeline(transaction=False) if self._using_redis else self.redis
+        replies = [
+            client.get(day_key),
+            client.hmget(minute_key, ["t", "ts"]),
+            client.get(mc_key),
+        ]
+        if self._using_redis:
+            replies = client.execute()
+        day_reply, minute_state, mc_reply = replies
+        
+        day_count = _to_int(day_reply)
+        minute_limit = limits.requests_per_minute
+        minute_count = minute_limit - int(_bucket_tokens(minute_state, minute_limit, now_ms))
+        mc_count = _to_int(mc_reply)
         
         return {
             "daily": {
                 "used": day_count,
-                "limit": limits["requests_per_day"],
-                "remaining": max(0, limits["requests_per_day"] - day_count),
-                "reset_in_seconds": self.redis.ttl(day_key)
+                "limit": limits.requests_per_day,
+                "remaining": max(0, limits.requests_per_day - day_count),
+                "reset_in_seconds": (day_bucket + 1) * 86400 - t
             },
             "per_minute": {
                 "used": minute_count,
-                "limit": limits["requests_per_minute"],
-                "remaining": max(0, limits["requests_per_minute"] - minute_count)
+                "limit": minute_limit,
+                "remaining": max(0, minute_limit - minute_count)
             },
             "monte_carlo": {
                 "used": mc_count,
-                "limit": limits["monte_carlo_per_day"],
-                "remaining": max(0, limits["monte_carlo_per_day"] - mc_count)
+                "limit": limits.monte_carlo_per_day,
+                "remaining": max(0, limits.monte_carlo_per_day - mc_count)
             },
             "plan": plan.value
         }
@@ -314,17 +559,21 @@ def get_rate_limiter() -> Optional[RateLimiter]:
     return _limiter
 
 
+# Shared result when no limiter is configured (RateLimitResult is frozen)
+_UNLIMITED_RESULT = RateLimitResult(
+    allowed=True,
+    remaining=999999,
+    limit=999999,
+    reset_at=datetime.max
+)
+
+
 # FastAPI dependency
 async def check_rate_limit_dependency(api_key: str, plan: str = "free") -> RateLimitResult:
     """FastAPI dependency for rate limiting."""
     if _limiter is None:
         # No rate limiting configured
-        return RateLimitResult(
-            allowed=True,
-            remaining=999999,
-            limit=999999,
-            reset_at=datetime.utcnow() + timedelta(days=1)
-        )
+        return _UNLIMITED_RESULT
     
     try:
         plan_enum = Plan(plan)
@@ -8,10 +8,15 @@ Ce script crée les produits et prix sur ton compte Stripe.
 Usage:
     python setup_stripe.py
 
+Les créations de produits/prix sont envoyées en parallèle (asyncio) :
+nécessite une version de stripe avec les méthodes *_async et httpx.
+
 Author: PhotonPath
 """
 
 import os
+import asyncio
+from pathlib import Path
 import stripe
 from dotenv import load_dotenv
 
@@ -110,25 +115,68 @@ PRODUCTS = {
 
 created_prices = {}
 
-for plan_id, plan_data in PRODUCTS.items():
-    print(f"\n{'='*40}")
-    print(f"📦 Création: {plan_data['name']}")
-    print(f"{'='*40}")
+# Lister une seule fois les produits existants (toutes les pages)
+products_by_name = {p.name: p for p in stripe.Product.list(limit=100).auto_paging_iter()}
+
+# Prix existants retrouvés par lookup_key ("<plan>_monthly" / "<plan>_yearly") :
+# un seul appel indexé au lieu de lister et filtrer tous les prix
+LOOKUP_KEYS = [f"{plan_id}_{billing}" for plan_id in PRODUCTS for billing in ("monthly", "yearly")]
+prices_by_lookup_key = {
+    price.lookup_key: price
+    for price in stripe.Price.list(lookup_keys=LOOKUP_KEYS, limit=100).auto_paging_iter()
+}
+
+
+async def find_legacy_price(product, interval, lookup_key):
+    """Prix créé avant les lookup_key : le retrouver et lui attribuer sa clé."""
+    prices = await stripe.Price.list_async(product=product.id, active=True, limit=100)
+    for price in prices.data:
+        if price.recurring and price.recurring.interval == interval:
+            return await stripe.Price.modify_async(price.id, lookup_key=lookup_key)
+    return None
+
+
+async def ensure_price(plan_id, product, interval, amount, log, new_product=False):
+    """Crée le prix récurrent (month/year) s'il n'existe pas encore."""
+    billing = "monthly" if interval == "month" else "yearly"
+    label = "mensuel" if interval == "month" else "annuel"
+    lookup_key = f"{plan_id}_{billing}"
+    log.append(f"   💰 Prix {label}: {amount/100:.2f}€")
+    
+    # Vérifier si le prix existe
+    price = prices_by_lookup_key.get(lookup_key)
+    if price is None and not new_product:
+        price = await find_legacy_price(product, interval, lookup_key)
+    if price is not None:
+        created_prices[lookup_key] = price.id
+        log.append(f"   ⚠️ Prix {label} existe: {price.id}")
+        return
+    
+    price = await stripe.Price.create_async(
+        product=product.id,
+        unit_amount=amount,
+        currency="eur",
+        recurring={"interval": interval},
+        lookup_key=lookup_key,
+        metadata={"plan_id": plan_id, "billing": billing}
+    )
+    created_prices[lookup_key] = price.id
+    log.append(f"   ✅ Prix {label} créé: {price.id}")
+
+
+async def ensure_product(plan_id, plan_data):
+    """Crée le produit et ses deux prix; renvoie les lignes de log du plan."""
+    log = [f"\n{'='*40}", f"📦 Création: {plan_data['name']}", f"{'='*40}"]
     
     # Vérifier si le produit existe déjà
-    existing_products = stripe.Product.list(limit=100)
-    existing = None
-    for p in existing_products.data:
-        if p.name == plan_data['name']:
-            existing = p
-            break
+    existing = products_by_name.get(plan_data['name'])
     
     if existing:
-        print(f"   ⚠️ Produit existe déjà: {existing.id}")
+        log.append(f"   ⚠️ Produit existe déjà: {existing.id}")
         product = existing
     else:
         # Créer le produit
-        product = stripe.Product.create(
+        product = await stripe.Product.create_async(
             name=plan_data['name'],
             description=plan_data['description'],
             metadata={
@@ -136,50 +184,37 @@ for plan_id, plan_data in PRODUCTS.items():
                 "features": ", ".join(plan_data['features'][:3])
             }
         )
-        print(f"   ✅ Produit créé: {product.id}")
-    
-    # Créer le prix mensuel
-    print(f"\n   💰 Prix mensuel: {plan_data['price_monthly']/100:.2f}€")
+        log.append(f"   ✅ Produit créé: {product.id}")
     
-    # Vérifier si le prix existe
-    existing_prices = stripe.Price.list(product=product.id, limit=10)
-    monthly_exists = False
-    yearly_exists = False
-    
-    for price in existing_prices.data:
-        if price.recurring and price.recurring.interval == "month":
-            monthly_exists = True
-            created_prices[f"{plan_id}_monthly"] = price.id
-            print(f"   ⚠️ Prix mensuel existe: {price.id}")
-        if price.recurring and price.recurring.interval == "year":
-            yearly_exists = True
-            created_prices[f"{plan_id}_yearly"] = price.id
-            print(f"   ⚠️ Prix annuel existe: {price.id}")
-    
-    if not monthly_exists:
-        price_monthly = stripe.Price.create(
-            product=product.id,
-            unit_amount=plan_data['price_monthly'],
-            currency="eur",
-            recurring={"interval": "month"},
-            metadata={"plan_id": plan_id, "billing": "monthly"}
-        )
-        created_prices[f"{plan_id}_monthly"] = price_monthly.id
-        print(f"   ✅ Prix mensuel créé: {price_monthly.id}")
-    
-    # Créer le prix annuel
-    print(f"   💰 Prix annuel: {plan_data['price_yearly']/100:.2f}€")
-    
-    if not yearly_exists:
-        price_yearly = stripe.Price.create(
-            product=product.id,
-            unit_amount=plan_data['price_yearly'],
-            currency="eur",
-            recurring={"interval": "year"},
-            metadata={"plan_id": plan_id, "billing": "yearly"}
-        )
-        created_prices[f"{plan_id}_yearly"] = price_yearly.id
-        print(f"   ✅ Prix annuel créé: {price_yearly.id}")
+    # Prix mensuel et annuel en parallèle
+    monthly_log, yearly_log = [], []
+    await asyncio.gather(
+        ensure_price(plan_id, product, "month", plan_data['price_monthly'], monthly_log, not existing),
+        ensure_price(plan_id, product, "year", plan_data['price_yearly'], yearly_log, not existing),
+    )
+    return log + [""] + monthly_log + yearly_log
+
+
+async def setup_products():
+    """Tous les plans en parallèle: durée ≈ max(RTT) au lieu de Σ(RTT)."""
+    logs = await asyncio.gather(*(
+        ensure_product(plan_id, plan_data)
+        for plan_id, plan_data in PRODUCTS.items()
+    ))
+    # Affichage et IDs dans l'ordre des plans (pas l'ordre de complétion)
+    for log in logs:
+        print("\n".join(log))
+    ordered = {
+        key: created_prices[key]
+        for plan_id in PRODUCTS
+        for key in (f"{plan_id}_monthly", f"{plan_id}_yearly")
+        if key in created_prices
+    }
+    created_prices.clear()
+    created_prices.update(ordered)
+
+
+asyncio.run(setup_products())
 
 # ============================================================================
 # CRÉER UN CLIENT DE TEST
@@ -224,12 +259,10 @@ print("   2. Vérifie que les 3 produits sont créés")
 print("   3. Copie les Price IDs dans stripe_billing.py")
 print("   4. Configure le webhook (optionnel pour test)")
 
-# Sauvegarder les IDs dans un fichier
-with open("stripe_price_ids.txt", "w") as f:
-    f.write("# PhotonPath Stripe Price IDs\n")
-    f.write("# Copie ces valeurs dans stripe_billing.py\n\n")
-    for key, value in created_prices.items():
-        f.write(f"{key}={value}\n")
-    f.write(f"\ntest_customer_id={test_customer.id}\n")
+# Sauvegarder les IDs dans un fichier (contenu construit en mémoire, une seule écriture)
+lines = ["# PhotonPath Stripe Price IDs\n# Copie ces valeurs dans stripe_billing.py\n\n"]
+lines.extend(f"{key}={value}\n" for key, value in created_prices.items())
+lines.append(f"\ntest_customer_id={test_customer.id}\n")
+Path("stripe_price_ids.txt").write_text("".join(lines))
 
 print(f"\n💾 IDs sauvegardés dans: stripe_price_ids.txt")
@@ -31,10 +31,16 @@ Version: 1.0.0
 """
 
 import os
+import functools
+import random
 import secrets
-import hashlib
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Mapping
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -46,6 +52,20 @@ except ImportError:
     STRIPE_AVAILABLE = False
     print("⚠️ Stripe not installed. Run: pip install stripe")
 
+# Redis is optional: shared customer store across workers
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Email notifications are optional (module may be absent in minimal deployments)
+try:
+    from email_service import get_email_service
+    EMAIL_AVAILABLE = True
+except ImportError:
+    EMAIL_AVAILABLE = False
+
 
 class SubscriptionPlan(str, Enum):
     SPARK = "spark"        # Free
@@ -55,14 +75,56 @@ class SubscriptionPlan(str, Enum):
     FUSION = "fusion"      # Sur devis
 
 
+# Plan lookup by value without Enum.__call__ / ValueError on unknown values
+_PLAN_BY_VALUE: Dict[str, SubscriptionPlan] = {plan.value: plan for plan in SubscriptionPlan}
+
+
 # Stripe Price IDs from environment variables
-STRIPE_PRICES = {
+# (read-only: resolved once at import, checked once by init_billing)
+STRIPE_PRICES: Mapping[SubscriptionPlan, Optional[str]] = MappingProxyType({
     SubscriptionPlan.SPARK: None,  # Free plan, no Stripe price
     SubscriptionPlan.PHOTON: os.getenv("SUBSCRIPTION_PLAN_PHOTON"),
     SubscriptionPlan.BEAM: os.getenv("SUBSCRIPTION_PLAN_BEAM"),
     SubscriptionPlan.LASER: os.getenv("SUBSCRIPTION_PLAN_LASER"),
     SubscriptionPlan.FUSION: os.getenv("SUBSCRIPTION_PLAN_FUSION")
-}
+})
+
+# Paid self-serve plans that need a price for checkout (FUSION is sold on quote)
+REQUIRED_PRICE_PLANS = (SubscriptionPlan.PHOTON, SubscriptionPlan.BEAM, SubscriptionPlan.LASER)
+
+
+def _price_status(plan: SubscriptionPlan, price_id: Optional[str]) -> str:
+    if price_id and price_id.startswith("price_") and len(price_id) > 20:
+        return "ok"
+    if price_id is None and plan == SubscriptionPlan.SPARK:
+        return "free"
+    return "placeholder"
+
+
+# (plan, price_id, "ok" | "free" | "placeholder"), checked once at import
+_VALIDATED_PRICES: Tuple[Tuple[SubscriptionPlan, Optional[str], str], ...] = tuple(
+    (plan, price_id, _price_status(plan, price_id))
+    for plan, price_id in STRIPE_PRICES.items()
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StripeKeyInfo:
+    """Mode of the STRIPE_SECRET_KEY environment variable."""
+    is_test: bool
+    is_live: bool
+    masked: str  # first 20 characters, safe to log
+
+
+@functools.cache
+def stripe_key_info() -> StripeKeyInfo:
+    """Inspect STRIPE_SECRET_KEY once per process."""
+    key = os.getenv("STRIPE_SECRET_KEY", "")
+    return StripeKeyInfo(
+        is_test=key.startswith("sk_test_"),
+        is_live=key.startswith("sk_live_"),
+        masked=f"{key[:20]}..." if key else ""
+    )
 
 # Plan features for display
 PLAN_FEATURES = {
@@ -178,8 +240,14 @@ PLAN_FEATURES = {
     }
 }
 
+# Plan listing served by get_plans(); PLAN_FEATURES is static, so build it once
+_PLANS_CACHED: List[Dict[str, Any]] = [
+    {"id": plan.value, **PLAN_FEATURES[plan]}
+    for plan in SubscriptionPlan
+]
+
 
-@dataclass
+@dataclass(slots=True)
 class Customer:
     """Customer record."""
     id: str
@@ -187,13 +255,13 @@ class Customer:
     stripe_customer_id: Optional[str] = None
     plan: SubscriptionPlan = SubscriptionPlan.SPARK
     api_key: str = field(default_factory=lambda: f"pk_{secrets.token_hex(24)}")
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     subscription_id: Optional[str] = None
     subscription_status: str = "inactive"
     trial_end: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckoutResult:
     """Checkout session result."""
     success: bool
@@ -202,9 +270,216 @@ class CheckoutResult:
     error: Optional[str] = None
 
 
-# In-memory customer store (replace with database in production)
+# In-memory customer store (used when no Redis is configured)
 _customers: Dict[str, Customer] = {}
-_api_keys: Dict[str, str] = {}  # api_key -> customer_id mapping
+_api_keys: Dict[str, Customer] = {}  # api_key -> customer (one probe per auth)
+_emails: Dict[str, str] = {}  # lowercased email -> customer_id mapping
+_processed_events: "OrderedDict[str, float]" = OrderedDict()  # event id -> expiry
+_processed_events_lock = threading.Lock()
+
+# Stripe retries webhooks for up to 3 days; a day of ids covers practical duplicates
+EVENT_DEDUP_TTL = 86400
+EVENT_DEDUP_MAXSIZE = 50_000
+
+
+class InMemoryCustomerStore:
+    """Customer store over the module-level dicts (single process only)."""
+    
+    is_redis = False
+    
+    def get(self, customer_id: str) -> Optional[Customer]:
+        return _customers.get(customer_id)
+    
+    def by_email(self, email: str) -> Optional[Customer]:
+        customer_id = _emails.get(email.lower())
+        return _customers.get(customer_id) if customer_id else None
+    
+    def by_api_key(self, api_key: str) -> Optional[Customer]:
+        return _api_keys.get(api_key)
+    
+    def put(self, customer: Customer, old_api_key: str = None):
+        """Save a customer and its indexes, dropping a rotated-out API key."""
+        if old_api_key is not None:
+            _api_keys.pop(old_api_key, None)
+        _customers[customer.id] = customer
+        _api_keys[customer.api_key] = customer
+        _emails[customer.email.lower()] = customer.id
+    
+    def claim_event(self, event_id: str) -> bool:
+        """Record a webhook event id; False if it was already processed."""
+        now = time.monotonic()
+        with _processed_events_lock:
+            expiry = _processed_events.get(event_id)
+            if expiry is not None and expiry > now:
+                return False
+            _processed_events[event_id] = now + EVENT_DEDUP_TTL
+            _processed_events.move_to_end(event_id)
+            while len(_processed_events) > EVENT_DEDUP_MAXSIZE:
+                _processed_events.popitem(last=False)
+        return True
+    
+    def release_event(self, event_id: str):
+        """Forget a claimed event id so a redelivery is processed again."""
+        with _processed_events_lock:
+            _processed_events.pop(event_id, None)
+
+
+class RedisCustomerStore:
+    """
+    Customer store in Redis, shared by all workers and kept across restarts.
+    
+    Layout: hash ``<prefix>:customer:<id>`` with the Customer fields, plus
+    ``<prefix>:email:<email>`` and ``<prefix>:apikey:<key>`` -> customer id.
+    """
+    
+    is_redis = True
+    
+    def __init__(self, client: "redis.Redis", prefix: str = "photonpath"):
+        self.redis = client
+        self.prefix = prefix
+    
+    def _customer_key(self, customer_id: str) -> str:
+        return f"{self.prefix}:customer:{customer_id}"
+    
+    @staticmethod
+    def _encode(customer: Customer) -> Dict[str, str]:
+        return {
+            "id": customer.id,
+            "email": customer.email,
+            "stripe_customer_id": customer.stripe_customer_id or "",
+            "plan": customer.plan.value,
+            "api_key": customer.api_key,
+            "created_at": customer.created_at.isoformat(),
+            "subscription_id": customer.subscription_id or "",
+            "subscription_status": customer.subscription_status,
+            "trial_end": customer.trial_end.isoformat() if customer.trial_end else "",
+        }
+    
+    @staticmethod
+    def _decode(data: Dict[bytes, bytes]) -> Customer:
+        fields = {k.decode(): v.decode() for k, v in data.items()}
+        return Customer(
+            id=fields["id"],
+            email=fields["email"],
+            stripe_customer_id=fields["stripe_customer_id"] or None,
+            plan=_PLAN_BY_VALUE[fields["plan"]],
+            api_key=fields["api_key"],
+            created_at=datetime.fromisoformat(fields["created_at"]),
+            subscription_id=fields["subscription_id"] or None,
+            subscription_status=fields["subscription_status"],
+            trial_end=datetime.fromisoformat(fields["trial_end"]) if fields["trial_end"] else None,
+        )
+    
+    def get(self, customer_id: str) -> Optional[Customer]:
+        data = self.redis.hgetall(self._customer_key(customer_id))
+        return self._decode(data) if data else None
+    
+    def _by_index(self, key: str) -> Optional[Customer]:
+        customer_id = self.redis.get(key)
+        return self.get(customer_id.decode()) if customer_id else None
+    
+    def by_email(self, email: str) -> Optional[Customer]:
+        return self._by_index(f"{self.prefix}:email:{email.lower()}")
+    
+    def by_api_key(self, api_key: str) -> Optional[Customer]:
+        return self._by_index(f"{self.prefix}:apikey:{api_key}")
+    
+    def put(self, customer: Customer, old_api_key: str = None):
+        """Save a customer and its indexes in one pipelined round-trip."""
+        pipe = self.redis.pipeline()
+        if old_api_key is not None:
+            pipe.delete(f"{self.prefix}:apikey:{old_api_key}")
+        pipe.hset(self._customer_key(customer.id), mapping=self._encode(customer))
+        pipe.set(f"{self.prefix}:email:{customer.email.lower()}", customer.id)
+        pipe.set(f"{self.prefix}:apikey:{customer.api_key}", customer.id)
+        pipe.execute()
+    
+    def claim_event(self, event_id: str) -> bool:
+        """Record a webhook event id (SET NX EX); False if already processed."""
+        return bool(self.redis.set(
+            f"{self.prefix}:event:{event_id}", 1, nx=True, ex=EVENT_DEDUP_TTL
+        ))
+    
+    def release_event(self, event_id: str):
+        """Forget a claimed event id so a redelivery is processed again."""
+        self.redis.delete(f"{self.prefix}:event:{event_id}")
+
+
+_store = InMemoryCustomerStore()
+
+# Background pool for notification emails: SMTP latency never blocks webhooks
+_email_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="billing-email")
+
+
+def _send_email(method: str, *args):
+    """Call email_service.<method>(*args); failures are logged, not raised."""
+    if not EMAIL_AVAILABLE:
+        return
+    try:
+        getattr(get_email_service(), method)(*args)
+    except Exception as e:
+        print(f"⚠️ Email notification failed ({method}): {e}")
+
+
+def _queue_email(method: str, *args):
+    """Queue a notification email on the background pool."""
+    _email_pool.submit(_send_email, method, *args)
+
+
+class StripeRateLimiter:
+    """
+    Leaky-bucket limiter for outgoing Stripe API calls (thread-safe).
+    
+    Tokens drip in at ``rate`` per second up to ``burst``; acquire() blocks
+    until one is available. The default stays under Stripe's 100 req/s
+    live-mode limit.
+    """
+    
+    def __init__(self, rate: float = 80.0, burst: int = 80):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_stripe_limiter = StripeRateLimiter()
+
+
+def init_customer_store(redis_url: str = None, connection_pool: "redis.ConnectionPool" = None):
+    """
+    Select the customer store: Redis when redis_url (or REDIS_URL) is set
+    and reachable, the in-memory dicts otherwise.
+    
+    Pass connection_pool to share an existing pool (e.g. the rate limiter's)
+    instead of opening a new one.
+    """
+    global _store
+    redis_url = redis_url or os.getenv("REDIS_URL")
+    _store = InMemoryCustomerStore()
+    if (connection_pool or redis_url) and REDIS_AVAILABLE:
+        try:
+            pool = connection_pool or redis.ConnectionPool.from_url(redis_url)
+            client = redis.Redis(connection_pool=pool)
+            client.ping()
+            _store = RedisCustomerStore(client)
+            print("✅ Customer store: Redis")
+        except Exception as e:
+            print(f"⚠️ Customer store Redis connection failed: {e}. Using in-memory store.")
+    return _store
 
 
 class StripeBilling:
@@ -217,8 +492,16 @@ class StripeBilling:
         Stripe secret key. Defaults to STRIPE_SECRET_KEY env var.
     webhook_secret : str, optional
         Stripe webhook secret. Defaults to STRIPE_WEBHOOK_SECRET env var.
+    
+    Valid API keys are cached for KEY_CACHE_TTL seconds by validate_api_key;
+    webhook handlers drop the entries of keys they rotate or update.
     """
     
+    KEY_CACHE_TTL = 30.0
+    KEY_CACHE_MAXSIZE = 10_000
+    STRIPE_MAX_RETRIES = 5
+    BULK_MAX_WORKERS = 32
+    
     def __init__(
         self,
         secret_key: str = None,
@@ -226,10 +509,12 @@ class StripeBilling:
     ):
         self.secret_key = secret_key or os.getenv("STRIPE_SECRET_KEY", "")
         self.webhook_secret = webhook_secret or os.getenv("STRIPE_WEBHOOK_SECRET", "")
+        self._key_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._key_cache_lock = threading.Lock()
         
         if STRIPE_AVAILABLE and self.secret_key:
             stripe.api_key = self.secret_key
-            self._enabled = True
+            self.is_enabled = True
             
             # Check if using test keys
             if self.secret_key.startswith("sk_test_"):
@@ -238,38 +523,37 @@ class StripeBilling:
                 print("✅ Stripe initialized (LIVE MODE)")
             else:
                 print("⚠️ Invalid Stripe key format")
-                self._enabled = False
+                self.is_enabled = False
         else:
-            self._enabled = False
+            self.is_enabled = False
             if not STRIPE_AVAILABLE:
                 print("⚠️ Stripe not available. Install with: pip install stripe")
             else:
                 print("⚠️ Stripe not configured. Set STRIPE_SECRET_KEY env var.")
     
-    @property
-    def is_enabled(self) -> bool:
-        return self._enabled
-    
-    def create_customer(self, email: str, name: str = None, send_welcome_email: bool = True) -> Customer:
-        """Create a new customer."""
-        customer_id = f"cust_{secrets.token_hex(12)}"
-        api_key = f"pk_{secrets.token_hex(24)}"  # ← Générer AVANT d'utiliser
+    def create_customer(
+        self,
+        email: str,
+        name: str = None,
+        send_welcome_email: bool = True,
+        customer_id: str = None,
+        api_key: str = None,
+        created_at: datetime = None
+    ) -> Customer:
+        """
+        Create a new customer.
+        
+        customer_id, api_key and created_at are generated when omitted;
+        create_customer_bulk passes them in precomputed for the whole batch.
+        """
+        customer_id = customer_id or f"cust_{secrets.token_hex(12)}"
+        api_key = api_key or f"pk_{secrets.token_hex(24)}"  # ← Générer AVANT d'utiliser
         
         # Create Stripe customer if enabled
         stripe_customer_id = None
-        if self._enabled:
+        if self.is_enabled:
             try:
-                stripe_customer = stripe.Customer.create(
-                    email=email,
-                    name=name,
-                    metadata={
-                        "photonpath_id": customer_id,
-                        "plan": "spark",
-                        "api_key": api_key,
-                        "created_via": "photonpath_api"
-                    }
-                )
-                stripe_customer_id = stripe_customer.id
+                stripe_customer_id = self._create_stripe_customer(email, name, customer_id, api_key)
                 print(f"✅ Stripe customer created: {stripe_customer_id}")
             except Exception as e:
                 print(f"⚠️ Failed to create Stripe customer: {e}")
@@ -280,38 +564,138 @@ class StripeBilling:
             email=email,
             stripe_customer_id=stripe_customer_id,
             plan=SubscriptionPlan.SPARK,
-            api_key=api_key  # ← Utiliser la clé générée
+            api_key=api_key,  # ← Utiliser la clé générée
+            created_at=created_at or datetime.now(timezone.utc)
         )
         
         # Store customer
-        _customers[customer_id] = customer
-        _api_keys[customer.api_key] = customer_id
+        _store.put(customer)
         
         # Send welcome email
-        if send_welcome_email:
+        if send_welcome_email and EMAIL_AVAILABLE:
             try:
-                from email_service import get_email_service
-                email_service = get_email_service()
-                email_service.send_welcome_email(email, customer.api_key)
+                get_email_service().send_welcome_email(email, customer.api_key)
                 print(f"✅ Welcome email sent to {email}")
             except Exception as e:
                 print(f"⚠️ Welcome email failed: {e}")
         
         return customer
     
+    def _create_stripe_customer(self, email: str, name: Optional[str], customer_id: str, api_key: str) -> str:
+        """
+        Create the Stripe customer, paced by the shared leaky bucket and
+        retried with exponential backoff on Stripe rate-limit errors.
+        """
+        for attempt in range(self.STRIPE_MAX_RETRIES + 1):
+            _stripe_limiter.acquire()
+            try:
+                stripe_customer = stripe.Customer.create(
+                    email=email,
+                    name=name,
+                    metadata={
+                        "photonpath_id": customer_id,
+                        "plan": "spark",
+                        "api_key": api_key,
+                        "created_via": "photonpath_api"
+                    }
+                )
+                return stripe_customer.id
+            except stripe.error.RateLimitError:
+                if attempt == self.STRIPE_MAX_RETRIES:
+                    raise
+                time.sleep(2 ** attempt * 0.1 + random.random() * 0.1)
+    
+    def create_customer_bulk(
+        self,
+        emails: List[str],
+        send_welcome_email: bool = True,
+        max_workers: int = None
+    ) -> List[Customer]:
+        """
+        Create many customers concurrently (imports, bulk signups).
+        
+        Stripe calls run on a thread pool and share the leaky-bucket limiter,
+        so throughput approaches the Stripe rate limit instead of 1/RTT.
+        
+        Returns:
+        --------
+        list of Customer, in the same order as ``emails``
+        """
+        # One timestamp and one urandom read (12 id + 24 key bytes each) per batch
+        now = datetime.now(timezone.utc)
+        buf = os.urandom(36 * len(emails))
+        
+        def create(i: int) -> Customer:
+            chunk = buf[36 * i:36 * (i + 1)]
+            return self.create_customer(
+                emails[i],
+                send_welcome_email=send_welcome_email,
+                customer_id=f"cust_{chunk[:12].hex()}",
+                api_key=f"pk_{chunk[12:].hex()}",
+                created_at=now
+            )
+        
+        workers = max_workers or self.BULK_MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(create, range(len(emails))))
+    
+    def sync_from_stripe(self) -> Dict[str, int]:
+        """
+        Link local customers to their Stripe customers.
+        
+        One paginated Customer.list (100 per page) replaces a retrieve per
+        customer; Stripe customers are matched by ``metadata.photonpath_id``.
+        
+        Returns:
+        --------
+        dict : counts of remote customers seen, local records linked and
+               remote customers with no local record
+        """
+        stats = {"remote": 0, "linked": 0, "unknown": 0}
+        if not self.is_enabled:
+            return stats
+        
+        for stripe_customer in stripe.Customer.list(limit=100).auto_paging_iter():
+            customer_id = (stripe_customer.metadata or {}).get("photonpath_id")
+            if not customer_id:
+                continue
+            stats["remote"] += 1
+            
+            customer = _store.get(customer_id)
+            if customer is None:
+                stats["unknown"] += 1
+            elif customer.stripe_customer_id != stripe_customer.id:
+                customer.stripe_customer_id = stripe_customer.id
+                _store.put(customer)
+                stats["linked"] += 1
+        
+        return stats
+    
+    def find_stripe_customer(self, customer_id: str) -> Optional[str]:
+        """Look up a Stripe customer id by PhotonPath id with one Search API call."""
+        if not self.is_enabled:
+            return None
+        
+        # Search query strings are quoted: escape backslashes and quotes so
+        # the id cannot end the string or change the query
+        value = customer_id.replace("\\", "\\\\").replace("'", "\\'")
+        try:
+            result = stripe.Customer.search(
+                query=f"metadata['photonpath_id']:'{value}'",
+                limit=1
+            )
+        except stripe.error.StripeError as e:
+            print(f"⚠️ Stripe customer search error: {e}")
+            return None
+        return result.data[0].id if result.data else None
+    
     def get_customer_by_email(self, email: str) -> Optional[Customer]:
-        """Find customer by email."""
-        for customer in _customers.values():
-            if customer.email == email:
-                return customer
-        return None
+        """Find customer by email (case-insensitive)."""
+        return _store.by_email(email)
     
     def get_customer_by_api_key(self, api_key: str) -> Optional[Customer]:
         """Find customer by API key."""
-        customer_id = _api_keys.get(api_key)
-        if customer_id:
-            return _customers.get(customer_id)
-        return None
+        return _store.by_api_key(api_key)
     
     def create_checkout_session(
         self,
@@ -341,64 +725,49 @@ class StripeBilling:
         --------
         CheckoutResult
         """
-        if not self._enabled:
-            return CheckoutResult(
-                success=False,
-                error="Stripe not configured"
-            )
+        error, session_params = self._checkout_params(
+            customer_email, plan, success_url, cancel_url, trial_days
+        )
+        if error:
+            return error
         
-        if plan == SubscriptionPlan.SPARK:
+        try:
+            session = stripe.checkout.Session.create(**session_params)
+            
             return CheckoutResult(
-                success=False,
-                error="Free plan doesn't require payment"
+                success=True,
+                session_id=session.id,
+                checkout_url=session.url
             )
-        
-        price_id = STRIPE_PRICES.get(plan)
-        if not price_id:
+            
+        except stripe.error.StripeError as e:
             return CheckoutResult(
                 success=False,
-                error=f"No price configured for plan: {plan.value}"
+                error=str(e)
             )
+    
+    async def create_checkout_session_async(
+        self,
+        customer_email: str,
+        plan: SubscriptionPlan,
+        success_url: str,
+        cancel_url: str,
+        trial_days: int = 14
+    ) -> CheckoutResult:
+        """
+        Async version of create_checkout_session.
+        
+        The Stripe call is awaited (stripe ``create_async``), so sessions for
+        several plans can be created concurrently with asyncio.gather.
+        """
+        error, session_params = self._checkout_params(
+            customer_email, plan, success_url, cancel_url, trial_days
+        )
+        if error:
+            return error
         
         try:
-            # Get or create customer
-            customer = self.get_customer_by_email(customer_email)
-            if not customer:
-                customer = self.create_customer(customer_email)
-            
-            # Create checkout session
-            session_params = {
-                "mode": "subscription",
-                "payment_method_types": ["card"],
-                "line_items": [{
-                    "price": price_id,
-                    "quantity": 1
-                }],
-                "success_url": success_url + "?session_id={CHECKOUT_SESSION_ID}",
-                "cancel_url": cancel_url,
-                "customer_email": customer_email,
-                "metadata": {
-                    "photonpath_customer_id": customer.id,
-                    "plan": plan.value
-                },
-                "subscription_data": {
-                    "metadata": {
-                        "photonpath_customer_id": customer.id,
-                        "plan": plan.value
-                    }
-                }
-            }
-            
-            # Add trial if specified
-            if trial_days > 0:
-                session_params["subscription_data"]["trial_period_days"] = trial_days
-            
-            # Use existing Stripe customer if available
-            if customer.stripe_customer_id:
-                session_params["customer"] = customer.stripe_customer_id
-                del session_params["customer_email"]
-            
-            session = stripe.checkout.Session.create(**session_params)
+            session = await stripe.checkout.Session.create_async(**session_params)
             
             return CheckoutResult(
                 success=True,
@@ -412,6 +781,78 @@ class StripeBilling:
                 error=str(e)
             )
     
+    def _checkout_params(
+        self,
+        customer_email: str,
+        plan: SubscriptionPlan,
+        success_url: str,
+        cancel_url: str,
+        trial_days: int
+    ) -> Tuple[Optional[CheckoutResult], Optional[Dict[str, Any]]]:
+        """
+        Validate a checkout request and build its Session parameters.
+        
+        Returns (error, None) when the checkout cannot proceed, otherwise
+        (None, params). Creates the local customer if the email is new.
+        """
+        if not self.is_enabled:
+            return CheckoutResult(
+                success=False,
+                error="Stripe not configured"
+            ), None
+        
+        if plan == SubscriptionPlan.SPARK:
+            return CheckoutResult(
+                success=False,
+                error="Free plan doesn't require payment"
+            ), None
+        
+        price_id = STRIPE_PRICES[plan]
+        if not price_id:
+            return CheckoutResult(
+                success=False,
+                error=f"No price configured for plan: {plan.value}"
+            ), None
+        
+        # Get or create customer
+        customer = self.get_customer_by_email(customer_email)
+        if not customer:
+            customer = self.create_customer(customer_email)
+        
+        # Create checkout session
+        session_params = {
+            "mode": "subscription",
+            "payment_method_types": ["card"],
+            "line_items": [{
+                "price": price_id,
+                "quantity": 1
+            }],
+            "success_url": success_url + "?session_id={CHECKOUT_SESSION_ID}",
+            "cancel_url": cancel_url,
+            "customer_email": customer_email,
+            "metadata": {
+                "photonpath_customer_id": customer.id,
+                "plan": plan.value
+            },
+            "subscription_data": {
+                "metadata": {
+                    "photonpath_customer_id": customer.id,
+                    "plan": plan.value
+                }
+            }
+        }
+        
+        # Add trial if specified
+        if trial_days > 0:
+            session_params["subscription_data"]["trial_period_days"] = trial_days
+        
+        # Use existing Stripe customer if available
+        if customer.stripe_customer_id:
+            session_params["customer"] = customer.stripe_customer_id
+            del session_params["customer_email"]
+        
+        return None, session_params
+    
     def create_portal_session(
         self,
         customer_id: str,
@@ -422,10 +863,10 @@ class StripeBilling:
         
         Returns portal URL or None if failed.
         """
-        if not self._enabled:
+        if not self.is_enabled:
             return None
         
-        customer = _customers.get(customer_id)
+        customer = _store.get(customer_id)
         if not customer or not customer.stripe_customer_id:
             return None
         
@@ -454,7 +895,7 @@ class StripeBilling:
         --------
         dict : Event processing result
         """
-        if not self._enabled or not self.webhook_secret:
+        if not self.is_enabled or not self.webhook_secret:
             return {"success": False, "error": "Webhooks not configured"}
         
         try:
@@ -470,6 +911,22 @@ class StripeBilling:
         event_type = event["type"]
         data = event["data"]["object"]
         
+        # Stripe may deliver the same event more than once: apply it only once
+        if not _store.claim_event(event["id"]):
+            return {"success": True, "event": event_type, "deduped": True}
+        
+        try:
+            result = self._dispatch_event(event_type, data)
+        except Exception:
+            _store.release_event(event["id"])
+            raise
+        # A failed delivery is answered with an error and retried by Stripe:
+        # forget the id so the retry is applied instead of deduped
+        if not result.get("success"):
+            _store.release_event(event["id"])
+        return result
+    
+    def _dispatch_event(self, event_type: str, data: Dict) -> Dict[str, Any]:
         if event_type == "checkout.session.completed":
             return self._handle_checkout_completed(data)
         
@@ -490,37 +947,29 @@ class StripeBilling:
         plan = session.get("metadata", {}).get("plan")
         subscription_id = session.get("subscription")
         
-        if customer_id and customer_id in _customers:
-            customer = _customers[customer_id]
+        customer = _store.get(customer_id) if customer_id else None
+        if customer:
             customer.subscription_id = subscription_id
             customer.subscription_status = "active"
             
-            try:
-                customer.plan = SubscriptionPlan(plan)
-            except ValueError:
-                pass
+            new_plan = _PLAN_BY_VALUE.get(plan)
+            if new_plan:
+                customer.plan = new_plan
             
-            # Regenerate API key for paid plans
+            # Regenerate API key for paid plans (saves the customer)
             if customer.plan != SubscriptionPlan.SPARK:
-                old_key = customer.api_key
-                customer.api_key = f"sk_{secrets.token_hex(24)}"
-                
-                # Update API key mapping
-                if old_key in _api_keys:
-                    del _api_keys[old_key]
-                _api_keys[customer.api_key] = customer_id
+                self._rotate_api_key(customer, "sk")
+            else:
+                _store.put(customer)
+                self._forget_api_keys(customer.api_key)
             
-            # Send email notification
-            try:
-                from email_service import get_email_service
-                email_service = get_email_service()
-                email_service.send_subscription_activated(
-                    customer.email, 
-                    customer.plan.value, 
-                    customer.api_key
-                )
-            except Exception as e:
-                print(f"⚠️ Email notification failed: {e}")
+            # Send email notification (in the background)
+            _queue_email(
+                "send_subscription_activated",
+                customer.email,
+                customer.plan.value,
+                customer.api_key
+            )
             
             return {
                 "success": True,
@@ -537,9 +986,11 @@ class StripeBilling:
         customer_id = subscription.get("metadata", {}).get("photonpath_customer_id")
         status = subscription.get("status")
         
-        if customer_id and customer_id in _customers:
-            customer = _customers[customer_id]
+        customer = _store.get(customer_id) if customer_id else None
+        if customer:
             customer.subscription_status = status
+            _store.put(customer)
+            self._forget_api_keys(customer.api_key)
             
             return {
                 "success": True,
@@ -554,27 +1005,17 @@ class StripeBilling:
         """Handle subscription cancellation."""
         customer_id = subscription.get("metadata", {}).get("photonpath_customer_id")
         
-        if customer_id and customer_id in _customers:
-            customer = _customers[customer_id]
+        customer = _store.get(customer_id) if customer_id else None
+        if customer:
             customer.plan = SubscriptionPlan.SPARK
             customer.subscription_status = "cancelled"
             customer.subscription_id = None
             
-            # Downgrade API key
-            old_key = customer.api_key
-            customer.api_key = f"pk_{secrets.token_hex(24)}"
+            # Downgrade API key (saves the customer)
+            self._rotate_api_key(customer, "pk")
             
-            if old_key in _api_keys:
-                del _api_keys[old_key]
-            _api_keys[customer.api_key] = customer_id
-            
-            # Send email notification
-            try:
-                from email_service import get_email_service
-                email_service = get_email_service()
-                email_service.send_subscription_cancelled(customer.email)
-            except Exception as e:
-                print(f"⚠️ Email notification failed: {e}")
+            # Send email notification (in the background)
+            _queue_email("send_subscription_cancelled", customer.email)
             
             return {
                 "success": True,
@@ -585,18 +1026,24 @@ class StripeBilling:
         
         return {"success": False, "error": "Customer not found"}
     
+    def _rotate_api_key(self, customer: Customer, prefix: str) -> str:
+        """
+        Give the customer a fresh ``<prefix>_...`` API key: saves the
+        customer, retires the old key mapping and its cached validation.
+        """
+        old_key = customer.api_key
+        customer.api_key = f"{prefix}_{secrets.token_hex(24)}"
+        _store.put(customer, old_api_key=old_key)
+        self._forget_api_keys(old_key)
+        return customer.api_key
+    
     def _handle_payment_failed(self, invoice: Dict) -> Dict[str, Any]:
         """Handle failed payment."""
         customer_email = invoice.get("customer_email")
         
-        # Send email notification
+        # Send email notification (in the background)
         if customer_email:
-            try:
-                from email_service import get_email_service
-                email_service = get_email_service()
-                email_service.send_payment_failed(customer_email)
-            except Exception as e:
-                print(f"⚠️ Email notification failed: {e}")
+            _queue_email("send_payment_failed", customer_email)
         
         return {
             "success": True,
@@ -605,44 +1052,74 @@ class StripeBilling:
         }
     
     def get_plans(self) -> List[Dict[str, Any]]:
-        """Get all available plans with features."""
-        return [
-            {
-                "id": plan.value,
-                **PLAN_FEATURES[plan]
-            }
-            for plan in SubscriptionPlan
-        ]
+        """Get all available plans with features (shared, do not mutate)."""
+        return _PLANS_CACHED
     
     def validate_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
         """
         Validate API key and return customer info.
         
+        Valid keys are cached per process for KEY_CACHE_TTL seconds (invalid
+        keys are never cached). Changes made by this process's webhook
+        handlers take effect at once; a key revoked or rotated by another
+        worker may keep validating here for up to KEY_CACHE_TTL seconds.
+        
         Returns:
         --------
         dict or None : Customer info if valid, None if invalid
         """
+        now = time.monotonic()
+        with self._key_cache_lock:
+            entry = self._key_cache.get(api_key)
+            if entry is not None and entry[0] > now:
+                self._key_cache.move_to_end(api_key)
+                return entry[1]
+        
         customer = self.get_customer_by_api_key(api_key)
         if not customer:
             return None
         
-        return {
+        info = {
             "customer_id": customer.id,
             "email": customer.email,
             "plan": customer.plan.value,
             "subscription_status": customer.subscription_status,
             "limits": PLAN_FEATURES[customer.plan]
         }
+        with self._key_cache_lock:
+            self._key_cache[api_key] = (now + self.KEY_CACHE_TTL, info)
+            self._key_cache.move_to_end(api_key)
+            while len(self._key_cache) > self.KEY_CACHE_MAXSIZE:
+                self._key_cache.popitem(last=False)
+        return info
+    
+    def _forget_api_keys(self, *api_keys: Optional[str]):
+        """Drop cached validate_api_key results for the given keys."""
+        with self._key_cache_lock:
+            for api_key in api_keys:
+                self._key_cache.pop(api_key, None)
 
 
 # Global instance
 _billing: Optional[StripeBilling] = None
 
 
-def init_billing(secret_key: str = None, webhook_secret: str = None) -> StripeBilling:
-    """Initialize global billing instance."""
+def init_billing(
+    secret_key: str = None,
+    webhook_secret: str = None,
+    redis_url: str = None,
+    connection_pool: "redis.ConnectionPool" = None
+) -> StripeBilling:
+    """Initialize global billing instance and its customer store."""
     global _billing
+    init_customer_store(redis_url, connection_pool)
     _billing = StripeBilling(secret_key, webhook_secret)
+    
+    if _billing.is_enabled:
+        missing = [plan.value for plan in REQUIRED_PRICE_PLANS if not STRIPE_PRICES[plan]]
+        if missing:
+            print(f"⚠️ No Stripe price configured for: {', '.join(missing)} "
+                  f"(set SUBSCRIPTION_PLAN_<PLAN>); checkout disabled for these plans")
     return _billing
 
 
@@ -652,8 +1129,21 @@ def get_billing() -> Optional[StripeBilling]:
 
 
 # Demo customers (for testing without Stripe)
+# Stable ids, precomputed: "cust_" + md5(email).hexdigest()[:12]
+_DEMO_IDS = {
+    "demo@photonpath.io": "cust_a050a4ae234f",
+    "photon@photonpath.io": "cust_4e648518ec80",
+    "beam@photonpath.io": "cust_2bd34cf50f8f",
+    "laser@photonpath.io": "cust_96fc19972331",
+    "fusion@photonpath.io": "cust_4637c3610f68",
+}
+
+
 def create_demo_customers():
-    """Create demo customers for testing."""
+    """Create demo customers for testing (no-op once they are all seeded)."""
+    if all(_store.get(customer_id) for customer_id in _DEMO_IDS.values()):
+        return
+    
     demo_customers = [
         ("demo@photonpath.io", SubscriptionPlan.SPARK, "demo_key_12345"),
         ("photon@photonpath.io", SubscriptionPlan.PHOTON, "sk_photon_demo"),
@@ -664,13 +1154,12 @@ def create_demo_customers():
     
     for email, plan, api_key in demo_customers:
         customer = Customer(
-            id=f"cust_{hashlib.md5(email.encode()).hexdigest()[:12]}",
+            id=_DEMO_IDS[email],
             email=email,
             plan=plan,
             api_key=api_key,
             subscription_status="active" if plan != SubscriptionPlan.SPARK else "inactive"
         )
-        _customers[customer.id] = customer
-        _api_keys[api_key] = customer.id
+        _store.put(customer)
     
     print(f"✅ Created {len(demo_customers)} demo customers")
\ No newline at end of file
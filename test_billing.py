@@ -13,6 +13,31 @@ Author: PhotonPath
 import sys
 import os
 
+
+class Log:
+    """
+    Buffer a test's output lines and write them in one call on exit
+    (also when the test raises), instead of one print() per line.
+    """
+    
+    def __init__(self):
+        self.buf = []
+    
+    def __call__(self, line: str = ""):
+        self.buf.append(line)
+    
+    def flush(self):
+        if self.buf:
+            sys.stdout.write("\n".join(self.buf) + "\n")
+            self.buf.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
 # Load .env file
 try:
     from dotenv import load_dotenv
@@ -23,109 +48,165 @@ except ImportError:
 
 def test_rate_limiter():
     """Test rate limiter module."""
-    print("\n" + "="*50)
-    print("🧪 Testing Rate Limiter")
-    print("="*50)
-    
-    from rate_limiter import RateLimiter, Plan, PLAN_LIMITS
-    
-    # Test without Redis (in-memory)
-    limiter = RateLimiter()
-    print(f"✅ RateLimiter initialized (Redis: {limiter.is_redis})")
-    
-    # Test rate limiting
-    api_key = "test_key_12345"
-    
-    # First request should pass
-    result = limiter.check_rate_limit(api_key, Plan.SPARK)
-    print(f"✅ First request: allowed={result.allowed}, remaining={result.remaining}")
-    
-    # Make many requests to test limit
-    for i in range(10):
+    with Log() as log:
+        log("\n" + "="*50)
+        log("🧪 Testing Rate Limiter")
+        log("="*50)
+        
+        from rate_limiter import RateLimiter, Plan, PLAN_LIMITS
+        
+        # Test without Redis (in-memory)
+        limiter = RateLimiter()
+        log(f"✅ RateLimiter initialized (Redis: {limiter.is_redis})")
+        
+        # Test rate limiting
+        api_key = "test_key_12345"
+        
+        # First request should pass
         result = limiter.check_rate_limit(api_key, Plan.SPARK)
-    
-    print(f"✅ After 10 requests: remaining={result.remaining}")
-    
-    # Test usage stats
-    usage = limiter.get_usage(api_key, Plan.SPARK)
-    print(f"✅ Usage stats: {usage['daily']['used']}/{usage['daily']['limit']} daily")
-    
-    # Test different plans
-    for plan in Plan:
-        limits = PLAN_LIMITS[plan]
-        print(f"   {plan.value}: {limits['requests_per_day']}/day, {limits['requests_per_minute']}/min")
-    
-    print("✅ Rate limiter tests passed!")
-    return True
+        log(f"✅ First request: allowed={result.allowed}, remaining={result.remaining}")
+        
+        # Make many requests to test limit (one pipelined round-trip with Redis)
+        results = limiter.check_rate_limit_batch([api_key] * 10, Plan.SPARK)
+        result = results[-1]
+        
+        log(f"✅ After 10 requests: remaining={result.remaining}")
+        
+        # Test usage stats
+        usage = limiter.get_usage(api_key, Plan.SPARK)
+        log(f"✅ Usage stats: {usage['daily']['used']}/{usage['daily']['limit']} daily")
+        
+        # Test different plans
+        for plan in Plan:
+            limits = PLAN_LIMITS[plan]
+            log(f"   {plan.value}: {limits['requests_per_day']}/day, {limits['requests_per_minute']}/min")
+        
+        log("✅ Rate limiter tests passed!")
+        return True
 
 
 def test_stripe_billing():
     """Test Stripe billing module."""
-    print("\n" + "="*50)
-    print("🧪 Testing Stripe Billing")
-    print("="*50)
-    
-    from stripe_billing import (
-        StripeBilling, 
-        create_demo_customers,
-        SubscriptionPlan,
-        PLAN_FEATURES,
-        _customers,
-        _api_keys
-    )
-    
-    # Initialize without Stripe keys (demo mode)
-    billing = StripeBilling()
-    print(f"✅ StripeBilling initialized (Stripe enabled: {billing.is_enabled})")
-    
-    # Create demo customers
-    create_demo_customers()
-    print(f"✅ Created {len(_customers)} demo customers")
-    
-    # Test customer lookup
-    customer = billing.get_customer_by_api_key("demo_key_12345")
-    if customer:
-        print(f"✅ Found customer: {customer.email}, plan: {customer.plan.value}")
-    
-    # Test plan features
-    plans = billing.get_plans()
-    print(f"✅ Available plans: {len(plans)}")
-    for plan in plans:
-        print(f"   {plan['name']}: ${plan['price_monthly']}/mo - {plan['requests_per_day']}/day")
-    
-    # Test API key validation
-    for api_key in ["demo_key_12345", "sk_research_demo", "sk_pro_demo_key"]:
-        info = billing.validate_api_key(api_key)
-        if info:
-            print(f"✅ API key {api_key[:12]}... = {info['plan']} plan")
-    
-    print("✅ Stripe billing tests passed!")
-    return True
+    with Log() as log:
+        log("\n" + "="*50)
+        log("🧪 Testing Stripe Billing")
+        log("="*50)
+        
+        from stripe_billing import (
+            StripeBilling, 
+            create_demo_customers,
+            SubscriptionPlan,
+            PLAN_FEATURES,
+            _customers,
+            _api_keys
+        )
+        
+        # Initialize without Stripe keys (demo mode)
+        billing = StripeBilling()
+        log(f"✅ StripeBilling initialized (Stripe enabled: {billing.is_enabled})")
+        
+        # Create demo customers
+        create_demo_customers()
+        log(f"✅ Created {len(_customers)} demo customers")
+        
+        # Test customer lookup
+        customer = billing.get_customer_by_api_key("demo_key_12345")
+        if customer:
+            log(f"✅ Found customer: {customer.email}, plan: {customer.plan.value}")
+        
+        # Test plan features
+        plans = billing.get_plans()
+        log(f"✅ Available plans: {len(plans)}")
+        for plan in plans:
+            log(f"   {plan['name']}: ${plan['price_monthly']}/mo - {plan['requests_per_day']}/day")
+        
+        # Test API key validation
+        for api_key in ["demo_key_12345", "sk_research_demo", "sk_pro_demo_key"]:
+            info = billing.validate_api_key(api_key)
+            if info:
+                log(f"✅ API key {api_key[:12]}... = {info['plan']} plan")
+        
+        log("✅ Stripe billing tests passed!")
+        return True
+
+
+def test_webhook_retry():
+    """A failed webhook delivery must not dedupe Stripe's retry."""
+    with Log() as log:
+        log("\n" + "="*50)
+        log("🧪 Testing Webhook Retry")
+        log("="*50)
+        
+        import json
+        from unittest import mock
+        import stripe
+        from stripe_billing import StripeBilling, Customer, SubscriptionPlan, _store
+        
+        customer_id = "cust_webhook_retry"
+        payload = json.dumps({
+            "id": "evt_webhook_retry",
+            "type": "checkout.session.completed",
+            "data": {"object": {
+                "subscription": "sub_webhook_retry",
+                "metadata": {"photonpath_customer_id": customer_id, "plan": "photon"},
+            }},
+        }).encode()
+        
+        old_api_key = stripe.api_key
+        # Signature checking is Stripe's job: hand the parsed event through
+        with mock.patch.object(
+            stripe.Webhook, "construct_event",
+            side_effect=lambda body, *args: json.loads(body)
+        ):
+            try:
+                billing = StripeBilling(secret_key="sk_test_retry", webhook_secret="whsec_retry")
+                
+                # First delivery: customer unknown yet -> handler fails
+                result = billing.handle_webhook(payload, "t=1,v1=first")
+                assert not result["success"] and not result.get("deduped"), result
+                log(f"✅ First delivery failed: {result.get('error')}")
+                
+                # Retry once the customer exists: applied, not deduped
+                _store.put(Customer(id=customer_id, email="retry@photonpath.io"))
+                result = billing.handle_webhook(payload, "t=2,v1=retry")
+                assert result["success"] and not result.get("deduped"), result
+                assert _store.get(customer_id).plan == SubscriptionPlan.PHOTON
+                log("✅ Retry processed after the failed delivery")
+                
+                # Redelivery of the processed event is deduped
+                result = billing.handle_webhook(payload, "t=3,v1=again")
+                assert result.get("deduped"), result
+                log("✅ Redelivery after success deduped")
+            finally:
+                stripe.api_key = old_api_key
+        
+        return True
 
 
 def test_billing_endpoints():
     """Test billing API endpoints."""
-    print("\n" + "="*50)
-    print("🧪 Testing Billing Endpoints")
-    print("="*50)
-    
-    from billing_endpoints import init_billing_system
-    
-    # Initialize billing system
-    init_billing_system()
-    print("✅ Billing system initialized")
-    
-    print("✅ Billing endpoints ready!")
-    print("\nEndpoints available:")
-    print("  GET  /usage/limits     - Get current usage")
-    print("  GET  /usage/plans      - List all plans")
-    print("  POST /billing/customers - Create customer")
-    print("  POST /billing/checkout - Create checkout session")
-    print("  GET  /billing/portal   - Customer portal URL")
-    print("  POST /billing/webhook  - Stripe webhooks")
-    print("  GET  /billing/validate - Validate API key")
-    
-    return True
+    with Log() as log:
+        log("\n" + "="*50)
+        log("🧪 Testing Billing Endpoints")
+        log("="*50)
+        
+        from billing_endpoints import init_billing_system
+        
+        # Initialize billing system
+        init_billing_system()
+        log("✅ Billing system initialized")
+        
+        log("✅ Billing endpoints ready!")
+        log("\nEndpoints available:")
+        log("  GET  /usage/limits     - Get current usage")
+        log("  GET  /usage/plans      - List all plans")
+        log("  POST /billing/customers - Create customer")
+        log("  POST /billing/checkout - Create checkout session")
+        log("  GET  /billing/portal   - Customer portal URL")
+        log("  POST /billing/webhook  - Stripe webhooks")
+        log("  GET  /billing/validate - Validate API key")
+        
+        return True
 
 
 def main():
@@ -137,6 +218,7 @@ def main():
     tests = [
         ("Rate Limiter", test_rate_limiter),
         ("Stripe Billing", test_stripe_billing),
+        ("Webhook Retry", test_webhook_retry),
         ("Billing Endpoints", test_billing_endpoints),
     ]
     
@@ -17,6 +17,7 @@ Author: PhotonPath
 
 import os
 import sys
+import asyncio
 import time
 import json
 
@@ -45,8 +46,8 @@ except ImportError as e:
 
 try:
     from stripe_billing import (
-        StripeBilling, SubscriptionPlan, STRIPE_PRICES, 
-        PLAN_FEATURES, create_demo_customers, init_billing
+        StripeBilling, SubscriptionPlan, _VALIDATED_PRICES,
+        PLAN_FEATURES, create_demo_customers, init_billing, stripe_key_info
     )
     print("   ✅ stripe_billing importé")
 except ImportError as e:
@@ -58,20 +59,20 @@ except ImportError as e:
 # ============================================================================
 print("\n🔑 Test 2: Configuration Stripe...")
 
-stripe_key = os.getenv("STRIPE_SECRET_KEY", "")
-if stripe_key.startswith("sk_test_"):
-    print(f"   ✅ Clé Stripe TEST détectée: {stripe_key[:20]}...")
-elif stripe_key.startswith("sk_live_"):
+key_info = stripe_key_info()
+if key_info.is_test:
+    print(f"   ✅ Clé Stripe TEST détectée: {key_info.masked}")
+elif key_info.is_live:
     print(f"   ⚠️ Clé Stripe LIVE détectée - Attention!")
 else:
     print("   ❌ Pas de clé Stripe valide dans .env")
 
 # Vérifier les Price IDs
 print("\n   📋 Price IDs configurés:")
-for plan, price_id in STRIPE_PRICES.items():
-    if price_id and price_id.startswith("price_") and len(price_id) > 20:
+for plan, price_id, status in _VALIDATED_PRICES:
+    if status == "ok":
         print(f"      ✅ {plan.value}: {price_id[:25]}...")
-    elif price_id is None and plan == SubscriptionPlan.SPARK:
+    elif status == "free":
         print(f"      ✅ {plan.value}: Gratuit (pas de price)")
     else:
         print(f"      ⚠️ {plan.value}: {price_id} (placeholder - à remplacer!)")
@@ -154,16 +155,22 @@ for plan in Plan:
 print("\n💳 Test 7: Création de session checkout...")
 
 if billing.is_enabled:
-    # Test pour chaque plan payant
-    for plan in [SubscriptionPlan.PHOTON, SubscriptionPlan.BEAM, SubscriptionPlan.LASER]:
-        result = billing.create_checkout_session(
-            customer_email=test_email,
-            plan=plan,
-            success_url="https://photonpath.io/success",
-            cancel_url="https://photonpath.io/cancel",
-            trial_days=14
-        )
-        
+    # Test pour chaque plan payant (sessions créées en parallèle)
+    checkout_plans = [SubscriptionPlan.PHOTON, SubscriptionPlan.BEAM, SubscriptionPlan.LASER]
+    
+    async def create_sessions():
+        return await asyncio.gather(*(
+            billing.create_checkout_session_async(
+                customer_email=test_email,
+                plan=plan,
+                success_url="https://photonpath.io/success",
+                cancel_url="https://photonpath.io/cancel",
+                trial_days=14
+            )
+            for plan in checkout_plans
+        ))
+    
+    for plan, result in zip(checkout_plans, asyncio.run(create_sessions())):
         if result.success:
             print(f"   ✅ {plan.value}: Session créée")
             print(f"      URL: {result.checkout_url[:60]}...")
@@ -0,0 +1,61 @@
+"""
+PhotonPath SDK Test Script
+==========================
+
+Test the client-side GET cache of the Python SDK (no network needed).
+
+Usage:
+    python test_sdk.py
+    
+Author: PhotonPath
+"""
+
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from photonpath_sdk import PhotonPathClient
+
+
+def _counting_send(client):
+    """Patch client._send with a fake API answering a new body per call."""
+    calls = []
+    
+    def send(method, endpoint, **kwargs):
+        calls.append(endpoint)
+        return SimpleNamespace(content=json.dumps({"call": len(calls)}).encode())
+    
+    return mock.patch.object(client, "_send", side_effect=send), calls
+
+
+def test_get_cached():
+    """Deterministic lookups are served from the cache on repeat."""
+    client = PhotonPathClient(base_url="http://localhost")
+    patch, calls = _counting_send(client)
+    with patch:
+        first = client.get_tissue("brain_gray_matter", 630)
+        second = client.get_tissue("brain_gray_matter", 630)
+        assert first == second == {"call": 1}
+        assert len(calls) == 1
+        
+        client.clear_cache()
+        assert client.get_tissue("brain_gray_matter", 630) == {"call": 2}
+    return True
+
+
+def test_simulate_quick_uncached():
+    """Monte Carlo results are stochastic: every call hits the API."""
+    client = PhotonPathClient(base_url="http://localhost")
+    patch, calls = _counting_send(client)
+    with patch:
+        first = client.simulate_quick("brain_gray_matter", 630, 1000)
+        second = client.simulate_quick("brain_gray_matter", 630, 1000)
+        assert first != second
+        assert calls == ["/v2/simulate/quick"] * 2
+    return True
+
+
+if __name__ == "__main__":
+    for test in (test_get_cached, test_simulate_quick_uncached):
+        test()
+        print(f"✅ {test.__name__}")